@@ -1,4 +1,4 @@
-import type { CryptoKey, LogEntryWithScore } from '../types';
+import type { CryptoKeyWithScore, LogEntryWithScore } from '../types';
 
 export interface PaginatedLogsResponse {
   logs: LogEntryWithScore[];
@@ -8,7 +8,7 @@ export interface PaginatedLogsResponse {
 
 const API_BASE_URL = 'http://127.0.0.1:8000';
 
-export async function fetchKeys(): Promise<CryptoKey[]> {
+export async function fetchKeys(): Promise<CryptoKeyWithScore[]> {
   const response = await fetch(`${API_BASE_URL}/keys/inventory`);
   if (!response.ok) {
     throw new Error('Failed to fetch key inventory from the API.');
@@ -17,19 +17,6 @@ export async function fetchKeys(): Promise<CryptoKey[]> {
   return data.keys;
 }
 
-export async function fetchVulnerabilityScore(key: CryptoKey): Promise<number> {
-  const response = await fetch(`${API_BASE_URL}/predict_vulnerability`, {
-    method: 'POST',
-    headers: { 'Content-Type': 'application/json' },
-    body: JSON.stringify(key),
-  });
-  if (!response.ok) {
-    throw new Error('Failed to fetch vulnerability score.');
-  }
-  const data = await response.json();
-  return data.predicted_vulnerability_score;
-}
-
 export async function fetchScoredLogs(page: number): Promise<PaginatedLogsResponse> {
   const limit = 50; // Page size is fixed at 50
   const response = await fetch(`${API_BASE_URL}/logs/scored?page=${page}&limit=${limit}`);
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import './HomePage.css';
-import { fetchKeys, fetchVulnerabilityScore } from '../components/api';
+import { fetchKeys } from '../components/api';
 import type { CryptoKeyWithScore } from '../types';
 import RiskChart from '../components/RiskChart'; // Import our new chart
 
@@ -17,13 +17,7 @@ const HomePage: React.FC = () => {
   useEffect(() => {
     async function loadAndScoreKeys() {
       try {
-        const initialKeys = await fetchKeys();
-        const keysWithScores = await Promise.all(
-          initialKeys.map(async (key) => {
-            const score = await fetchVulnerabilityScore(key);
-            return { ...key, vulnerability_score: score };
-          })
-        );
+        const keysWithScores = await fetchKeys();
         
         // Calculate KPIs
         const total = keysWithScores.length;
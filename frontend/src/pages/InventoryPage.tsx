@@ -1,5 +1,5 @@
 import React, { useState, useEffect } from 'react';
-import { fetchKeys, fetchVulnerabilityScore, getRecommendedAction } from '../components/api';
+import { fetchKeys, getRecommendedAction } from '../components/api';
 import KeyTable from '../components/KeyTable';
 import type { CryptoKeyWithScore } from '../types';
 
@@ -12,24 +12,10 @@ const InventoryPage: React.FC = () => {
   useEffect(() => {
     async function loadAndScoreKeys() {
       try {
-        const initialKeys = await fetchKeys();
-        setKeys(initialKeys.map(key => ({ ...key, vulnerability_score: '...' })));
+        // Scores are precomputed server-side and served with the inventory
+        const scoredKeys = await fetchKeys();
+        setKeys(scoredKeys.map(key => ({ ...key, vulnerability_score: key.vulnerability_score ?? 'Error' })));
         setIsLoading(false);
-
-        const scoredKeys = await Promise.all(
-          initialKeys.map(async (key) => {
-            try {
-              const score = await fetchVulnerabilityScore(key);
-              return { ...key, vulnerability_score: score };
-            } catch (error) {
-              console.error(`Failed to get score for key ${key.key_id}`, error);
-              return { ...key, vulnerability_score: 'Error' };
-            }
-          })
-        );
-        
-        setKeys(scoredKeys);
-
       } catch (err) {
         if (err instanceof Error) setError(err.message);
         setIsLoading(false);
@@ -1,69 +1,253 @@
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from pydantic import BaseModel, ValidationError
+import asyncio
+import contextvars
+import gzip
 import joblib
 import pandas as pd
 import numpy as np
 from datetime import datetime, timezone
 import json
 import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from src.components.dtde_preprocessor import DTDEPreprocessor
-from stable_baselines3 import PPO
-from src.components.kms_env import KmsEnv
-from typing import Optional
+from src.components.srae_preprocessor import SRAEPreprocessor
+from src.components.log_buffer import LogBuffer
+from src.components.log_index import LogIndex
+from src.components.log_store import load_logs, resolve_log_path
+from src.components.log_tailer import NdjsonTailer
+from src.components.model_registry import ModelRegistry
+from src.components.window_features import SlidingWindowFeatures
+from src.components.micro_batcher import MicroBatcher
+from src.components.key_risk import KeyRiskTable
+from src.components.metrics import RequestMetricsMiddleware, metrics
+from src.components.serialization import FORMATS, MEDIA_TYPES, encode_arrow, encode_json, iter_ndjson
+from src.components.tree_runtime import load_compiled_model
+from src.components.apce_policy import ACTION_MAP, ApceLookupTable, composite_risk, predict_actions
+from typing import List, Optional
 
 # --- App Setup ---
 app = FastAPI(title="Project Chimera API")
 
 # --- Global Variables for Models and Data ---
 srae_model = None
+srae_preprocessor = None
 dtde_model = None
 dtde_preprocessor = None
 apce_model = None
+apce_lookup = None
 key_inventory_df = None
-access_logs_df = None
+access_log_buffer = None
+access_log_index = None
+log_tailer = None
+model_registry = None
+resources_ready = threading.Event()
+startup_seconds = None
+
+# Parsed creation dates and the key_age_days each inventory row was last scored at
+inventory_creation_dates = None
+inventory_scored_age_days = None
+
+# Bumped whenever an inventory score or configuration changes; it is the inventory's
+# ETag, and the last encoded body per format is reused until it moves
+inventory_version = 0
+inventory_response_cache = {}
+
+# Guards every read-modify-write of key_inventory_df, its per-row score state and
+# inventory_version: refreshes and upserts run concurrently on Starlette's threadpool
+inventory_lock = threading.RLock()
+
+# Materialized per-key risk (SRAE vulnerability joined with the time-decayed anomaly
+# scores of the key's logs), updated as inventory keys and logs are scored
+RISK_HALF_LIFE_HOURS = float(os.environ.get('CHIMERA_RISK_HALF_LIFE_HOURS', 24))
+key_risk = KeyRiskTable(RISK_HALF_LIFE_HOURS)
+
+# Global DTDE normalization parameters, fixed from the logs loaded at startup
+DTDE_SCORE_CHUNK_SIZE = 5000
+anomaly_score_mean = None
+anomaly_score_std = None
+
+# Live sliding-window counters, kept only when the DTDE model was trained with
+# window features; every scored log (startup, ingest, tail) passes through it
+log_window_features = None
+
+# APCE policy lookup table: loaded from APCE_LOOKUP_FILE if exported, otherwise
+# sampled from the PPO model at startup. A resolution of 0 disables it.
+APCE_LOOKUP_FILE = 'models/apce_lookup.npy'
+APCE_LOOKUP_RESOLUTION = int(os.environ.get('CHIMERA_APCE_LOOKUP_RESOLUTION', 10001))
+
+# 'joblib' serves the original XGBoost / scikit-learn objects; 'compiled' serves the
+# NumPy tree exports (models/*.npz), falling back to joblib when an export is missing
+MODEL_RUNTIME = os.environ.get('CHIMERA_MODEL_RUNTIME', 'joblib')
+SRAE_COMPILED_FILE = 'models/srae_model.npz'
+DTDE_COMPILED_FILE = 'models/dtde_model.npz'
+
+# Key inventory and access log sources (the benchmark suite points these at synthetic data)
+KEY_INVENTORY_FILE = os.environ.get('CHIMERA_KEY_INVENTORY_FILE', 'data/new_keys_to_predict.csv')
+ACCESS_LOGS_FILE = os.environ.get('CHIMERA_ACCESS_LOGS_FILE', 'data/kms_access_logs.json')
+
+# Optional NDJSON file whose appended log lines are ingested as they arrive
+LOG_TAIL_FILE = os.environ.get('CHIMERA_LOG_TAIL_FILE')
+
+# Model calls run on a dedicated, bounded thread pool instead of the event loop or
+# Starlette's shared threadpool (XGBoost, NumPy and torch release the GIL while they
+# compute). Concurrent single-item requests are coalesced into one model call per
+# CHIMERA_BATCH_WINDOW_MS window; CHIMERA_MAX_MICRO_BATCH=1 turns coalescing off.
+SCORING_WORKERS = int(os.environ.get('CHIMERA_SCORING_WORKERS', 4))
+BATCH_WINDOW_MS = float(os.environ.get('CHIMERA_BATCH_WINDOW_MS', 2))
+MAX_MICRO_BATCH = int(os.environ.get('CHIMERA_MAX_MICRO_BATCH', 256))
+scoring_executor = ThreadPoolExecutor(max_workers=SCORING_WORKERS, thread_name_prefix="scoring")
+
+# Responses over GZIP_MIN_BYTES are gzipped for clients that accept it; level 1 is
+# the cheapest, and these repetitive payloads already shrink ~12x at it
+GZIP_LEVEL = int(os.environ.get('CHIMERA_GZIP_LEVEL', 1))
+GZIP_MIN_BYTES = 1024
+
+# Upper bound on the rows one page of a list endpoint may request
+MAX_PAGE_SIZE = 10_000
+
+# By default the server accepts traffic while artifacts load (endpoints answer 503
+# until their resources are ready); set to 1 to finish loading before serving.
+BLOCKING_STARTUP = os.environ.get('CHIMERA_BLOCKING_STARTUP') == '1'
 
 # --- App Startup Event ---
+def load_srae_model(path):
+    # Models saved before the preprocessor was bundled are a bare XGBRegressor
+    srae_data = joblib.load(path)
+    if not isinstance(srae_data, dict):
+        srae_data = {'model': srae_data, 'preprocessor': SRAEPreprocessor()}
+    return srae_data
+
+def load_compiled_artifact(path, preprocessor_class):
+    """A compiled model plus the preprocessor rebuilt from the config saved with it."""
+    model = load_compiled_model(path)
+    config = model.metadata.get('preprocessor')
+    return {'model': model, 'preprocessor': preprocessor_class.from_config(config) if config else preprocessor_class()}
+
+def load_ppo_model(path):
+    # stable_baselines3 pulls in torch, so it is only imported when the PPO model is really needed
+    from stable_baselines3 import PPO
+    return PPO.load(path)
+
+def register_artifacts():
+    """Creates the model registry and starts loading every artifact concurrently."""
+    global model_registry
+    model_registry = ModelRegistry()
+    if MODEL_RUNTIME == 'compiled' and os.path.exists(SRAE_COMPILED_FILE):
+        model_registry.register('srae_model', lambda: load_compiled_artifact(SRAE_COMPILED_FILE, SRAEPreprocessor))
+    else:
+        model_registry.register('srae_model', lambda: load_srae_model('models/srae_model.joblib'))
+    if MODEL_RUNTIME == 'compiled' and os.path.exists(DTDE_COMPILED_FILE):
+        model_registry.register('dtde_model', lambda: load_compiled_artifact(DTDE_COMPILED_FILE, DTDEPreprocessor))
+    else:
+        model_registry.register('dtde_model', lambda: joblib.load('models/dtde_model.joblib'))
+    # With an exported lookup table the PPO model (and torch) is only loaded on demand
+    has_lookup_file = APCE_LOOKUP_RESOLUTION > 0 and os.path.exists(APCE_LOOKUP_FILE)
+    model_registry.register('apce_model', lambda: load_ppo_model('models/apce_model.zip'), lazy=has_lookup_file)
+    model_registry.register('key_inventory', lambda: pd.read_csv(KEY_INVENTORY_FILE))
+    # A converted .arrow/.parquet store is memory-mapped in preference to the JSON
+    model_registry.register('access_logs', lambda: load_logs(resolve_log_path(ACCESS_LOGS_FILE)))
+    model_registry.start()
+
+def preload_resources():
+    """Loads and prepares every artifact in this process, before workers are forked from it."""
+    register_artifacts()
+    prepare_resources(start_tailer=False)
+
 @app.on_event("startup")
 def load_resources():
-    """Load all models and data into memory when the server starts."""
-    global srae_model, dtde_model, dtde_preprocessor, apce_model, key_inventory_df, access_logs_df
-    
-    # Load SRAE model
-    try:
-        srae_model = joblib.load('models/srae_model.joblib')
-        print("SRAE model loaded successfully!")
-    except FileNotFoundError:
-        print("Warning: SRAE model not found.")
+    """Start loading all models and data concurrently and prepare derived state in the background."""
+    if resources_ready.is_set():
+        # Preloaded by the prefork parent (src/api/prefork.py): this worker shares the
+        # parent's artifacts and only needs its own loader threads and log tailer
+        model_registry.after_fork()
+        start_log_tailer()
+        return
 
-    # Load DTDE model and preprocessor
-    try:
-        dtde_data = joblib.load('models/dtde_model.joblib')
-        dtde_model = dtde_data['model']
-        dtde_preprocessor = dtde_data['preprocessor']
-        print("DTDE model and preprocessor loaded successfully!")
-    except FileNotFoundError:
-        print("Warning: DTDE model not found.")
-
-    # Load APCE model
-    try:
-        apce_model = PPO.load('models/apce_model.zip')
-        print("APCE model loaded successfully!")
-    except FileNotFoundError:
-        print("Warning: APCE model not found.")
+    register_artifacts()
+    warm_up = threading.Thread(target=prepare_resources, daemon=True, name="resource-warm-up")
+    warm_up.start()
+    if BLOCKING_STARTUP:
+        warm_up.join()
 
-    # Load datasets into memory
-    try:
-        key_inventory_df = pd.read_csv('data/new_keys_to_predict.csv')
-        print(f"Loaded {len(key_inventory_df)} keys into memory.")
-    except FileNotFoundError:
-        print("Warning: Key inventory CSV not found.")
-        
+def start_log_tailer():
+    global log_tailer
+    if LOG_TAIL_FILE and access_log_buffer is not None:
+        log_tailer = NdjsonTailer(LOG_TAIL_FILE, lambda records: ingest_logs(pd.DataFrame(records)))
+        log_tailer.start()
+        print(f"Tailing new access logs from '{LOG_TAIL_FILE}'.")
+
+def prepare_resources(start_tailer=True):
+    """Publishes each artifact as soon as it has loaded and builds the state derived from it."""
+    global srae_model, srae_preprocessor, dtde_model, dtde_preprocessor, apce_model, key_inventory_df, access_log_buffer
+    global inventory_creation_dates, inventory_scored_age_days, startup_seconds
+    global anomaly_score_mean, anomaly_score_std, access_log_index, apce_lookup
+    global log_window_features, key_risk
+    start = time.perf_counter()
+    key_risk = KeyRiskTable(RISK_HALF_LIFE_HOURS)
     try:
-        access_logs_df = pd.read_json('data/kms_access_logs.json')
-        print(f"Loaded {len(access_logs_df)} logs into memory.")
-    except FileNotFoundError:
-        print("Warning: Access logs JSON not found.")
+        # SRAE model and key inventory
+        srae_data = model_registry.get('srae_model')
+        if srae_data is not None:
+            srae_preprocessor, srae_model = srae_data['preprocessor'], srae_data['model']
+        inventory = model_registry.get('key_inventory')
+        if inventory is not None:
+            inventory_creation_dates = pd.to_datetime(inventory['creation_date'], utc=True)
+            inventory_scored_age_days = np.full(len(inventory), -1)
+            key_inventory_df = inventory
+            if srae_model is not None:
+                rescored = refresh_inventory_scores()
+                print(f"Scored {rescored} inventory keys.")
+
+        # DTDE model and access logs: score every log once so pages are served from cache
+        dtde_data = model_registry.get('dtde_model')
+        access_logs_df = model_registry.get('access_logs')
+        if dtde_data is not None:
+            dtde_model, dtde_preprocessor = dtde_data['model'], dtde_data['preprocessor']
+            if getattr(dtde_preprocessor, 'window_features', False):
+                log_window_features = SlidingWindowFeatures()
+        if access_logs_df is not None and dtde_data is not None:
+            raw_scores = score_logs_raw(add_window_features(access_logs_df))
+            anomaly_score_mean = raw_scores.mean()
+            anomaly_score_std = raw_scores.std()
+            buffer = LogBuffer.from_frame(access_logs_df, raw_scores, normalize_anomaly_scores(raw_scores))
+            access_log_index = LogIndex.build(buffer)
+            with metrics.stage('key_risk_update', rows=len(buffer)):
+                key_risk.update_logs(buffer.column('key_id'), buffer.column('timestamp'), buffer.column('anomaly_score'))
+            access_log_buffer = buffer
+            print(f"Scored and indexed {len(access_log_buffer)} logs.")
+            if start_tailer:
+                start_log_tailer()
+
+        # APCE policy lookup table, falling back to the PPO model itself
+        if APCE_LOOKUP_RESOLUTION > 0 and os.path.exists(APCE_LOOKUP_FILE):
+            apce_lookup = ApceLookupTable.load(APCE_LOOKUP_FILE)
+        else:
+            apce_model = model_registry.get('apce_model')
+            if apce_model is not None and APCE_LOOKUP_RESOLUTION > 0:
+                apce_lookup = ApceLookupTable.from_model(apce_model, APCE_LOOKUP_RESOLUTION)
+        if apce_lookup is not None:
+            print(f"APCE lookup table ready ({apce_lookup.resolution} points).")
+    finally:
+        startup_seconds = round(time.perf_counter() - start, 3)
+        resources_ready.set()
+        for name, status in model_registry.status().items():
+            print(f"  {name}: {status['state']} ({status['load_seconds']} s)"
+                  + (f" - {status['error']}" if status['error'] else ""))
+        print(f"Resources ready after {startup_seconds} s.")
+
+@app.on_event("shutdown")
+def stop_background_tasks():
+    if log_tailer is not None:
+        log_tailer.stop()
+    if model_registry is not None:
+        model_registry.shutdown()
 
 # --- CORS Middleware ---
 origins = ["http://localhost:5173", "http://localhost:5174"]
@@ -74,6 +258,10 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(GZipMiddleware, minimum_size=GZIP_MIN_BYTES, compresslevel=GZIP_LEVEL)
+# Request latency by route; a request sent with an X-Chimera-Profile header gets a
+# Server-Timing header breaking its time down by stage (see src/components/metrics.py)
+app.add_middleware(RequestMetricsMiddleware, metrics=metrics)
 
 # --- Pydantic Models ---
 class KeyConfiguration(BaseModel):
@@ -94,121 +282,573 @@ class LogEntry(BaseModel):
     user_agent: str
     status: str
 
+class KeyConfigurationBatch(BaseModel):
+    keys: List[KeyConfiguration]
+
+class LogBatch(BaseModel):
+    logs: List[LogEntry]
+
 class RiskInput(BaseModel):
     vulnerability_score: Optional[float] = None
     anomaly_score: Optional[float] = None
 
-# --- SRAE Feature Engineering (as provided) ---
+class RiskInputBatch(BaseModel):
+    inputs: List[RiskInput]
+
+# --- SRAE Feature Engineering (shared with training via SRAEPreprocessor) ---
+SRAE_STREAM_CHUNK_SIZE = 1000
+
+def prepare_srae_frame(df_new: pd.DataFrame, now: Optional[datetime] = None):
+    """Vectorized SRAE feature engineering over a frame of raw key configurations."""
+    return srae_preprocessor.transform_array(df_new, now=now)
+
+def prepare_srae_batch(key_configs: List[KeyConfiguration]):
+    """Per-request fast path: KeyConfiguration objects straight into a feature matrix."""
+    return srae_preprocessor.transform_configs(key_configs)
+
 def prepare_srae_input(key_config: KeyConfiguration):
-    df_new = pd.DataFrame([key_config.dict()])
-    df_new['creation_date'] = pd.to_datetime(df_new['creation_date'])
-    now_utc = datetime.now(timezone.utc)
-    df_new['key_age_days'] = (now_utc - df_new['creation_date']).dt.days
-    df_new['is_hsm_backed'] = df_new['is_hsm_backed'].astype(int)
-    df_new['rotation_enabled'] = df_new['rotation_enabled'].astype(int)
-    df_new['has_wildcard'] = df_new['permission_policy'].apply(lambda x: 1 if '"*"' in x else 0)
-    df = pd.get_dummies(df_new, columns=['algorithm'], prefix='algo', dtype=int)
-    
-    all_feature_cols = [
-        'key_age_days', 'is_hsm_backed', 'rotation_enabled', 'has_wildcard', 
-        'algo_AES_256', 'algo_RSA_4096', 'algo_RSA_2048', 'algo_3DES'
+    return prepare_srae_batch([key_config])
+
+def score_srae_batch(key_configs: List[KeyConfiguration]):
+    """Scores many key configurations with a single XGBoost predict call."""
+    if not key_configs:
+        return []
+    features = prepare_srae_batch(key_configs)
+    with metrics.stage('srae_predict', rows=len(key_configs)):
+        scores = srae_model.predict(features)
+    return [
+        {"key_id": k.key_id, "predicted_vulnerability_score": int(s)}
+        for k, s in zip(key_configs, np.rint(scores))
     ]
-    # Reindex to ensure all columns are present, matching training
-    final_df = df.reindex(columns=all_feature_cols, fill_value=0)
-            
-    return final_df[all_feature_cols]
+
+async def run_scoring(func, *args):
+    """Runs a CPU-bound scoring call on the scoring pool, off the event loop."""
+    # Carry the request's context along so its profiled stages are still attributed to it
+    context = contextvars.copy_context()
+    return await asyncio.get_running_loop().run_in_executor(scoring_executor, context.run, func, *args)
+
+def score_srae_items(key_configs: List[KeyConfiguration]):
+    """
+    score_srae_batch for the micro-batcher. When a creation_date does not parse,
+    that key gets an HTTPException(400) in its place and the rest are still scored,
+    so one bad request never fails the others sharing its batch.
+    """
+    try:
+        return score_srae_batch(key_configs)
+    except ValueError:
+        invalid = {}
+        for i, key_config in enumerate(key_configs):
+            try:
+                SRAEPreprocessor.parse_date(key_config.creation_date)
+            except ValueError as e:
+                invalid[i] = HTTPException(status_code=400, detail=f"Invalid creation_date: {e}")
+        if not invalid:
+            raise
+    scored = iter(score_srae_batch([k for i, k in enumerate(key_configs) if i not in invalid]))
+    return [invalid[i] if i in invalid else next(scored) for i in range(len(key_configs))]
+
+srae_batcher = MicroBatcher(
+    score_srae_items, scoring_executor,
+    max_batch_size=MAX_MICRO_BATCH, max_wait=BATCH_WINDOW_MS / 1000, max_concurrent_batches=SCORING_WORKERS,
+)
+
+# --- Inventory Score Maintenance ---
+def refresh_inventory_scores():
+    """
+    Brings the inventory's vulnerability_score column up to date. Only rows whose
+    configuration changed (scored age reset to -1) or whose key_age_days crossed a
+    day boundary since they were last scored are sent through the model, in one
+    vectorized predict call. Returns the number of rescored keys.
+    """
+    global key_inventory_df, inventory_version
+    with inventory_lock:
+        now_utc = datetime.now(timezone.utc)
+        current_age_days = (now_utc - inventory_creation_dates).dt.days.to_numpy()
+        stale = current_age_days != inventory_scored_age_days
+        n_stale = int(stale.sum())
+        metrics.inc('chimera_cache_lookups_total', len(stale) - n_stale, cache='inventory_scores', result='hit')
+        metrics.inc('chimera_cache_lookups_total', n_stale, cache='inventory_scores', result='miss')
+        if not n_stale:
+            return 0
+
+        features = prepare_srae_frame(key_inventory_df[stale], now=now_utc)
+        with metrics.stage('srae_predict', rows=n_stale):
+            scores = srae_model.predict(features)
+        new_scores = np.rint(scores).astype(int)
+        if 'vulnerability_score' not in key_inventory_df:
+            key_inventory_df['vulnerability_score'] = 0
+            inventory_version += 1
+        # Ages tick over daily for some key in a large inventory; only a changed score changes the response
+        if not np.array_equal(key_inventory_df.loc[stale, 'vulnerability_score'].to_numpy(), new_scores):
+            key_inventory_df.loc[stale, 'vulnerability_score'] = new_scores
+            inventory_version += 1
+        inventory_scored_age_days[stale] = current_age_days[stale]
+        with metrics.stage('key_risk_update', rows=n_stale):
+            key_risk.update_vulnerability(key_inventory_df.loc[stale, 'key_id'].to_numpy(), new_scores)
+        return n_stale
+
+def upsert_inventory_key(key_config: KeyConfiguration):
+    """
+    Adds or replaces a key's configuration and marks it for rescoring. The
+    creation_date is parsed first: a ValueError leaves the inventory untouched.
+    """
+    global key_inventory_df, inventory_creation_dates, inventory_scored_age_days, inventory_version
+    creation_date = pd.to_datetime(SRAEPreprocessor.parse_date(key_config.creation_date), utc=True)
+    with inventory_lock:
+        record = key_config.dict()
+        matches = np.flatnonzero(key_inventory_df['key_id'].to_numpy() == key_config.key_id)
+        if len(matches):
+            row = key_inventory_df.index[matches[0]]
+            for column, value in record.items():
+                key_inventory_df.at[row, column] = value
+            inventory_creation_dates.at[row] = creation_date
+            inventory_scored_age_days[matches[0]] = -1
+        else:
+            if 'vulnerability_score' in key_inventory_df:
+                record['vulnerability_score'] = 0
+            key_inventory_df = pd.concat([key_inventory_df, pd.DataFrame([record])], ignore_index=True)
+            inventory_creation_dates = pd.concat([
+                inventory_creation_dates,
+                pd.Series([creation_date], index=key_inventory_df.index[-1:], dtype=inventory_creation_dates.dtype),
+            ])
+            inventory_scored_age_days = np.append(inventory_scored_age_days, -1)
+        inventory_version += 1
+
+# --- DTDE Scoring ---
+def score_logs_raw(df: pd.DataFrame, chunk_size: int = DTDE_SCORE_CHUNK_SIZE):
+    """Raw IsolationForest scores for df, transformed and scored chunk by chunk to bound memory."""
+    raw_scores = np.empty(len(df))
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+        with metrics.stage('dtde_transform', rows=len(chunk)):
+            features = dtde_preprocessor.transform(chunk)
+        with metrics.stage('dtde_score_samples', rows=len(chunk)):
+            raw_scores[start:start + len(chunk)] = dtde_model.score_samples(features)
+    return raw_scores
+
+def normalize_anomaly_scores(raw_scores):
+    """
+    Scales raw scores to a 0-100 range using the mean/std of the whole log
+    dataset, so a log's score does not depend on which page it is served in.
+    """
+    # Normalize using a Z-score-like approach, then scale to 0-100. IsolationForest
+    # gives anomalies *lower* raw scores, so the deviation is flipped to make
+    # higher anomaly scores mean more anomalous.
+    with metrics.stage('dtde_normalize', rows=len(raw_scores)):
+        if anomaly_score_std > 0:
+            normalized_scores = 50 + (anomaly_score_mean - raw_scores) / anomaly_score_std * 25
+        else:
+            normalized_scores = np.full(len(raw_scores), 50.0) # Handle case with no deviation
+        return np.clip(normalized_scores, 0, 100).round().astype(int)
+
+def add_window_features(df: pd.DataFrame):
+    """Attaches the live sliding-window counters to df when the DTDE model uses them."""
+    if log_window_features is None:
+        return df
+    return pd.concat([df, log_window_features.transform(df)], axis=1)
+
+def ingest_logs(df_new: pd.DataFrame):
+    """Scores only the new rows and appends them to the log buffer."""
+    raw_scores = score_logs_raw(add_window_features(df_new))
+    normalized_scores = normalize_anomaly_scores(raw_scores)
+    with metrics.stage('log_append', rows=len(df_new)):
+        start = access_log_buffer.append(df_new, raw_scores, normalized_scores)
+    with metrics.stage('log_index_update', rows=len(df_new)):
+        access_log_index.update(access_log_buffer)
+    with metrics.stage('key_risk_update', rows=len(df_new)):
+        stop = start + len(df_new)
+        key_risk.update_logs(access_log_buffer.column('key_id')[start:stop],
+                             access_log_buffer.column('timestamp')[start:stop], normalized_scores)
+    return len(df_new)
 
 # --- API Endpoints ---
 @app.get("/")
 def read_root():
     return {"message": "Project Chimera API is running."}
 
+@app.get("/models/status")
+def get_models_status():
+    """Per-artifact load state and timings, plus whether startup preparation has finished."""
+    return {
+        "ready": resources_ready.is_set(),
+        "startup_seconds": startup_seconds,
+        "artifacts": model_registry.status() if model_registry is not None else {},
+    }
+
+@app.get("/ready")
+def get_readiness():
+    if not resources_ready.is_set():
+        raise HTTPException(status_code=503, detail="Resources are still loading.")
+    return {"ready": True}
+
+def artifact_load_seconds():
+    statuses = model_registry.status() if model_registry is not None else {}
+    return [({'artifact': name}, status['load_seconds']) for name, status in statuses.items()
+            if status['load_seconds'] is not None]
+
+def artifact_ready():
+    statuses = model_registry.status() if model_registry is not None else {}
+    return [({'artifact': name}, int(status['state'] == 'ready')) for name, status in statuses.items()]
+
+metrics.describe('chimera_stage_seconds', "Time spent in each hot-path stage.")
+metrics.describe('chimera_stage_rows_total', "Rows processed by each hot-path stage.")
+metrics.describe('chimera_http_request_seconds', "Request latency by route, method and status.")
+metrics.describe('chimera_cache_lookups_total', "Precomputed-result lookups by cache and hit/miss.")
+metrics.gauge('chimera_artifact_load_seconds', artifact_load_seconds)
+metrics.gauge('chimera_artifact_ready', artifact_ready)
+metrics.gauge('chimera_startup_seconds', lambda: [({}, startup_seconds)] if startup_seconds is not None else [])
+metrics.gauge('chimera_scored_logs', lambda: [({}, len(access_log_buffer))] if access_log_buffer is not None else [])
+metrics.gauge('chimera_inventory_keys', lambda: [({}, len(key_inventory_df))] if key_inventory_df is not None else [])
+
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Prometheus text exposition of stage timings, request latencies, cache hits and load times."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+# --- Response Encoding ---
+def check_format(format: str):
+    if format not in FORMATS:
+        raise HTTPException(status_code=400, detail=f"format must be one of {FORMATS}.")
+
+def encode_records(df: pd.DataFrame, format: str, key: str, **extra):
+    """Encoded body for the json and arrow formats."""
+    with metrics.stage('serialize_records', rows=len(df)):
+        return encode_json(df, key, **extra) if format == 'json' else encode_arrow(df)
+
+def records_response(df: pd.DataFrame, format: str, key: str, headers: Optional[dict] = None, **extra):
+    """
+    Rows of df as {key: [records], **extra} JSON, an Arrow IPC stream or streamed
+    NDJSON. For arrow and ndjson, extra values are sent as X-<Name> headers.
+    """
+    if format != 'json':
+        headers = {**(headers or {}), **{f"X-{name.replace('_', '-').title()}": str(value)
+                                         for name, value in extra.items() if value is not None}}
+    if format == 'ndjson':
+        return StreamingResponse(iter_ndjson(df), media_type=MEDIA_TYPES['ndjson'], headers=headers)
+    return Response(encode_records(df, format, key, **extra), media_type=MEDIA_TYPES[format], headers=headers)
+
+def etag_matches(request: Request, etag: str):
+    if_none_match = request.headers.get('if-none-match')
+    if if_none_match is None:
+        return False
+    return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+
 # SRAE Endpoints
 @app.get("/keys/inventory")
-def get_key_inventory():
+def get_key_inventory(request: Request, format: str = "json"):
+    """
+    The scored key inventory as JSON (default), NDJSON or Arrow IPC. Responses
+    carry an ETag; polling with If-None-Match returns 304 until a score or key
+    configuration changes.
+    """
+    check_format(format)
+    if key_inventory_df is None:
+        raise HTTPException(status_code=404, detail="Key inventory data not loaded.")
+    encoding = 'gzip' if 'gzip' in request.headers.get('accept-encoding', '') else 'identity'
+    # The body is built from the same inventory state as the version it is tagged with
+    with inventory_lock:
+        if srae_model is not None:
+            with metrics.stage('inventory_refresh'):
+                refresh_inventory_scores()
+        version = inventory_version
+        # gzip and identity bodies are different representations, so they get different tags
+        etag = f'"inventory-{version}-{format}{"-gzip" if encoding == "gzip" else ""}"'
+        if etag_matches(request, etag):
+            metrics.inc('chimera_cache_lookups_total', cache='inventory_response', result='not_modified')
+            return Response(status_code=304, headers={"ETag": etag, "Vary": "Accept-Encoding"})
+        if format == 'ndjson':
+            # Streamed after the lock is released, so it streams a snapshot; GZipMiddleware
+            # compresses the stream and adds Vary itself
+            return records_response(key_inventory_df.copy(), format, "keys", headers={"ETag": etag})
+
+        # Cached per format and content encoding, so an unchanged inventory is never
+        # re-encoded or re-compressed (GZipMiddleware passes encoded responses through)
+        cached = inventory_response_cache.get((format, encoding))
+        if cached is not None and cached[0] == version:
+            metrics.inc('chimera_cache_lookups_total', cache='inventory_response', result='hit')
+            body = cached[1]
+        else:
+            metrics.inc('chimera_cache_lookups_total', cache='inventory_response', result='miss')
+            body = encode_records(key_inventory_df, format, "keys")
+            if encoding == 'gzip':
+                with metrics.stage('gzip', rows=len(key_inventory_df)):
+                    body = gzip.compress(body, GZIP_LEVEL)
+            inventory_response_cache[(format, encoding)] = (version, body)
+    headers = {"ETag": etag}
+    if encoding == 'gzip':
+        headers["Content-Encoding"] = "gzip"
+    # GZipMiddleware adds Vary to the uncompressed bodies it would have compressed
+    if encoding == 'gzip' or len(body) < GZIP_MIN_BYTES:
+        headers["Vary"] = "Accept-Encoding"
+    return Response(body, media_type=MEDIA_TYPES[format], headers=headers)
+
+@app.put("/keys/inventory/{key_id}")
+def put_inventory_key(key_id: str, key_config: KeyConfiguration):
     if key_inventory_df is None:
         raise HTTPException(status_code=404, detail="Key inventory data not loaded.")
-    return {"keys": key_inventory_df.to_dict(orient='records')}
+    if key_config.key_id != key_id:
+        raise HTTPException(status_code=400, detail="key_id in path and body do not match.")
+    # One critical section, so no reader sees the new configuration with its old score
+    with inventory_lock:
+        try:
+            upsert_inventory_key(key_config)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=f"Invalid creation_date: {e}")
+        if srae_model is not None:
+            refresh_inventory_scores()
+    return {"key_id": key_id, "status": "updated"}
+
+# Per-Key Risk Endpoints
+def policy_actions(risks):
+    """APCE recommendations for composite risk values, or None when no policy is loaded."""
+    if apce_model is None and apce_lookup is None:
+        return None
+    with metrics.stage('apce_policy', rows=len(risks)):
+        actions = apce_lookup.predict(risks) if apce_lookup is not None else predict_actions(apce_model, risks)
+    return [ACTION_MAP.get(int(action), "UNKNOWN") for action in actions]
+
+def refresh_key_risk():
+    """Rescoring inventory keys whose age crossed a day boundary keeps their vulnerability current."""
+    if srae_model is not None and key_inventory_df is not None:
+        with metrics.stage('inventory_refresh'):
+            refresh_inventory_scores()
+
+@app.get("/keys/riskiest")
+def get_riskiest_keys(n: int = Query(50, ge=1, le=MAX_PAGE_SIZE), format: str = "json",
+                      as_of: Optional[datetime] = None):
+    """
+    The n keys with the highest composite risk as of `as_of` (default: now), each
+    with its vulnerability score, decayed log anomaly score and (when the APCE
+    policy is loaded) recommended action.
+    """
+    check_format(format)
+    refresh_key_risk()
+    with metrics.stage('key_risk_rank', rows=n):
+        df = key_risk.top(n, now=as_of)
+    actions = policy_actions(df['composite_risk'].to_numpy(dtype=np.float32))
+    if actions is not None:
+        df['recommended_action'] = actions
+    return records_response(df, format, "keys", total_keys=len(key_risk))
+
+@app.get("/keys/{key_id}/risk")
+def get_key_risk(key_id: str, as_of: Optional[datetime] = None):
+    """
+    A key's materialized risk: its SRAE vulnerability score, the anomaly scores of
+    its logs averaged with an exponential decay (half-life CHIMERA_RISK_HALF_LIFE_HOURS)
+    and decayed further for the time since its last log, as of `as_of` (default:
+    now), and their composite risk.
+    """
+    refresh_key_risk()
+    record = key_risk.get(key_id, now=as_of)
+    if record is None:
+        raise HTTPException(status_code=404, detail="No vulnerability score or logs for this key.")
+    actions = policy_actions(np.array([record["composite_risk"]], dtype=np.float32))
+    if actions is not None:
+        record["recommended_action"] = actions[0]
+    return record
 
 @app.post("/predict_vulnerability")
-def predict_vulnerability(key_config: KeyConfiguration):
+async def predict_vulnerability(key_config: KeyConfiguration):
+    """Scored together with any requests arriving in the same micro-batch window."""
     if srae_model is None:
         raise HTTPException(status_code=503, detail="SRAE model not loaded.")
-    prepared_data = prepare_srae_input(key_config)
-    score = srae_model.predict(prepared_data)
-    return {"predicted_vulnerability_score": round(score[0])}
+    with metrics.stage('srae_micro_batch'):
+        result = await srae_batcher.submit(key_config)
+    return {"predicted_vulnerability_score": result["predicted_vulnerability_score"]}
+
+@app.post("/predict_vulnerability/batch")
+async def predict_vulnerability_batch(batch: KeyConfigurationBatch):
+    """
+    Scores a whole list of key configurations in one vectorized model call.
+    Any unparseable creation_date rejects the batch with a 400 naming the bad entries.
+    """
+    if srae_model is None:
+        raise HTTPException(status_code=503, detail="SRAE model not loaded.")
+    scores = await run_scoring(score_srae_items, batch.keys)
+    errors = [f"keys[{i}]: {result.detail}" for i, result in enumerate(scores) if isinstance(result, HTTPException)]
+    if errors:
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+    return {"scores": scores}
+
+def parse_stream_line(line: bytes, line_number: int):
+    """A KeyConfiguration for one NDJSON line, or an error record naming the line."""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return {"line": line_number, "error": f"invalid JSON: {e}"}
+    if not isinstance(record, dict):
+        return {"line": line_number, "error": "expected a JSON object"}
+    try:
+        key_config = KeyConfiguration(**record)
+    except ValidationError as e:
+        errors = [".".join(str(part) for part in error["loc"]) + ": " + error["msg"] for error in e.errors()]
+        return {"line": line_number, "error": "; ".join(errors)}
+    # Checked here so one bad date cannot fail the chunk it is scored with
+    try:
+        SRAEPreprocessor.parse_date(key_config.creation_date)
+    except ValueError as e:
+        return {"line": line_number, "error": f"creation_date: {e}"}
+    return key_config
+
+async def score_stream_entries(entries):
+    """NDJSON for parsed lines in order: scored keys, with error records left in place."""
+    configs = [entry for entry in entries if isinstance(entry, KeyConfiguration)]
+    scored = iter(await run_scoring(score_srae_batch, configs)) if configs else iter(())
+    return "".join(json.dumps(next(scored) if isinstance(entry, KeyConfiguration) else entry) + "\n"
+                   for entry in entries)
+
+class BodyStreamingResponse(StreamingResponse):
+    """
+    A StreamingResponse whose iterator reads the request body as it goes. The base
+    class listens for a disconnect on `receive` while streaming (ASGI < 2.4), which
+    would swallow the body messages the iterator is waiting for; here a disconnect
+    surfaces through request.stream() or the failing send instead.
+    """
+    async def __call__(self, scope, receive, send):
+        await self.stream_response(send)
+
+@app.post("/predict_vulnerability/stream")
+async def predict_vulnerability_stream(request: Request):
+    """
+    Scores an NDJSON body (one KeyConfiguration per line) incrementally, so
+    very large inventories never have to be parsed as a single JSON document.
+    Lines are scored in chunks of SRAE_STREAM_CHUNK_SIZE as the body arrives and
+    each chunk's results are sent as NDJSON as soon as it is scored, in input
+    order. A line that is not valid JSON, not a valid KeyConfiguration or has an
+    unparseable creation_date yields {"line": <1-based line number>, "error": ...}
+    in its place.
+    """
+    if srae_model is None:
+        raise HTTPException(status_code=503, detail="SRAE model not loaded.")
+
+    async def scored_chunks():
+        pending, buffer, line_number = [], b"", 0
+        async for body_chunk in request.stream():
+            buffer += body_chunk
+            *lines, buffer = buffer.split(b"\n")
+            for line in lines:
+                line_number += 1
+                if line.strip():
+                    pending.append(parse_stream_line(line, line_number))
+                if len(pending) >= SRAE_STREAM_CHUNK_SIZE:
+                    yield await score_stream_entries(pending)
+                    pending = []
+        if buffer.strip():
+            pending.append(parse_stream_line(buffer, line_number + 1))
+        if pending:
+            yield await score_stream_entries(pending)
+
+    return BodyStreamingResponse(scored_chunks(), media_type="application/x-ndjson")
 
 # DTDE Endpoint
 @app.get("/logs/scored")
-def get_scored_logs(page: int = 1, limit: int = 50):
-    if dtde_model is None or dtde_preprocessor is None or access_logs_df is None:
+def get_scored_logs(page: int = Query(1, ge=1), limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+                    format: str = "json"):
+    """One page of scored logs as JSON (default), NDJSON or Arrow IPC."""
+    check_format(format)
+    if access_log_buffer is None:
         raise HTTPException(status_code=503, detail="DTDE resources or log data not loaded.")
 
-    total_logs = len(access_logs_df)
+    total_logs = len(access_log_buffer)
     total_pages = math.ceil(total_logs / limit)
     start_index = (page - 1) * limit
     end_index = start_index + limit
-    
-    df_page = access_logs_df.iloc[start_index:end_index]
-    if df_page.empty:
-        return {"logs": [], "total_pages": total_pages, "current_page": page}
-
-    prepared_data = dtde_preprocessor.transform(df_page)
-    raw_scores = dtde_model.score_samples(prepared_data)
-    
-    # A more balanced normalization: scale scores to a 0-100 range
-    # We'll establish a baseline and scale based on deviation from the mean
-    mean_score = raw_scores.mean()
-    std_dev = raw_scores.std()
-    
-    # Normalize using a Z-score-like approach, then scale to 0-100
-    # This centers the "average" log around a score of 20-30
-    if std_dev > 0:
-        normalized_scores = 50 + (raw_scores - mean_score) / std_dev * 25
-    else:
-        normalized_scores = pd.Series([50] * len(raw_scores)) # Handle case with no deviation
-        
-    final_scores = pd.Series(normalized_scores).clip(0, 100).round().astype(int)
-    
-    df_page = df_page.assign(anomaly_score=final_scores.values)
-    
-    return {"logs": df_page.to_dict(orient='records'), "total_pages": total_pages, "current_page": page}
-
-# APCE Endpoint
+
+    # Scores were computed when the logs were loaded or ingested; a page is just a slice
+    with metrics.stage('log_slice'):
+        df_page = access_log_buffer.frame(start_index, end_index)
+    return records_response(df_page, format, "logs", total_pages=total_pages, current_page=page)
+
+def to_utc_datetime64(value: Optional[datetime]):
+    if value is None:
+        return None
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc).replace(tzinfo=None)
+    return np.datetime64(value, 'ns')
+
+@app.get("/logs/search")
+def search_scored_logs(key_id: Optional[str] = None, user_id: Optional[str] = None,
+                       action: Optional[str] = None, status: Optional[str] = None,
+                       start_time: Optional[datetime] = None, end_time: Optional[datetime] = None,
+                       min_score: Optional[int] = None, sort: str = "position",
+                       cursor: Optional[str] = None, limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+                       format: str = "json"):
+    """
+    Filtered, keyset-paginated view of the scored logs backed by LogIndex.
+    sort='position' returns logs in storage order, sort='score' most anomalous
+    first. Pass the returned next_cursor to fetch the following page.
+    """
+    check_format(format)
+    if access_log_index is None:
+        raise HTTPException(status_code=503, detail="DTDE resources or log data not loaded.")
+    if sort not in ("position", "score"):
+        raise HTTPException(status_code=400, detail="sort must be 'position' or 'score'.")
+
+    try:
+        with metrics.stage('log_index_query'):
+            positions, next_cursor = access_log_index.query(
+                access_log_buffer,
+                filters={'key_id': key_id, 'user_id': user_id, 'action': action, 'status': status},
+                min_score=min_score,
+                start_time=to_utc_datetime64(start_time),
+                end_time=to_utc_datetime64(end_time),
+                order=sort,
+                cursor=cursor,
+                limit=limit,
+            )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor.")
+    with metrics.stage('log_slice'):
+        df_page = access_log_buffer.take(positions)
+    return records_response(df_page, format, "logs", next_cursor=next_cursor)
+
+@app.get("/logs/top_anomalous")
+def get_top_anomalous_logs(n: int = Query(50, ge=1, le=MAX_PAGE_SIZE), format: str = "json"):
+    return search_scored_logs(sort="score", limit=n, format=format)
+
+@app.post("/logs/ingest")
+async def post_ingest_logs(batch: LogBatch):
+    """Appends new access logs; they are scored on arrival and served by /logs/scored immediately."""
+    if access_log_buffer is None:
+        raise HTTPException(status_code=503, detail="DTDE resources or log data not loaded.")
+    if not batch.logs:
+        return {"ingested": 0, "total_logs": len(access_log_buffer)}
+    ingested = await run_scoring(ingest_logs, pd.DataFrame([log.dict() for log in batch.logs]))
+    return {"ingested": ingested, "total_logs": len(access_log_buffer)}
+
+# APCE Endpoints
+def recommend_actions(risk_inputs: List[RiskInput]):
+    """Composite risk for each input, then one table lookup or one policy forward pass for all of them."""
+    risks = composite_risk(
+        [np.nan if r.vulnerability_score is None else r.vulnerability_score for r in risk_inputs],
+        [np.nan if r.anomaly_score is None else r.anomaly_score for r in risk_inputs],
+    )
+    metrics.inc('chimera_cache_lookups_total', len(risk_inputs), cache='apce_lookup',
+                result='hit' if apce_lookup is not None else 'miss')
+    return policy_actions(risks)
+
+apce_batcher = MicroBatcher(
+    recommend_actions, scoring_executor,
+    max_batch_size=MAX_MICRO_BATCH, max_wait=BATCH_WINDOW_MS / 1000, max_concurrent_batches=SCORING_WORKERS,
+)
+
 @app.post("/get_action")
 async def get_action(risk_input: RiskInput):
     """
     Determines the recommended security action based on a composite risk score.
     The composite score is derived from an optional vulnerability score and an
-    optional anomaly score.
+    optional anomaly score. Concurrent requests share one policy evaluation.
     """
-    if apce_model is None:
+    if apce_model is None and apce_lookup is None:
         raise HTTPException(status_code=503, detail="APCE model not loaded.")
+    with metrics.stage('apce_micro_batch'):
+        return {"recommended_action": await apce_batcher.submit(risk_input)}
 
-    # Normalize scores to a 0.0-1.0 scale, as expected by the training environment
-    vuln_norm = (risk_input.vulnerability_score / 10.0) if risk_input.vulnerability_score is not None else 0.0
-    anom_norm = (risk_input.anomaly_score / 100.0) if risk_input.anomaly_score is not None else 0.0
-
-    # If one score is present, use it directly. If both, use a weighted average.
-    if vuln_norm > 0 and anom_norm == 0:
-        composite_risk = vuln_norm
-    elif anom_norm > 0 and vuln_norm == 0:
-        composite_risk = anom_norm
-    else:
-        # Combine scores: vulnerability is static (weight 0.4), anomaly is dynamic (weight 0.6)
-        composite_risk = (vuln_norm * 0.4) + (anom_norm * 0.6)
-    
-    # The observation must be a numpy array, clipped to ensure it's within [0, 1]
-    obs = np.array([composite_risk], dtype=np.float32).clip(0, 1)
-
-    action, _ = apce_model.predict(obs, deterministic=True)
-    
-    action_map = {
-        0: "NO_OP",
-        1: "ALERT_SOC",
-        2: "FORCE_ROTATE_KEY",
-        3: "RESTRICT_PERMISSIONS",
-        4: "QUARANTINE_KEY"
-    }
-    
-    return {"recommended_action": action_map.get(int(action), "UNKNOWN")}
\ No newline at end of file
+@app.post("/get_action/batch")
+async def get_action_batch(batch: RiskInputBatch):
+    """Recommended actions for many risk inputs in a single policy evaluation."""
+    if apce_model is None and apce_lookup is None:
+        raise HTTPException(status_code=503, detail="APCE model not loaded.")
+    if not batch.inputs:
+        return {"recommended_actions": []}
+    return {"recommended_actions": await run_scoring(recommend_actions, batch.inputs)}
@@ -0,0 +1,66 @@
+import argparse
+import gc
+import os
+import signal
+import socket
+import sys
+import uvicorn
+from src.api import main_api
+
+# Prefork server: artifacts are loaded and scored once in this parent process,
+# then worker processes are forked from it. Workers share the parent's models,
+# inventory and log buffer copy-on-write and accept on one listening socket.
+#
+#   PYTHONPATH=. python -m src.api.prefork --workers 4 --port 8000
+#
+# Writes (/logs/ingest, PUT /keys/inventory) only reach the worker that served
+# them; use CHIMERA_LOG_TAIL_FILE, which every worker tails, to feed new logs.
+# --no-preload makes every worker load its own copy (what `uvicorn --workers N` does),
+# for comparing memory use.
+
+def bind_socket(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+    return sock
+
+def serve(host, port, workers, preload=True):
+    if preload:
+        main_api.preload_resources()
+        # Keep the collector away from everything loaded so far: a GC pass in a worker
+        # would otherwise write to (and so un-share) every tracked object's page
+        gc.collect()
+        gc.freeze()
+
+    sock = bind_socket(host, port)
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            uvicorn.Server(uvicorn.Config(main_api.app, log_level="warning")).run(sockets=[sock])
+            sys.stdout.flush()
+            os._exit(0)
+        children.append(pid)
+    print(f"Serving on http://{host}:{port} with {workers} workers (pids {children}, preload={preload}).")
+
+    def stop_workers(signum, frame):
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+    signal.signal(signal.SIGTERM, stop_workers)
+    signal.signal(signal.SIGINT, stop_workers)
+    for pid in children:
+        os.waitpid(pid, 0)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the Chimera API from forked workers sharing loaded artifacts.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--no-preload', action='store_true', help="Let every worker load its own artifacts.")
+    args = parser.parse_args()
+    serve(args.host, args.port, args.workers, preload=not args.no_preload)
@@ -0,0 +1,71 @@
+import os
+import sys
+import time
+import numpy as np
+from stable_baselines3 import PPO
+from stable_baselines3.common.env_util import make_vec_env
+from stable_baselines3.common.vec_env import DummyVecEnv, SubprocVecEnv
+from src.components.apce_policy import predict_actions
+from src.components.kms_env import KmsEnv, VecKmsEnv, REWARD_TABLE, RISK_BAND_EDGES
+
+# --- Configuration ---
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '../../models/apce_model.zip')
+ENV_STEPS = 100_000
+TRAIN_TIMESTEPS = 50_000
+N_ENVS = 16
+ROLLOUT_STEPS = 2048
+
+def policy_quality(model):
+    """Mean immediate reward of the deterministic policy over a fine grid of risk values."""
+    grid = np.linspace(0, 1, 1001, dtype=np.float32)
+    return REWARD_TABLE[np.digitize(grid, RISK_BAND_EDGES), predict_actions(model, grid)].mean()
+
+def single_env_steps_per_sec(n_steps):
+    env = KmsEnv()
+    env.reset()
+    actions = np.random.randint(0, 5, n_steps)
+    start = time.perf_counter()
+    for action in actions:
+        _, _, terminated, _, _ = env.step(action)
+        if terminated:
+            env.reset()
+    return n_steps / (time.perf_counter() - start)
+
+def vec_env_steps_per_sec(env, n_steps):
+    env.reset()
+    n_calls = max(n_steps // env.num_envs, 1)
+    actions = np.random.randint(0, 5, (n_calls, env.num_envs))
+    start = time.perf_counter()
+    for batch in actions:
+        env.step(batch)
+    elapsed = time.perf_counter() - start
+    env.close()
+    return n_calls * env.num_envs / elapsed
+
+def train(env, label):
+    n_steps = max(ROLLOUT_STEPS // getattr(env, 'num_envs', 1), 1)
+    model = PPO('MlpPolicy', env, n_steps=n_steps, verbose=0, seed=0)
+    start = time.perf_counter()
+    model.learn(total_timesteps=TRAIN_TIMESTEPS)
+    elapsed = time.perf_counter() - start
+    print(f"{label:>28}: {elapsed:6.1f} s for {TRAIN_TIMESTEPS} timesteps, policy quality {policy_quality(model):.3f}")
+    env.close()
+
+def run_benchmark(include_training):
+    print("--- KmsEnv Stepping Throughput ---")
+    print(f"{'KmsEnv (python loop)':>28}: {single_env_steps_per_sec(ENV_STEPS):>12,.0f} steps/s")
+    print(f"{f'DummyVecEnv x{N_ENVS}':>28}: {vec_env_steps_per_sec(DummyVecEnv([KmsEnv] * N_ENVS), ENV_STEPS):>12,.0f} steps/s")
+    print(f"{f'SubprocVecEnv x{N_ENVS}':>28}: "
+          f"{vec_env_steps_per_sec(make_vec_env(KmsEnv, n_envs=N_ENVS, vec_env_cls=SubprocVecEnv), ENV_STEPS):>12,.0f} steps/s")
+    for n_envs in (N_ENVS, 1024):
+        print(f"{f'VecKmsEnv x{n_envs}':>28}: {vec_env_steps_per_sec(VecKmsEnv(n_envs), ENV_STEPS * 10):>12,.0f} steps/s")
+
+    if include_training:
+        print("\n--- PPO Training Wall-Clock ---")
+        print(f"{'current models/apce_model':>28}: policy quality {policy_quality(PPO.load(MODEL_FILE)):.3f}")
+        train(KmsEnv(), 'KmsEnv')
+        train(VecKmsEnv(N_ENVS, seed=0), f'VecKmsEnv x{N_ENVS}')
+
+# Pass --no-train to only measure environment stepping.
+if __name__ == "__main__":
+    run_benchmark(include_training='--no-train' not in sys.argv)
@@ -0,0 +1,185 @@
+import argparse
+import asyncio
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import httpx
+import numpy as np
+from src.components.generate_dataset import generate_records
+from src.components.generate_logs import generate_logs_at_scale
+
+# End-to-end benchmark of the API's hot paths: starts `src.api.main_api:app` under
+# uvicorn on synthetic data of the requested size, replays traffic against each
+# endpoint at a fixed concurrency and reports latency percentiles, throughput and
+# the server's memory. Results are compared with the stored baseline for the same
+# profile (dataset sizes + concurrency); regressions beyond the tolerances fail the run.
+#
+#   PYTHONPATH=. python -m src.benchmarks.api_benchmark --keys 1000 --logs 10000 --concurrency 16
+#   PYTHONPATH=. python -m src.benchmarks.api_benchmark --save-baseline
+#
+# Baselines are only meaningful on the machine that recorded them (its CPU count and
+# Python version are stored alongside and a mismatch is reported).
+
+# --- Configuration ---
+PORT = 8767
+READY_TIMEOUT = 300
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baselines/api_benchmark.json')
+# A run regresses when p95 latency grows, or throughput drops, by more than these factors
+LATENCY_TOLERANCE = 1.5
+THROUGHPUT_TOLERANCE = 1.5
+RSS_TOLERANCE = 1.25
+LOGS_PAGE_SIZE = 50
+
+def write_datasets(workdir, n_keys, n_logs):
+    """Synthetic key inventory (CSV) and access logs (Parquet) in the API's input formats."""
+    keys = generate_records(n_keys, seed=0)
+    keys['creation_date'] = keys['creation_date'].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    inventory_file = os.path.join(workdir, 'keys.csv')
+    keys.to_csv(inventory_file, index=False)
+    logs_file = os.path.join(workdir, 'logs.parquet')
+    generate_logs_at_scale(n_logs, logs_file, seed=0, workers=1)
+    return inventory_file, logs_file, keys.to_dict(orient='records')
+
+def build_scenarios(key_configs, n_logs):
+    """(name, method, path, request builder) per endpoint; builders vary the payload by request index."""
+    pages = max(1, n_logs // LOGS_PAGE_SIZE)
+    return [
+        ('predict_vulnerability', 'POST', lambda i: ('/predict_vulnerability', key_configs[i % len(key_configs)])),
+        ('logs_scored', 'GET', lambda i: (f'/logs/scored?page={i * 7919 % pages + 1}&limit={LOGS_PAGE_SIZE}', None)),
+        ('get_action', 'POST', lambda i: ('/get_action', {'vulnerability_score': i % 11, 'anomaly_score': i * 37 % 101})),
+        ('keys_inventory', 'GET', lambda i: ('/keys/inventory', None)),
+    ]
+
+def process_memory_mb(pid):
+    """Current and peak resident set size of a process, from /proc."""
+    values = {}
+    with open(f'/proc/{pid}/status') as f:
+        for line in f:
+            if line.startswith(('VmRSS:', 'VmHWM:')):
+                values[line.split(':')[0]] = int(line.split()[1]) / 1024
+    return values['VmRSS'], values['VmHWM']
+
+async def wait_until_ready(client):
+    deadline = time.time() + READY_TIMEOUT
+    while True:
+        try:
+            if (await client.get('/ready')).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        if time.time() > deadline:
+            raise TimeoutError("API did not become ready")
+        await asyncio.sleep(0.1)
+
+async def replay(client, method, build_request, n_requests, concurrency):
+    latencies, next_index = [], iter(range(n_requests))
+
+    async def worker():
+        for i in next_index:
+            path, body = build_request(i)
+            start = time.perf_counter()
+            response = await client.request(method, path, json=body)
+            response.raise_for_status()
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    wall = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1e3
+    return {'p50_ms': p50, 'p95_ms': p95, 'p99_ms': p99, 'requests_per_s': n_requests / wall}
+
+async def run_scenarios(server_pid, scenarios, n_requests, concurrency):
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(base_url=f'http://127.0.0.1:{PORT}', timeout=120, limits=limits) as client:
+        await wait_until_ready(client)
+        startup_rss, _ = process_memory_mb(server_pid)
+        results = {}
+        for name, method, build_request in scenarios:
+            await replay(client, method, build_request, min(n_requests, 4 * concurrency), concurrency)  # warm-up
+            results[name] = await replay(client, method, build_request, n_requests, concurrency)
+        rss, peak_rss = process_memory_mb(server_pid)
+    return results, {'startup_rss_mb': startup_rss, 'rss_mb': rss, 'peak_rss_mb': peak_rss}
+
+def measure(n_keys, n_logs, n_requests, concurrency):
+    with tempfile.TemporaryDirectory() as workdir:
+        inventory_file, logs_file, key_configs = write_datasets(workdir, n_keys, n_logs)
+        env = {**os.environ, 'PYTHONPATH': '.', 'CHIMERA_BLOCKING_STARTUP': '1',
+               'CHIMERA_KEY_INVENTORY_FILE': inventory_file, 'CHIMERA_ACCESS_LOGS_FILE': logs_file}
+        server = subprocess.Popen(
+            [sys.executable, '-W', 'ignore', '-m', 'uvicorn', 'src.api.main_api:app',
+             '--port', str(PORT), '--log-level', 'warning'],
+            env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+        )
+        try:
+            return asyncio.run(run_scenarios(server.pid, build_scenarios(key_configs, n_logs), n_requests, concurrency))
+        finally:
+            server.terminate()
+            server.wait()
+
+def machine():
+    return {'cpu_count': os.cpu_count(), 'python': platform.python_version()}
+
+def find_regressions(results, memory, baseline):
+    regressions = []
+    for name, current in results.items():
+        reference = baseline['results'].get(name)
+        if reference is None:
+            continue
+        if current['p95_ms'] > LATENCY_TOLERANCE * reference['p95_ms']:
+            regressions.append(f"{name}: p95 {current['p95_ms']:.1f} ms vs baseline {reference['p95_ms']:.1f} ms")
+        if current['requests_per_s'] * THROUGHPUT_TOLERANCE < reference['requests_per_s']:
+            regressions.append(f"{name}: {current['requests_per_s']:.0f} req/s vs baseline {reference['requests_per_s']:.0f} req/s")
+    if memory['rss_mb'] > RSS_TOLERANCE * baseline['memory']['rss_mb']:
+        regressions.append(f"server RSS {memory['rss_mb']:.0f} MB vs baseline {baseline['memory']['rss_mb']:.0f} MB")
+    return regressions
+
+def run_benchmark(n_keys=1000, n_logs=10_000, n_requests=1000, concurrency=16, save_baseline=False):
+    profile = f"keys={n_keys},logs={n_logs},concurrency={concurrency}"
+    print(f"--- API Benchmark ({profile}, {n_requests} requests per endpoint) ---")
+    results, memory = measure(n_keys, n_logs, n_requests, concurrency)
+
+    print(f"{'endpoint':>22} | {'p50':>8} | {'p95':>8} | {'p99':>8} | {'req/s':>7}")
+    for name, r in results.items():
+        print(f"{name:>22} | {r['p50_ms']:>5.1f} ms | {r['p95_ms']:>5.1f} ms | {r['p99_ms']:>5.1f} ms | {r['requests_per_s']:>7.0f}")
+    print(f"Server RSS: {memory['startup_rss_mb']:.0f} MB after startup, {memory['rss_mb']:.0f} MB after traffic "
+          f"(peak {memory['peak_rss_mb']:.0f} MB).")
+
+    baselines = {}
+    if os.path.exists(BASELINE_FILE):
+        with open(BASELINE_FILE) as f:
+            baselines = json.load(f)
+    if save_baseline:
+        baselines[profile] = {'machine': machine(), 'results': results, 'memory': memory}
+        os.makedirs(os.path.dirname(BASELINE_FILE), exist_ok=True)
+        with open(BASELINE_FILE, 'w') as f:
+            json.dump(baselines, f, indent=2, sort_keys=True)
+        print(f"Saved baseline for '{profile}' to '{BASELINE_FILE}'.")
+        return True
+
+    baseline = baselines.get(profile)
+    if baseline is None:
+        print(f"No stored baseline for '{profile}'; run with --save-baseline to record one.")
+        return True
+    if baseline['machine'] != machine():
+        print(f"Note: baseline was recorded on {baseline['machine']}, this is {machine()}.")
+    regressions = find_regressions(results, memory, baseline)
+    for regression in regressions:
+        print(f"REGRESSION {regression}")
+    if not regressions:
+        print("No regressions against the stored baseline.")
+    return not regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="End-to-end latency, throughput and memory benchmark for the API.")
+    parser.add_argument('--keys', type=int, default=1000, help="Size of the synthetic key inventory.")
+    parser.add_argument('--logs', type=int, default=10_000, help="Number of synthetic access logs.")
+    parser.add_argument('--requests', type=int, default=1000, help="Requests per endpoint.")
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the baseline for its profile.")
+    args = parser.parse_args()
+    passed = run_benchmark(args.keys, args.logs, args.requests, args.concurrency, args.save_baseline)
+    sys.exit(0 if passed else 1)
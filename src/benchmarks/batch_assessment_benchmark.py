@@ -0,0 +1,69 @@
+import contextlib
+import io
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+import pandas as pd
+from src.benchmarks.log_store_benchmark import peak_rss_mb
+
+# --- Configuration ---
+N_KEYS = 1_000_000
+N_LOGS = 1_000_000
+WORKER_COUNTS = sorted({1, 2, os.cpu_count()})
+# Every run ages the keys at the same instant, so their outputs can be compared
+AS_OF = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def measure_assessment(inventory_path, logs_path, output_dir, workers):
+    """Runs in a fresh interpreter so peak RSS covers one assessment only."""
+    from src.components.assess_risk import assess_risk
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        assess_risk(inventory_path, logs_path, output_dir, workers=int(workers), now=AS_OF)
+    elapsed = time.perf_counter() - start
+    children_mb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    print(json.dumps({'seconds': elapsed, 'parent_rss_mb': peak_rss_mb(), 'worker_rss_mb': children_mb}))
+
+def run_assessment(inventory_path, logs_path, output_dir, workers):
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-m', 'src.benchmarks.batch_assessment_benchmark',
+         '--assess', inventory_path, logs_path, output_dir, str(workers)],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark():
+    from src.components.generate_dataset import generate_records
+    from src.components.generate_logs import generate_logs_at_scale
+    print(f"--- Batch Risk Assessment Benchmark ({N_KEYS} keys, {N_LOGS} logs, {os.cpu_count()} cores) ---")
+    print(f"{'workers':>7} | {'wall s':>7} | {'records/s':>9} | {'parent RSS MB':>13} | {'worker RSS MB':>13}")
+    with tempfile.TemporaryDirectory() as workdir:
+        inventory_path = os.path.join(workdir, 'keys.parquet')
+        logs_path = os.path.join(workdir, 'logs.parquet')
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_records(N_KEYS, seed=0, now=AS_OF.replace(tzinfo=None)).to_parquet(inventory_path, index=False)
+            generate_logs_at_scale(N_LOGS, logs_path, seed=0, workers=1)
+
+        outputs = {}
+        for workers in WORKER_COUNTS:
+            output_dir = os.path.join(workdir, f'out_{workers}')
+            result = run_assessment(inventory_path, logs_path, output_dir, workers)
+            outputs[workers] = output_dir
+            print(f"{workers:>7} | {result['seconds']:>7.1f} | {(N_KEYS + N_LOGS) / result['seconds']:>9,.0f} | "
+                  f"{result['parent_rss_mb']:>13.0f} | {result['worker_rss_mb']:>13.0f}")
+
+        # The worker count only changes how chunks are spread, never the results
+        expected = pd.read_parquet(os.path.join(outputs[WORKER_COUNTS[0]], 'key_risk.parquet'))
+        assert len(pd.read_parquet(os.path.join(outputs[WORKER_COUNTS[0]], 'scored_logs.parquet'))) == N_LOGS
+        for output_dir in outputs.values():
+            pd.testing.assert_frame_equal(pd.read_parquet(os.path.join(output_dir, 'key_risk.parquet')), expected)
+
+if __name__ == "__main__":
+    if len(sys.argv) == 6 and sys.argv[1] == '--assess':
+        measure_assessment(*sys.argv[2:])
+    else:
+        run_benchmark()
@@ -0,0 +1,58 @@
+import sys
+import time
+from datetime import datetime
+import numpy as np
+from src.components.generate_dataset import (
+    calculate_rule_scores, generate_labeled_dataset, generate_records, generate_records_loop
+)
+
+# --- Configuration ---
+CHECK_RECORDS = 20_000
+DEFAULT_SIZES = [1_000_000, 10_000_000]
+MAX_HISTOGRAM_DISTANCE = 0.03
+MAX_MEAN_DIFFERENCE = 1.0
+
+def histogram(scores):
+    """Share of scores in each 10-point band (100 joins the top band)."""
+    bands = np.minimum(np.asarray(scores, dtype=np.int64) // 10, 9)
+    return np.bincount(bands, minlength=10) / len(bands)
+
+def check_distribution():
+    """Compares the vectorized generator against the per-row generator and calculate_score."""
+    start = time.perf_counter()
+    legacy = generate_records_loop(CHECK_RECORDS)
+    legacy_seconds = time.perf_counter() - start
+
+    # 1. The vectorized rules agree with calculate_score on the very same rows (up to its +-3 noise)
+    difference = legacy['vulnerability_score'].to_numpy() - calculate_rule_scores(legacy, datetime.now())
+    assert np.abs(difference).max() <= 3, f"rule scores differ by up to {np.abs(difference).max()}"
+
+    # 2. Freshly sampled and labeled datasets have the same score distribution
+    vectorized = generate_labeled_dataset(CHECK_RECORDS, seed=0)
+    distance = 0.5 * np.abs(histogram(legacy['vulnerability_score']) - histogram(vectorized['vulnerability_score'])).sum()
+    mean_difference = abs(legacy['vulnerability_score'].mean() - vectorized['vulnerability_score'].mean())
+    assert distance <= MAX_HISTOGRAM_DISTANCE, f"score histograms differ (total variation {distance:.3f})"
+    assert mean_difference <= MAX_MEAN_DIFFERENCE, f"mean scores differ by {mean_difference:.2f}"
+    for column in ['algorithm', 'is_hsm_backed', 'rotation_enabled', 'permission_policy']:
+        shares = legacy[column].value_counts(normalize=True)
+        vectorized_shares = vectorized[column].astype(legacy[column].dtype).value_counts(normalize=True)
+        assert (shares - vectorized_shares.reindex(shares.index, fill_value=0)).abs().max() < 0.02, column
+    print(f"Distribution check passed on {CHECK_RECORDS} keys: total variation {distance:.3f}, "
+          f"mean {legacy['vulnerability_score'].mean():.2f} vs {vectorized['vulnerability_score'].mean():.2f}.")
+    return CHECK_RECORDS / legacy_seconds
+
+def run_benchmark(sizes):
+    print("--- Key Inventory Dataset Generation Benchmark ---")
+    legacy_rate = check_distribution()
+    print(f"{'per-row + df.apply':>20}: {legacy_rate:>12,.0f} keys/s")
+    for num_records in sizes:
+        start = time.perf_counter()
+        generate_records(num_records, seed=0)
+        sampled = time.perf_counter()
+        generate_labeled_dataset(num_records, seed=0)
+        elapsed = time.perf_counter() - sampled
+        print(f"{f'vectorized {num_records:,}':>20}: {num_records / elapsed:>12,.0f} keys/s "
+              f"({elapsed:.1f} s labeled, {sampled - start:.1f} s sampling only)")
+
+if __name__ == "__main__":
+    run_benchmark([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
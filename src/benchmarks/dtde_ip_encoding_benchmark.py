@@ -0,0 +1,57 @@
+import io
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import IsolationForest
+from src.components.dtde_preprocessor import DTDEPreprocessor
+
+# --- Configuration ---
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../../data/kms_access_logs.json')
+CONTAMINATION = 0.02
+ENCODINGS = ['onehot', 'top_k', 'subnet', 'hash', 'private']
+
+def train_and_score(df, ip_encoding):
+    """Fits preprocessor + IsolationForest exactly like train_dtde_model and scores all logs."""
+    preprocessor = DTDEPreprocessor(ip_encoding=ip_encoding).fit(df)
+    start = time.perf_counter()
+    model = IsolationForest(n_estimators=100, contamination=CONTAMINATION, random_state=42)
+    model.fit(preprocessor.transform(df))
+    fit_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    scores = model.score_samples(preprocessor.transform(df))
+    score_seconds = time.perf_counter() - start
+
+    buffer = io.BytesIO()
+    joblib.dump({'model': model, 'preprocessor': preprocessor}, buffer)
+    return {
+        'width': len(preprocessor.columns),
+        'size_kb': buffer.tell() / 1024,
+        'fit_s': fit_seconds,
+        'score_s': score_seconds,
+        'scores': scores,
+    }
+
+def run_benchmark():
+    print("--- DTDE source_ip Encoding Comparison ---")
+    df = pd.read_json(DATA_FILE)
+    print(f"{len(df)} logs, {df['source_ip'].nunique()} distinct source IPs")
+
+    results = {encoding: train_and_score(df, encoding) for encoding in ENCODINGS}
+    baseline = results['onehot']['scores']
+    n_flagged = int(len(df) * CONTAMINATION)
+    baseline_flagged = set(np.argsort(baseline)[:n_flagged])
+
+    print(f"{'encoding':>9} | {'width':>6} | {'bundle KB':>9} | {'fit s':>6} | {'score s':>7} | "
+          f"{'rank corr':>9} | top-{n_flagged} overlap")
+    for encoding, result in results.items():
+        rank_corr = pd.Series(result['scores']).corr(pd.Series(baseline), method='spearman')
+        flagged = set(np.argsort(result['scores'])[:n_flagged])
+        overlap = len(flagged & baseline_flagged) / n_flagged
+        print(f"{encoding:>9} | {result['width']:>6} | {result['size_kb']:>9.0f} | {result['fit_s']:>6.2f} | "
+              f"{result['score_s']:>7.3f} | {rank_corr:>9.3f} | {overlap:.1%}")
+
+if __name__ == "__main__":
+    run_benchmark()
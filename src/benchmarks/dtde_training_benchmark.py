@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from src.benchmarks.log_store_benchmark import peak_rss_mb
+
+# --- Configuration ---
+SIZES = [1_000_000, 10_000_000]
+# Dense float32 bytes the in-memory path would allocate before it is attempted
+IN_MEMORY_LIMIT_BYTES = 2 * 1024 ** 3
+RUNS = [
+    # (mode, ip_encoding)
+    ('in-memory', 'top_k'),
+    ('out-of-core', 'top_k'),
+    ('out-of-core', 'onehot'),
+]
+
+def measure_training(mode, data_path, ip_encoding, workdir):
+    """Runs in a fresh interpreter so peak RSS covers one training run only."""
+    from src.components import train_dtde_model
+    baseline_rss = peak_rss_mb()
+    model_file, compiled_file = os.path.join(workdir, 'model.joblib'), os.path.join(workdir, 'model.npz')
+    start = time.perf_counter()
+    if mode == 'in-memory':
+        train_dtde_model.train_dtde_model(data_path, model_file, compiled_file, ip_encoding)
+    else:
+        train_dtde_model.train_dtde_model_out_of_core(data_path, model_file, compiled_file, ip_encoding)
+    elapsed = time.perf_counter() - start
+    import joblib
+    width = len(joblib.load(model_file)['preprocessor'].columns)
+    print(json.dumps({'seconds': elapsed, 'rss_mb': peak_rss_mb() - baseline_rss, 'width': width}))
+
+def run_training(mode, data_path, ip_encoding, workdir):
+    output = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-m', 'src.benchmarks.dtde_training_benchmark',
+         '--train', mode, data_path, ip_encoding, workdir],
+        capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+def run_benchmark(sizes):
+    from src.components.generate_logs import generate_logs_at_scale
+    print(f"--- DTDE Training Benchmark ({os.cpu_count()} cores) ---")
+    print(f"{'logs':>10} | {'mode':>11} | {'ip_encoding':>11} | {'columns':>7} | {'wall s':>7} | {'peak RSS MB':>11}")
+    widths = {}
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_logs in sizes:
+            data_path = os.path.join(workdir, f'logs_{n_logs}.parquet')
+            with contextlib.redirect_stdout(io.StringIO()):
+                generate_logs_at_scale(n_logs, data_path, seed=0, workers=1)
+            for mode, ip_encoding in RUNS:
+                if mode == 'in-memory':
+                    # Width from a smaller run of the same encoding, which only grows with more logs
+                    width = widths.get(ip_encoding)
+                    if width is not None and n_logs * width * 4 > IN_MEMORY_LIMIT_BYTES:
+                        print(f"{n_logs:>10} | {mode:>11} | {ip_encoding:>11} | {width:>7} | skipped: "
+                              f"dense matrix alone would need {n_logs * width * 4 / 1024 ** 3:.1f} GB")
+                        continue
+                result = run_training(mode, data_path, ip_encoding, workdir)
+                widths[ip_encoding] = result['width']
+                print(f"{n_logs:>10} | {mode:>11} | {ip_encoding:>11} | {result['width']:>7} | "
+                      f"{result['seconds']:>7.1f} | {result['rss_mb']:>11.0f}")
+            os.remove(data_path)
+
+if __name__ == "__main__":
+    if len(sys.argv) == 6 and sys.argv[1] == '--train':
+        measure_training(*sys.argv[2:])
+    else:
+        run_benchmark([int(size) for size in sys.argv[1:]] or SIZES)
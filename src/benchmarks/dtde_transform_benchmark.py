@@ -0,0 +1,60 @@
+import os
+import time
+import joblib
+import numpy as np
+import pandas as pd
+
+# --- Configuration ---
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../../data/kms_access_logs.json')
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '../../models/dtde_model.joblib')
+PAGE_SIZE = 50
+REPEATS = 20
+
+def legacy_transform(columns, df):
+    """The original get_dummies + reindex transform, kept as the reference output."""
+    df_copy = df.copy()
+    df_copy['timestamp'] = pd.to_datetime(df_copy['timestamp'])
+    df_copy['hour'] = df_copy['timestamp'].dt.hour
+    df_copy['day_of_week'] = df_copy['timestamp'].dt.dayofweek
+    df_encoded = pd.get_dummies(df_copy, columns=['user_id', 'action', 'status', 'source_ip'], dtype=int)
+    return df_encoded.reindex(columns=columns, fill_value=0)[columns]
+
+def best_time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_benchmark():
+    print("--- DTDE Transform Benchmark ---")
+    logs_df = pd.read_json(DATA_FILE)
+    preprocessor = joblib.load(MODEL_FILE)['preprocessor']
+    columns = preprocessor.columns
+    page_df = logs_df.iloc[PAGE_SIZE:2 * PAGE_SIZE]
+    print(f"{len(logs_df)} logs, {len(columns)} feature columns")
+
+    # 1. Equivalence against the legacy output
+    for name, df in [('page', page_df), ('full', logs_df)]:
+        expected = legacy_transform(columns, df).to_numpy()
+        dense = preprocessor.transform_array(df)
+        assert np.array_equal(expected, dense), f"dense output differs on {name} data"
+        assert np.array_equal(expected, preprocessor.transform_array(df, as_sparse=True).toarray())
+        assert list(preprocessor.transform(df).columns) == columns
+    print("Equivalence check passed (dense and sparse outputs match get_dummies+reindex).")
+
+    # 2. Timings
+    cases = [
+        ('page (50 rows)', page_df, REPEATS),
+        (f'full ({len(logs_df)} rows)', logs_df, 3),
+    ]
+    for label, df, repeats in cases:
+        legacy = best_time(lambda: legacy_transform(columns, df), repeats)
+        dense = best_time(lambda: preprocessor.transform_array(df), repeats)
+        csr = best_time(lambda: preprocessor.transform_array(df, as_sparse=True), repeats)
+        print(f"{label:>20}: legacy {legacy * 1e3:9.2f} ms | dense {dense * 1e3:9.2f} ms "
+              f"({legacy / dense:5.1f}x) | sparse {csr * 1e3:9.2f} ms ({legacy / csr:5.1f}x)")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,82 @@
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from src.components.apce_policy import composite_risk
+from src.components.key_risk import KeyRiskTable, VULNERABILITY_SCALE
+
+# --- Configuration ---
+N_KEYS = 100_000
+N_LOGS = 1_000_000
+INGEST_BATCH = 1_000
+HALF_LIFE_HOURS = 24.0
+TOP_N = 50
+QUERIES = 200
+# Risk is read two days after the last of the 30 days of logs
+AS_OF = datetime(2025, 2, 2, tzinfo=timezone.utc)
+
+def make_logs(n_keys, n_logs, seed=0):
+    """Scored logs over 30 days, with timestamps deliberately out of order."""
+    rng = np.random.default_rng(seed)
+    start = np.datetime64('2025-01-01T00:00:00', 'ns')
+    return pd.DataFrame({
+        'key_id': np.array([f'key-{i:06d}' for i in range(n_keys)], dtype=object)[rng.integers(0, n_keys, n_logs)],
+        'timestamp': start + rng.integers(0, 30 * 86400, n_logs).astype('timedelta64[s]'),
+        'anomaly_score': rng.integers(0, 101, n_logs),
+    })
+
+def recompute(logs, vulnerability, half_life_hours, as_of):
+    """
+    From-scratch pandas aggregate: every log weighted by its age relative to the key's
+    latest log, and the average decayed by the time from that log to as_of.
+    """
+    latest = logs.groupby('key_id')['timestamp'].transform('max')
+    age_hours = (latest - logs['timestamp']).dt.total_seconds() / 3600
+    weights = 0.5 ** (age_hours / half_life_hours)
+    grouped = pd.DataFrame({'key_id': logs['key_id'], 'w': weights, 'ws': weights * logs['anomaly_score']}).groupby('key_id').sum()
+    staleness_hours = (pd.Timestamp(as_of.replace(tzinfo=None)) - logs.groupby('key_id')['timestamp'].max()).dt.total_seconds() / 3600
+    anomaly = (grouped['ws'] / grouped['w'] * 0.5 ** (staleness_hours / half_life_hours)).reindex(vulnerability.index)
+    return pd.Series(composite_risk(vulnerability.to_numpy() / VULNERABILITY_SCALE, anomaly.to_numpy()), index=vulnerability.index)
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def run_benchmark():
+    logs = make_logs(N_KEYS, N_LOGS)
+    rng = np.random.default_rng(1)
+    vulnerability = pd.Series(rng.integers(0, 101, N_KEYS).astype(float),
+                              index=[f'key-{i:06d}' for i in range(N_KEYS)])
+    print(f"--- Key Risk Benchmark ({N_KEYS} keys, {N_LOGS} logs) ---")
+
+    table = KeyRiskTable(HALF_LIFE_HOURS)
+    _, vulnerability_seconds = timed(lambda: table.update_vulnerability(vulnerability.index, vulnerability.to_numpy()))
+    def ingest():
+        for start in range(0, N_LOGS, INGEST_BATCH):
+            batch = logs.iloc[start:start + INGEST_BATCH]
+            table.update_logs(batch['key_id'].to_numpy(), batch['timestamp'].to_numpy(), batch['anomaly_score'].to_numpy())
+    _, ingest_seconds = timed(ingest)
+
+    # The incremental table must agree with a from-scratch recompute over all logs
+    expected, recompute_seconds = timed(lambda: recompute(logs, vulnerability, HALF_LIFE_HOURS, AS_OF))
+    top = table.top(N_KEYS, now=AS_OF)
+    actual = pd.Series(top['composite_risk'].to_numpy(), index=top['key_id'])
+    assert np.allclose(actual.reindex(expected.index).to_numpy(), expected.to_numpy().round(4), atol=1e-4)
+    assert (np.diff(top['composite_risk'].to_numpy()) <= 0).all(), "riskiest keys are not ranked"
+    counts = logs['key_id'].value_counts()
+    assert (top.set_index('key_id')['log_count'].reindex(counts.index) == counts).all()
+
+    _, ranked = timed(lambda: [table.top(TOP_N, now=AS_OF) for _ in range(QUERIES)])
+    key_ids = vulnerability.index[rng.integers(0, N_KEYS, QUERIES)]
+    _, lookups = timed(lambda: [table.get(key_id, now=AS_OF) for key_id in key_ids])
+
+    print(f"vulnerability update ({N_KEYS} keys):              {vulnerability_seconds * 1e3:8.1f} ms")
+    print(f"incremental log updates ({INGEST_BATCH}-log batches):    "
+          f"{ingest_seconds / (N_LOGS / INGEST_BATCH) * 1e3:8.3f} ms/batch ({N_LOGS / ingest_seconds:,.0f} logs/s)")
+    print(f"from-scratch recompute over all logs:           {recompute_seconds * 1e3:8.1f} ms")
+    print(f"top {TOP_N} riskiest keys:                          {ranked / QUERIES * 1e3:8.3f} ms")
+    print(f"single key lookup:                              {lookups / QUERIES * 1e3:8.3f} ms")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,71 @@
+import json
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+import pandas as pd
+from src.components.log_store import convert_json_logs, load_logs
+
+# --- Configuration ---
+SOURCE_FILE = os.path.join(os.path.dirname(__file__), '../../data/kms_access_logs.json')
+DEFAULT_SIZES = [10_000, 1_000_000, 10_000_000]
+FORMATS = ['.json', '.parquet', '.arrow']
+
+def peak_rss_mb():
+    # VmHWM resets on exec, unlike ru_maxrss which children inherit from this parent
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except FileNotFoundError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def measure_load(path):
+    """Runs in a fresh interpreter so each format's peak RSS is measured in isolation."""
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    df = load_logs(path)
+    elapsed = time.perf_counter() - start
+    print(json.dumps({'rows': len(df), 'seconds': elapsed, 'rss_mb': peak_rss_mb() - baseline_rss}))
+
+def write_synthetic_logs(n_rows, json_path):
+    """Resamples the bundled logs up to n_rows, giving each row a fresh log_id."""
+    source = pd.read_json(SOURCE_FILE)
+    rng = np.random.default_rng(42)
+    df = source.iloc[rng.integers(0, len(source), n_rows)].reset_index(drop=True)
+    df['log_id'] = [f"{i:032x}" for i in range(n_rows)]
+    df['timestamp'] = df['timestamp'].map(pd.Timestamp.isoformat)
+    df.to_json(json_path, orient='records')
+
+def run_benchmark(sizes):
+    print("--- Log Store Load Benchmark ---")
+    print(f"{'rows':>10} | {'format':>8} | {'file MB':>8} | {'load s':>7} | {'peak RSS MB':>11}")
+    with tempfile.TemporaryDirectory() as workdir:
+        for n_rows in sizes:
+            json_path = os.path.join(workdir, f"logs_{n_rows}.json")
+            write_synthetic_logs(n_rows, json_path)
+            for extension in FORMATS[1:]:
+                convert_json_logs(json_path, json_path.replace('.json', extension))
+
+            for extension in FORMATS:
+                path = json_path.replace('.json', extension)
+                output = subprocess.run(
+                    [sys.executable, '-W', 'ignore', '-m', 'src.benchmarks.log_store_benchmark', '--load', path],
+                    capture_output=True, text=True, check=True,
+                ).stdout
+                result = json.loads(output.strip().splitlines()[-1])
+                size_mb = os.path.getsize(path) / 2**20
+                print(f"{n_rows:>10} | {extension[1:]:>8} | {size_mb:>8.1f} | {result['seconds']:>7.2f} | {result['rss_mb']:>11.0f}")
+            for extension in FORMATS:
+                os.remove(json_path.replace('.json', extension))
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--load':
+        measure_load(sys.argv[2])
+    else:
+        run_benchmark([int(size) for size in sys.argv[1:]] or DEFAULT_SIZES)
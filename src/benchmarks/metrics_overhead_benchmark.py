@@ -0,0 +1,48 @@
+import time
+from fastapi.testclient import TestClient
+from src.api import main_api
+from src.components.metrics import Metrics
+
+# --- Configuration ---
+STAGE_CALLS = 200_000
+REQUESTS = 500
+ENDPOINTS = ['/logs/scored?page=7&limit=50', '/keys/inventory']
+
+def time_stages(metrics):
+    start = time.perf_counter()
+    for _ in range(STAGE_CALLS):
+        with metrics.stage('bench', rows=1):
+            pass
+    return (time.perf_counter() - start) / STAGE_CALLS
+
+def time_requests(client, path, headers=None):
+    timings = []
+    for _ in range(REQUESTS):
+        start = time.perf_counter()
+        client.get(path, headers=headers).raise_for_status()
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+    return timings[len(timings) // 2]
+
+def run_benchmark():
+    print("--- Metrics Overhead Benchmark ---")
+    # 1. Cost of one instrumented stage
+    for enabled in (False, True):
+        print(f"stage() with metrics {'enabled' if enabled else 'disabled'}: "
+              f"{time_stages(Metrics(enabled=enabled)) * 1e6:.2f} µs per call")
+
+    # 2. Median request latency through the middleware, disabled / enabled / profiled
+    main_api.BLOCKING_STARTUP = True
+    with TestClient(main_api.app) as client:
+        for path in ENDPOINTS:
+            time_requests(client, path)  # warm-up
+            main_api.metrics.enabled = False
+            disabled = time_requests(client, path)
+            main_api.metrics.enabled = True
+            enabled = time_requests(client, path)
+            profiled = time_requests(client, path, headers={'X-Chimera-Profile': '1'})
+            print(f"{path:>28}: disabled {disabled * 1e3:.3f} ms | enabled {enabled * 1e3:.3f} ms"
+                  f" | profiled {profiled * 1e3:.3f} ms")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,74 @@
+import asyncio
+import time
+import numpy as np
+from src.api import main_api
+from src.components.micro_batcher import MicroBatcher
+
+# Drives the scoring endpoints' coroutines in-process with many concurrent callers,
+# so the numbers reflect scoring and dispatch cost rather than HTTP parsing (which
+# dominates on a small machine where client and server share the cores).
+
+# --- Configuration ---
+CONCURRENCY = 64
+REQUESTS_PER_ENDPOINT = 5000
+HEARTBEAT_SECONDS = 0.001
+KEY_CONFIG = main_api.KeyConfiguration(
+    key_id='key-bench-001', creation_date='2021-05-20T11:00:00Z', algorithm='RSA_2048',
+    is_hsm_backed=False, rotation_enabled=True, permission_policy='{"Principal":{"AWS":"*"}}',
+)
+ENDPOINTS = {
+    '/predict_vulnerability': (main_api.predict_vulnerability, lambda i: KEY_CONFIG),
+    '/get_action': (main_api.get_action,
+                    lambda i: main_api.RiskInput(vulnerability_score=i % 11, anomaly_score=(7 * i) % 101)),
+}
+# (max_batch_size, window seconds): one model call per request vs. coalesced micro-batches
+MODES = {
+    'unbatched': (1, 0),
+    'micro-batched': (main_api.MAX_MICRO_BATCH, main_api.BATCH_WINDOW_MS / 1000),
+}
+
+def use_batchers(max_batch_size, max_wait):
+    for name, batch_fn in (('srae_batcher', main_api.score_srae_items), ('apce_batcher', main_api.recommend_actions)):
+        setattr(main_api, name, MicroBatcher(batch_fn, main_api.scoring_executor, max_batch_size=max_batch_size,
+                                             max_wait=max_wait, max_concurrent_batches=main_api.SCORING_WORKERS))
+
+async def heartbeat(lags, stop):
+    """Records how late a 1 ms timer fires: the event loop's responsiveness under load."""
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(HEARTBEAT_SECONDS)
+        lags.append(time.perf_counter() - start - HEARTBEAT_SECONDS)
+
+async def drive(endpoint, make_input):
+    latencies, lags, stop, next_index = [], [], asyncio.Event(), iter(range(REQUESTS_PER_ENDPOINT))
+
+    async def caller():
+        for i in next_index:
+            start = time.perf_counter()
+            await endpoint(make_input(i))
+            latencies.append(time.perf_counter() - start)
+
+    monitor = asyncio.create_task(heartbeat(lags, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(caller() for _ in range(CONCURRENCY)))
+    wall = time.perf_counter() - start
+    stop.set()
+    await monitor
+    return wall, np.array(latencies), np.array(lags)
+
+def run_benchmark():
+    main_api.preload_resources()
+    print(f"--- Micro-Batching Benchmark ({CONCURRENCY} concurrent callers, {REQUESTS_PER_ENDPOINT} requests each, "
+          f"{main_api.SCORING_WORKERS} scoring workers) ---")
+    print(f"{'endpoint':>22} | {'mode':>13} | {'req/s':>7} | {'p50':>8} | {'p99':>8} | {'max loop lag':>12}")
+    for path, (endpoint, make_input) in ENDPOINTS.items():
+        for mode, (max_batch_size, max_wait) in MODES.items():
+            use_batchers(max_batch_size, max_wait)
+            asyncio.run(drive(endpoint, make_input))  # warm-up
+            wall, latencies, lags = asyncio.run(drive(endpoint, make_input))
+            p50, p99 = np.percentile(latencies, [50, 99]) * 1e3
+            print(f"{path:>22} | {mode:>13} | {len(latencies) / wall:>7.0f} | {p50:>5.2f} ms | {p99:>5.2f} ms"
+                  f" | {lags.max() * 1e3:>9.2f} ms")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,79 @@
+import os
+import subprocess
+import sys
+import time
+import httpx
+
+# --- Configuration ---
+WORKERS = 4
+PORT = 8765
+READY_TIMEOUT = 120
+WARM_UP_REQUESTS = [
+    ('GET', '/keys/inventory', None),
+    ('GET', '/logs/scored?page=3&limit=50', None),
+    ('GET', '/logs/search?action=Decrypt&sort=score&limit=50', None),
+    ('GET', '/logs/top_anomalous?n=20', None),
+    ('POST', '/get_action', {'vulnerability_score': 7.5, 'anomaly_score': 80}),
+    ('POST', '/predict_vulnerability', {
+        'key_id': 'key-bench-001', 'creation_date': '2021-05-20T11:00:00Z', 'algorithm': 'RSA_2048',
+        'is_hsm_backed': False, 'rotation_enabled': True, 'permission_policy': '{"Principal":{"AWS":"*"}}',
+    }),
+]
+
+def memory_kb(pid):
+    """Rss, Pss and private (unshared) memory of one process, from smaps_rollup."""
+    values = {}
+    with open(f'/proc/{pid}/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if parts[0] in ('Rss:', 'Pss:', 'Private_Clean:', 'Private_Dirty:'):
+                values[parts[0][:-1]] = int(parts[1])
+    return {'rss': values['Rss'], 'pss': values['Pss'], 'private': values['Private_Clean'] + values['Private_Dirty']}
+
+def child_pids(pid):
+    with open(f'/proc/{pid}/task/{pid}/children') as f:
+        return [int(child) for child in f.read().split()]
+
+def wait_until_ready(client):
+    # Requests land on arbitrary workers, so require a run of consecutive ready answers
+    deadline, streak = time.time() + READY_TIMEOUT, 0
+    while streak < 10 * WORKERS:
+        if time.time() > deadline:
+            raise TimeoutError("workers did not become ready")
+        try:
+            streak = streak + 1 if client.get('/ready').status_code == 200 else 0
+        except httpx.TransportError:
+            streak = 0
+        time.sleep(0.05)
+
+def measure(preload):
+    command = [sys.executable, '-W', 'ignore', '-m', 'src.api.prefork', '--workers', str(WORKERS), '--port', str(PORT)]
+    server = subprocess.Popen(command + ([] if preload else ['--no-preload']),
+                              stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    try:
+        with httpx.Client(base_url=f'http://127.0.0.1:{PORT}', timeout=30) as client:
+            wait_until_ready(client)
+            for _ in range(10 * WORKERS):
+                for method, path, body in WARM_UP_REQUESTS:
+                    client.request(method, path, json=body).raise_for_status()
+        workers = [memory_kb(pid) for pid in child_pids(server.pid)]
+        parent = memory_kb(server.pid)
+    finally:
+        server.terminate()
+        server.wait()
+    return parent, workers
+
+def run_benchmark():
+    print(f"--- Prefork Memory Benchmark ({WORKERS} workers, after warm-up traffic) ---")
+    print(f"{'mode':>22} | {'RSS/worker':>10} | {'private/worker':>14} | {'PSS total (all procs)':>21}")
+    for preload in (False, True):
+        parent, workers = measure(preload)
+        label = 'preload + fork (COW)' if preload else 'per-worker loading'
+        rss = sum(w['rss'] for w in workers) / len(workers) / 1024
+        private = sum(w['private'] for w in workers) / len(workers) / 1024
+        pss_total = (parent['pss'] + sum(w['pss'] for w in workers)) / 1024
+        print(f"{label:>22} | {rss:>7.0f} MB | {private:>11.0f} MB | {pss_total:>18.0f} MB")
+
+if __name__ == "__main__":
+    os.environ.setdefault('PYTHONPATH', '.')
+    run_benchmark()
@@ -0,0 +1,74 @@
+import gzip
+import json
+import os
+import tempfile
+import time
+import pyarrow as pa
+from fastapi.encoders import jsonable_encoder
+from fastapi.testclient import TestClient
+from src.components.generate_dataset import generate_records
+from src.components.serialization import encode_arrow, encode_json, iter_ndjson
+
+# --- Configuration ---
+INVENTORY_SIZES = [10_000, 100_000]
+POLLS = 5
+
+def make_inventory(n_keys):
+    """A scored inventory frame shaped like the API's key_inventory_df."""
+    keys = generate_records(n_keys, seed=0)
+    keys['creation_date'] = keys['creation_date'].dt.strftime('%Y-%m-%dT%H:%M:%SZ')
+    keys = keys.astype({'algorithm': object, 'permission_policy': object})
+    keys['vulnerability_score'] = (keys.index * 7) % 101
+    return keys
+
+def previous_path(df):
+    """What the endpoint did before: to_dict, FastAPI's jsonable_encoder, then JSONResponse's json.dumps."""
+    content = jsonable_encoder({"keys": df.to_dict(orient='records')})
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+def run_benchmark():
+    print("--- Response Serialization Benchmark ---")
+    print(f"{'keys':>8} | {'encoding':>26} | {'ms':>8} | {'MB':>6}")
+    for n_keys in INVENTORY_SIZES:
+        df = make_inventory(n_keys)
+        expected, elapsed = timed(lambda: previous_path(df))
+        rows = [('to_dict + jsonable_encoder', expected, elapsed)]
+
+        body, elapsed = timed(lambda: encode_json(df, "keys"))
+        assert body == expected, "orjson encoding differs from the previous response body"
+        rows.append(('columns + orjson', body, elapsed))
+        ndjson, elapsed = timed(lambda: b"".join(iter_ndjson(df)))
+        assert [json.loads(line) for line in ndjson.splitlines()] == json.loads(expected)["keys"]
+        rows.append(('ndjson', ndjson, elapsed))
+        arrow, elapsed = timed(lambda: encode_arrow(df))
+        assert pa.ipc.open_stream(arrow).read_all().num_rows == n_keys
+        rows.append(('arrow ipc', arrow, elapsed))
+        for level in (1, 9):
+            compressed, elapsed = timed(lambda: gzip.compress(body, level))
+            rows.append((f'gzip level {level} (json)', compressed, elapsed))
+        for name, payload, elapsed in rows:
+            print(f"{n_keys:>8} | {name:>26} | {elapsed * 1e3:>8.1f} | {len(payload) / 1e6:>6.2f}")
+
+    # End to end: repeated polls of an unchanged inventory through the API
+    from src.api import main_api
+    with tempfile.TemporaryDirectory() as workdir:
+        inventory_file = os.path.join(workdir, 'keys.csv')
+        make_inventory(INVENTORY_SIZES[-1]).drop(columns='vulnerability_score').to_csv(inventory_file, index=False)
+        main_api.KEY_INVENTORY_FILE, main_api.BLOCKING_STARTUP = inventory_file, True
+        with TestClient(main_api.app) as client:
+            response, first = timed(lambda: client.get('/keys/inventory'))
+            etag = response.headers['etag']
+            repeat = min(timed(lambda: client.get('/keys/inventory'))[1] for _ in range(POLLS))
+            conditional = min(timed(lambda: client.get('/keys/inventory', headers={'If-None-Match': etag}))[1]
+                              for _ in range(POLLS))
+            assert client.get('/keys/inventory', headers={'If-None-Match': etag}).status_code == 304
+    print(f"GET /keys/inventory ({INVENTORY_SIZES[-1]} keys): first {first * 1e3:.0f} ms, "
+          f"unchanged repeat {repeat * 1e3:.0f} ms, If-None-Match {conditional * 1e3:.1f} ms (304)")
+
+if __name__ == "__main__":
+    run_benchmark()
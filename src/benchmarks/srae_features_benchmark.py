@@ -0,0 +1,80 @@
+import os
+import time
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from src.api.main_api import KeyConfiguration, load_srae_model
+from src.components.generate_dataset import generate_records
+
+# --- Configuration ---
+INVENTORY_FILE = os.path.join(os.path.dirname(__file__), '../../data/new_keys_to_predict.csv')
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '../../models/srae_model.joblib')
+FEATURE_COLS = [
+    'key_age_days', 'is_hsm_backed', 'rotation_enabled', 'has_wildcard',
+    'algo_AES_256', 'algo_RSA_4096', 'algo_RSA_2048', 'algo_3DES'
+]
+BATCH_SIZE = 1000
+REPEATS = 2000
+
+def legacy_prepare(df_new, now):
+    """The original per-request DataFrame + get_dummies + reindex feature engineering."""
+    creation_dates = pd.to_datetime(df_new['creation_date'], utc=True)
+    df = pd.DataFrame({
+        'key_age_days': (now - creation_dates).dt.days,
+        'is_hsm_backed': df_new['is_hsm_backed'].astype(int),
+        'rotation_enabled': df_new['rotation_enabled'].astype(int),
+        'has_wildcard': df_new['permission_policy'].str.contains('"*"', regex=False).astype(int),
+        'algorithm': df_new['algorithm'],
+    })
+    df = pd.get_dummies(df, columns=['algorithm'], prefix='algo', dtype=int)
+    return df.reindex(columns=FEATURE_COLS, fill_value=0)
+
+def to_key_configs(df):
+    records = df.assign(creation_date=pd.to_datetime(df['creation_date'], utc=True).map(pd.Timestamp.isoformat))
+    return [KeyConfiguration(**record) for record in records.to_dict(orient='records')]
+
+def best_time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_benchmark():
+    print("--- SRAE Feature Engineering Benchmark ---")
+    srae_data = load_srae_model(MODEL_FILE)
+    model, preprocessor = srae_data['model'], srae_data['preprocessor']
+    now = datetime.now(timezone.utc)
+    inventory = pd.read_csv(INVENTORY_FILE)
+    generated = generate_records(5000, seed=0)
+    generated['algorithm'] = generated['algorithm'].astype(str)
+    generated['permission_policy'] = generated['permission_policy'].astype(str)
+    generated.loc[::97, 'algorithm'] = 'ECC_NIST_P256'  # unseen algorithms encode as all zeros
+
+    # 1. Equivalence: both fast paths match the original features and predictions
+    for name, df in [('inventory', inventory), ('generated', generated)]:
+        expected = legacy_prepare(df, now)
+        frame_features = preprocessor.transform_array(df, now=now)
+        config_features = preprocessor.transform_configs(to_key_configs(df), now=now)
+        assert np.array_equal(expected.to_numpy(), frame_features), f"transform_array differs on {name}"
+        assert np.array_equal(expected.to_numpy(), config_features), f"transform_configs differs on {name}"
+        assert np.array_equal(model.predict(expected), model.predict(config_features)), f"predictions differ on {name}"
+    print("Equivalence check passed (features and predictions match get_dummies+reindex).")
+
+    # 2. Timings: a single request and a batch
+    key_configs = to_key_configs(inventory.sample(BATCH_SIZE, replace=True, random_state=0))
+    single = key_configs[:1]
+    cases = [
+        ('single request', single, REPEATS),
+        (f'batch ({BATCH_SIZE} keys)', key_configs, 50),
+    ]
+    for label, configs, repeats in cases:
+        legacy = best_time(lambda: legacy_prepare(pd.DataFrame([k.dict() for k in configs]), now), repeats)
+        fast = best_time(lambda: preprocessor.transform_configs(configs), repeats)
+        predict = best_time(lambda: model.predict(preprocessor.transform_configs(configs)), repeats // 4)
+        print(f"{label:>20}: legacy {legacy * 1e6:9.1f} us | fast path {fast * 1e6:8.1f} us "
+              f"({legacy / fast:6.1f}x) | fast path + predict {predict * 1e6:9.1f} us")
+
+if __name__ == "__main__":
+    run_benchmark()
@@ -0,0 +1,73 @@
+import contextlib
+import io
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from src.benchmarks.log_store_benchmark import peak_rss_mb
+
+# --- Configuration ---
+SIZES = [1_000_000, 10_000_000]
+NEW_KEYS = 1_000_000
+
+def measure_training(mode, dataset_path, workdir):
+    """Runs in a fresh interpreter so peak RSS covers one training run only."""
+    from src.components import train_model
+    model_file, compiled_file = os.path.join(workdir, f'{mode}.joblib'), os.path.join(workdir, f'{mode}.npz')
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    output = io.StringIO()
+    with contextlib.redirect_stdout(output):
+        if mode == 'in-memory':
+            train_model.train_srae_model(dataset_path, model_file, compiled_file)
+        elif mode == 'external-memory':
+            train_model.train_srae_model_external_memory(dataset_path, model_file, compiled_file)
+        else:
+            base_model = os.path.join(workdir, 'external-memory.joblib')
+            train_model.train_srae_model_external_memory(dataset_path, model_file, compiled_file, continue_from=base_model)
+    elapsed = time.perf_counter() - start
+    mae = next(line.split(':')[1].split()[0] for line in output.getvalue().splitlines() if 'MAE' in line)
+    print(json.dumps({'seconds': elapsed, 'rss_mb': peak_rss_mb() - baseline_rss, 'mae': float(mae)}))
+
+def run_training(mode, dataset_path, workdir):
+    completed = subprocess.run(
+        [sys.executable, '-W', 'ignore', '-m', 'src.benchmarks.srae_training_benchmark',
+         '--train', mode, dataset_path, workdir],
+        capture_output=True, text=True,
+    )
+    if completed.returncode != 0:
+        return None, completed.returncode
+    return json.loads(completed.stdout.strip().splitlines()[-1]), 0
+
+def write_dataset(path, n_keys, seed):
+    from src.components.generate_dataset import generate_labeled_dataset
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_labeled_dataset(n_keys, seed=seed).to_csv(path, index=False)
+
+def run_benchmark(sizes):
+    print(f"--- SRAE Training Benchmark ({os.cpu_count()} cores) ---")
+    print(f"{'keys':>10} | {'mode':>28} | {'wall s':>7} | {'peak RSS MB':>11} | {'MAE':>5}")
+    with tempfile.TemporaryDirectory() as workdir:
+        new_keys_path = os.path.join(workdir, 'new_keys.csv')
+        write_dataset(new_keys_path, NEW_KEYS, seed=1)
+        for n_keys in sizes:
+            dataset_path = os.path.join(workdir, f'keys_{n_keys}.csv')
+            write_dataset(dataset_path, n_keys, seed=0)
+            runs = [('in-memory', dataset_path), ('external-memory', dataset_path), ('continue', new_keys_path)]
+            for mode, path in runs:
+                result, returncode = run_training(mode, path, workdir)
+                label = f'continue (+{NEW_KEYS} new keys)' if mode == 'continue' else mode
+                if result is None:
+                    print(f"{n_keys:>10} | {label:>28} | failed with exit code {returncode}"
+                          + (" (killed, out of memory)" if returncode == -9 else ""))
+                    continue
+                print(f"{n_keys:>10} | {label:>28} | {result['seconds']:>7.1f} | {result['rss_mb']:>11.0f} | {result['mae']:>5.2f}")
+            os.remove(dataset_path)
+
+if __name__ == "__main__":
+    if len(sys.argv) == 5 and sys.argv[1] == '--train':
+        measure_training(*sys.argv[2:])
+    else:
+        run_benchmark([int(size) for size in sys.argv[1:]] or SIZES)
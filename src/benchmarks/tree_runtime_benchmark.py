@@ -0,0 +1,84 @@
+import json
+import os
+import subprocess
+import sys
+import time
+import numpy as np
+import pandas as pd
+from src.benchmarks.log_store_benchmark import peak_rss_mb
+
+# --- Configuration ---
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../../models')
+LOGS_FILE = os.path.join(os.path.dirname(__file__), '../../data/kms_access_logs.json')
+BATCH_SIZES = [1, 50, 1000, 5000]
+REPEATS = 20
+
+def measure_load(runtime):
+    """Runs in a fresh interpreter: model imports plus artifact loading, on top of the API module."""
+    from src.api.main_api import DTDEPreprocessor, SRAEPreprocessor, load_compiled_artifact, load_srae_model
+    baseline_rss = peak_rss_mb()
+    start = time.perf_counter()
+    if runtime == 'compiled':
+        load_compiled_artifact(os.path.join(MODELS_DIR, 'srae_model.npz'), SRAEPreprocessor)
+        load_compiled_artifact(os.path.join(MODELS_DIR, 'dtde_model.npz'), DTDEPreprocessor)
+    else:
+        import joblib
+        load_srae_model(os.path.join(MODELS_DIR, 'srae_model.joblib'))
+        joblib.load(os.path.join(MODELS_DIR, 'dtde_model.joblib'))
+    print(json.dumps({'seconds': time.perf_counter() - start, 'rss_mb': peak_rss_mb() - baseline_rss}))
+
+def best_time(func, repeats):
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+def run_benchmark():
+    import joblib
+    from src.api.main_api import DTDEPreprocessor, SRAEPreprocessor, load_compiled_artifact, load_srae_model
+    from src.components.generate_dataset import generate_records
+    print("--- Compiled Tree Runtime Benchmark ---")
+    srae_native = load_srae_model(os.path.join(MODELS_DIR, 'srae_model.joblib'))
+    srae_compiled = load_compiled_artifact(os.path.join(MODELS_DIR, 'srae_model.npz'), SRAEPreprocessor)
+    dtde_native = joblib.load(os.path.join(MODELS_DIR, 'dtde_model.joblib'))
+    dtde_compiled = load_compiled_artifact(os.path.join(MODELS_DIR, 'dtde_model.npz'), DTDEPreprocessor)
+
+    # 1. Parity with the original models
+    key_features = srae_native['preprocessor'].transform_array(generate_records(50_000, seed=0))
+    expected, actual = srae_native['model'].predict(key_features), srae_compiled['model'].predict(key_features)
+    assert np.abs(expected - actual).max() < 1e-3, f"SRAE predictions differ by {np.abs(expected - actual).max()}"
+    assert np.array_equal(np.rint(expected), np.rint(actual)), "rounded SRAE scores differ"
+    logs = pd.read_json(LOGS_FILE)
+    log_features = dtde_native['preprocessor'].transform_array(logs)
+    assert np.array_equal(log_features, dtde_compiled['preprocessor'].transform_array(logs)), "DTDE features differ"
+    expected, actual = dtde_native['model'].score_samples(log_features), dtde_compiled['model'].score_samples(log_features)
+    assert np.abs(expected - actual).max() < 1e-9, f"DTDE scores differ by {np.abs(expected - actual).max()}"
+    print(f"Parity check passed on {len(key_features)} keys (SRAE) and {len(logs)} logs (DTDE).")
+
+    # 2. Per-batch latency
+    print(f"{'batch':>6} | {'SRAE xgboost':>12} | {'compiled':>9} | {'DTDE sklearn':>12} | {'compiled':>9}")
+    for size in BATCH_SIZES:
+        keys, rows = key_features[:size], log_features[:size]
+        repeats = REPEATS if size < 1000 else 5
+        timings = [best_time(lambda: model.predict(keys), repeats)
+                   for model in (srae_native['model'], srae_compiled['model'])]
+        timings += [best_time(lambda: model.score_samples(rows), repeats)
+                    for model in (dtde_native['model'], dtde_compiled['model'])]
+        print(f"{size:>6} | " + " | ".join(f"{t * 1e3:>{width - 3}.2f} ms" for t, width in zip(timings, [12, 9, 12, 9])))
+
+    # 3. Startup cost of importing and loading both models, each in a fresh interpreter
+    for runtime in ('joblib', 'compiled'):
+        output = subprocess.run(
+            [sys.executable, '-W', 'ignore', '-m', 'src.benchmarks.tree_runtime_benchmark', '--load', runtime],
+            capture_output=True, text=True, check=True,
+        ).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        print(f"{runtime:>8} load: {result['seconds']:5.2f} s, peak RSS +{result['rss_mb']:.0f} MB")
+
+if __name__ == "__main__":
+    if len(sys.argv) == 3 and sys.argv[1] == '--load':
+        measure_load(sys.argv[2])
+    else:
+        run_benchmark()
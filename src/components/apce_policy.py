@@ -0,0 +1,70 @@
+import sys
+import numpy as np
+
+# --- Configuration ---
+ACTION_MAP = {
+    0: "NO_OP",
+    1: "ALERT_SOC",
+    2: "FORCE_ROTATE_KEY",
+    3: "RESTRICT_PERMISSIONS",
+    4: "QUARANTINE_KEY"
+}
+DEFAULT_RESOLUTION = 10001
+
+def composite_risk(vulnerability_scores, anomaly_scores):
+    """
+    Vectorized composite risk in [0, 1], matching /get_action: a score that is
+    missing (NaN) counts as 0, a lone score is used directly and two scores are
+    blended 0.4 (static vulnerability) / 0.6 (dynamic anomaly).
+    """
+    vuln_norm = np.nan_to_num(np.asarray(vulnerability_scores, dtype=np.float64) / 10.0)
+    anom_norm = np.nan_to_num(np.asarray(anomaly_scores, dtype=np.float64) / 100.0)
+    risk = np.where(
+        (vuln_norm > 0) & (anom_norm == 0), vuln_norm,
+        np.where((anom_norm > 0) & (vuln_norm == 0), anom_norm, vuln_norm * 0.4 + anom_norm * 0.6),
+    )
+    return risk.astype(np.float32).clip(0, 1)
+
+def predict_actions(model, risks):
+    """Runs the PPO policy once over a whole batch of composite risk values."""
+    obs = np.asarray(risks, dtype=np.float32).reshape(-1, 1)
+    actions, _ = model.predict(obs, deterministic=True)
+    return np.asarray(actions, dtype=np.int64).reshape(-1)
+
+class ApceLookupTable:
+    """
+    The deterministic APCE policy sampled on an evenly spaced grid of composite
+    risk values in [0, 1]. Lookups round to the nearest grid point, so they are
+    O(1) NumPy indexing with no torch forward pass on the request path.
+    """
+    def __init__(self, actions):
+        self.actions = np.asarray(actions, dtype=np.int8)
+        self.resolution = len(self.actions)
+
+    @classmethod
+    def from_model(cls, model, resolution=DEFAULT_RESOLUTION):
+        grid = np.linspace(0, 1, resolution, dtype=np.float32)
+        return cls(predict_actions(model, grid))
+
+    @classmethod
+    def load(cls, path):
+        return cls(np.load(path))
+
+    def save(self, path):
+        np.save(path, self.actions)
+
+    def predict(self, risks):
+        positions = np.rint(np.clip(np.asarray(risks, dtype=np.float64), 0, 1) * (self.resolution - 1))
+        return self.actions[positions.astype(np.int64)].astype(np.int64)
+
+if __name__ == "__main__":
+    # Export the lookup table for a trained policy:
+    #   python -m src.components.apce_policy models/apce_model.zip models/apce_lookup.npy [resolution]
+    from stable_baselines3 import PPO
+    if len(sys.argv) not in (3, 4):
+        print("Usage: python -m src.components.apce_policy <apce_model.zip> <output.npy> [resolution]")
+        sys.exit(1)
+    resolution = int(sys.argv[3]) if len(sys.argv) == 4 else DEFAULT_RESOLUTION
+    table = ApceLookupTable.from_model(PPO.load(sys.argv[1]), resolution)
+    table.save(sys.argv[2])
+    print(f"Saved {table.resolution}-point APCE lookup table to '{sys.argv[2]}'.")
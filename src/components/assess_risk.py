@@ -0,0 +1,260 @@
+import argparse
+import itertools
+import os
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+import joblib
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from threadpoolctl import threadpool_limits
+from src.components.apce_policy import ACTION_MAP, ApceLookupTable
+from src.components.dtde_preprocessor import DTDEPreprocessor
+from src.components.key_risk import DEFAULT_HALF_LIFE_HOURS, KeyRiskTable
+from src.components.log_store import iter_log_chunks
+from src.components.srae_preprocessor import SRAEPreprocessor
+from src.components.train_model import iter_dataset_chunks
+from src.components.tree_runtime import load_compiled_model
+from src.components.window_features import WINDOW_FEATURE_COLUMNS, SlidingWindowFeatures
+
+# --- Configuration ---
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../../models')
+CHUNK_ROWS = 100_000
+# Logs are featurized and scored this many rows at a time inside a worker, as in the
+# API: a one-hot DTDE matrix of a whole chunk can run to gigabytes
+DTDE_SCORE_CHUNK_SIZE = 5000
+OUTPUT_FORMATS = ['parquet', 'csv']
+
+# --- Worker State ---
+# Each pool worker loads the models once, in its initializer
+_models = None
+
+def load_models(runtime):
+    """
+    The SRAE and DTDE models with their preprocessors. runtime 'compiled' uses the
+    NumPy tree exports where they exist, like the API's CHIMERA_MODEL_RUNTIME.
+    """
+    models = {}
+    for name, preprocessor_class in [('srae', SRAEPreprocessor), ('dtde', DTDEPreprocessor)]:
+        compiled_file = os.path.join(MODELS_DIR, f'{name}_model.npz')
+        if runtime == 'compiled' and os.path.exists(compiled_file):
+            model = load_compiled_model(compiled_file)
+            config = model.metadata.get('preprocessor')
+            data = {'model': model, 'preprocessor': preprocessor_class.from_config(config) if config else preprocessor_class()}
+        else:
+            data = joblib.load(os.path.join(MODELS_DIR, f'{name}_model.joblib'))
+            if not isinstance(data, dict):
+                # SRAE models saved before the preprocessor was bundled are a bare XGBRegressor
+                data = {'model': data, 'preprocessor': preprocessor_class()}
+        models[name] = data
+    return models
+
+def init_worker(runtime):
+    global _models
+    # Parallelism comes from the worker processes; library thread pools (OpenMP, BLAS)
+    # inside each worker would only oversubscribe the cores
+    threadpool_limits(1)
+    _models = load_models(runtime)
+
+def score_key_chunk(args):
+    """SRAE vulnerability scores (0-100, rounded like the API) for one chunk of the inventory."""
+    chunk, now = args
+    srae = _models['srae']
+    scores = srae['model'].predict(srae['preprocessor'].transform_array(chunk, now=now))
+    return chunk['key_id'].to_numpy(), np.rint(scores).astype(int)
+
+def score_log_chunk(chunk):
+    """Raw DTDE IsolationForest scores for one chunk of logs."""
+    dtde = _models['dtde']
+    raw_scores = np.empty(len(chunk))
+    for start in range(0, len(chunk), DTDE_SCORE_CHUNK_SIZE):
+        rows = chunk.iloc[start:start + DTDE_SCORE_CHUNK_SIZE]
+        raw_scores[start:start + len(rows)] = dtde['model'].score_samples(dtde['preprocessor'].transform(rows))
+    return raw_scores
+
+def map_windowed(pool, func, tasks, workers):
+    """
+    pool.map over a lazily read task stream, a couple of tasks per worker at a
+    time, so chunks are never read much faster than they are scored.
+    """
+    tasks = iter(tasks)
+    while True:
+        window = list(itertools.islice(tasks, 2 * workers))
+        if not window:
+            return
+        yield from zip(window, pool.map(func, window))
+
+# --- Output ---
+class ChunkWriter:
+    """Appends DataFrame chunks to one Parquet or CSV file."""
+    def __init__(self, path):
+        self.path = path
+        self._writer = None
+
+    def write(self, chunk):
+        if self.path.endswith('.csv'):
+            chunk.to_csv(self.path, mode='a' if self._writer else 'w', header=not self._writer, index=False)
+            self._writer = True
+            return
+        # Categorical codes can change width between chunks, so strings are written plainly
+        chunk = chunk.astype({name: object for name, dtype in chunk.dtypes.items() if isinstance(dtype, pd.CategoricalDtype)})
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if isinstance(self._writer, pq.ParquetWriter):
+            self._writer.close()
+
+class Progress:
+    """Prints rows done and throughput after each chunk of a stage."""
+    def __init__(self, stage):
+        self.stage = stage
+        self.rows = 0
+        self.start = time.perf_counter()
+        self.seconds = None
+
+    def add(self, rows):
+        self.rows += rows
+        print(f"  {self.stage}: {self.rows:,} rows ({self.rows / self.elapsed():,.0f} rows/s)")
+
+    def elapsed(self):
+        return self.seconds if self.seconds is not None else time.perf_counter() - self.start
+
+    def finish(self, stages):
+        self.seconds = time.perf_counter() - self.start
+        stages.append(self)
+
+# --- Pipeline ---
+def assess_risk(inventory_path=None, logs_path=None, output_dir='.', output_format='parquet',
+                workers=None, chunk_rows=CHUNK_ROWS, runtime='joblib', half_life_hours=DEFAULT_HALF_LIFE_HOURS,
+                now=None):
+    """
+    Fleet-wide risk assessment outside the API. The key inventory is scored by
+    SRAE and the logs by DTDE, chunk by chunk across a process pool; the scores
+    are folded into a KeyRiskTable as in the API, and every key's composite risk
+    gets its APCE action. Writes scored_logs.<format> (each log with its raw and
+    0-100 anomaly score) and key_risk.<format> (one row per key, riskiest first).
+    Key ages and the decay of anomaly scores are taken as of `now` (default: the
+    current time).
+    """
+    now = now or datetime.now(timezone.utc)
+    workers = workers or os.cpu_count()
+    os.makedirs(output_dir, exist_ok=True)
+    key_risk = KeyRiskTable(half_life_hours)
+    stages = []
+    print(f"Assessing risk with {workers} worker processes ({runtime} models, {chunk_rows:,}-row chunks)...")
+
+    # Unlike multiprocessing.Pool, a worker that dies (e.g. out of memory) fails the run instead of hanging it
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(runtime,)) as pool:
+        # SRAE: vulnerability score per inventory key, every chunk aged against the same `now`
+        if inventory_path:
+            progress = Progress('SRAE keys')
+            tasks = ((chunk, now) for chunk in iter_dataset_chunks(inventory_path, chunk_rows))
+            for _, (key_ids, scores) in map_windowed(pool, score_key_chunk, tasks, workers):
+                key_risk.update_vulnerability(key_ids, scores)
+                progress.add(len(key_ids))
+            progress.finish(stages)
+
+        # DTDE: anomaly scores are normalized with the mean/std of the whole corpus (as the
+        # API does for the logs it loads), so raw scores are spooled and normalized in a second pass
+        if logs_path:
+            dtde_preprocessor = load_models(runtime)['dtde']['preprocessor']
+            window_features = SlidingWindowFeatures() if getattr(dtde_preprocessor, 'window_features', False) else None
+            progress = Progress('DTDE logs')
+            count, shift, total, total_squares = 0, None, 0.0, 0.0
+            with tempfile.TemporaryDirectory(dir=output_dir) as spool_dir:
+                spool = ChunkWriter(os.path.join(spool_dir, 'raw_scores.parquet'))
+                chunks = iter_log_chunks(logs_path, chunk_rows)
+                if window_features is not None:
+                    # Window counters carry across chunks, so they are computed here, in log order
+                    chunks = (pd.concat([chunk, window_features.transform(chunk)], axis=1) for chunk in chunks)
+                for chunk, raw_scores in map_windowed(pool, score_log_chunk, chunks, workers):
+                    if shift is None:
+                        shift = raw_scores.mean()
+                    count += len(raw_scores)
+                    total += (raw_scores - shift).sum()
+                    total_squares += np.square(raw_scores - shift).sum()
+                    if window_features is not None:
+                        chunk = chunk.drop(columns=WINDOW_FEATURE_COLUMNS)
+                    spool.write(chunk.assign(timestamp=pd.to_datetime(chunk['timestamp'], utc=True), raw_score=raw_scores))
+                    progress.add(len(raw_scores))
+                spool.close()
+                progress.finish(stages)
+
+                if count:
+                    mean = shift + total / count
+                    std = np.sqrt(max(total_squares / count - (total / count) ** 2, 0))
+                    progress = Progress('normalize logs')
+                    writer = ChunkWriter(os.path.join(output_dir, f'scored_logs.{output_format}'))
+                    for batch in pq.ParquetFile(spool.path).iter_batches(batch_size=chunk_rows):
+                        chunk = batch.to_pandas()
+                        if std > 0:
+                            scores = 50 + (mean - chunk['raw_score'].to_numpy()) / std * 25
+                        else:
+                            scores = np.full(len(chunk), 50.0)
+                        chunk['anomaly_score'] = np.clip(scores, 0, 100).round().astype(int)
+                        timestamps = chunk['timestamp'].dt.tz_convert(None).to_numpy()
+                        key_risk.update_logs(chunk['key_id'].to_numpy(), timestamps, chunk['anomaly_score'].to_numpy())
+                        writer.write(chunk)
+                        progress.add(len(chunk))
+                    writer.close()
+                    progress.finish(stages)
+
+    # APCE: one lookup per key over the composite risks
+    progress = Progress('APCE keys')
+    keys = key_risk.top(len(key_risk), now=now)
+    apce_lookup = load_apce_lookup()
+    if apce_lookup is not None:
+        actions = apce_lookup.predict(keys['composite_risk'].to_numpy())
+        keys['recommended_action'] = pd.Series(actions).map(ACTION_MAP).fillna("UNKNOWN").to_numpy()
+    else:
+        print("  No APCE lookup table or policy found; key_risk is written without recommended actions.")
+    writer = ChunkWriter(os.path.join(output_dir, f'key_risk.{output_format}'))
+    for start in range(0, len(keys), chunk_rows):
+        writer.write(keys.iloc[start:start + chunk_rows])
+    writer.close()
+    progress.add(len(keys))
+    progress.finish(stages)
+
+    print("--- Risk Assessment Summary ---")
+    for stage in stages:
+        print(f"{stage.stage:>15}: {stage.rows:>12,} rows in {stage.elapsed():8.1f} s "
+              f"({stage.rows / max(stage.elapsed(), 1e-9):>10,.0f} rows/s)")
+    print(f"Results written to '{output_dir}'.")
+    return keys
+
+def load_apce_lookup():
+    """The exported APCE lookup table, else one sampled from the PPO policy, else None."""
+    lookup_file = os.path.join(MODELS_DIR, 'apce_lookup.npy')
+    if os.path.exists(lookup_file):
+        return ApceLookupTable.load(lookup_file)
+    policy_file = os.path.join(MODELS_DIR, 'apce_model.zip')
+    if os.path.exists(policy_file):
+        from stable_baselines3 import PPO
+        return ApceLookupTable.from_model(PPO.load(policy_file))
+    return None
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Batch risk assessment: SRAE, DTDE and APCE over a whole fleet.")
+    parser.add_argument('--inventory', help="Key inventory (.csv or .parquet) to score with SRAE.")
+    parser.add_argument('--logs', help="Access logs (.json, .ndjson, .parquet or .arrow) to score with DTDE.")
+    parser.add_argument('--output-dir', default='risk_assessment')
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='parquet')
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--runtime', choices=['joblib', 'compiled'], default='joblib')
+    parser.add_argument('--half-life-hours', type=float, default=DEFAULT_HALF_LIFE_HOURS)
+    parser.add_argument('--as-of', type=datetime.fromisoformat, default=None,
+                        help="ISO-8601 time key ages and risk decay are computed at (UTC if no offset); defaults to now.")
+    args = parser.parse_args()
+    if not args.inventory and not args.logs:
+        parser.error("pass --inventory, --logs or both")
+
+    assess_risk(args.inventory, args.logs, args.output_dir, args.format,
+                args.workers, args.chunk_rows, args.runtime, args.half_life_hours,
+                args.as_of and (args.as_of if args.as_of.tzinfo else args.as_of.replace(tzinfo=timezone.utc)))
@@ -1,43 +1,256 @@
+import ipaddress
+import zlib
+import numpy as np
 import pandas as pd
+from scipy import sparse
 from sklearn.base import BaseEstimator, TransformerMixin
+from src.components.metrics import metrics
+from src.components.window_features import WINDOW_FEATURE_COLUMNS, SlidingWindowFeatures
 
 class DTDEPreprocessor(BaseEstimator, TransformerMixin):
     """
     This class handles all feature engineering for the DTDE model.
     It ensures that the data for prediction is identical in structure
     to the data used for training.
+
+    Categorical features are encoded through a fitted vocabulary that maps
+    each (feature, category) pair straight to its output column, so transform
+    fills a preallocated matrix instead of building a wide one-hot DataFrame.
+
+    ip_encoding bounds the width of the source_ip block:
+      'onehot'  - one column per IP seen during fit (original behaviour)
+      'top_k'   - the ip_top_k most frequent IPs plus an 'other' column
+      'subnet'  - the ip_top_k most frequent /24 subnets plus an 'other' column
+      'hash'    - ip_hash_buckets columns chosen by a stable hash of the IP
+      'private' - columns flagging private vs public addresses, plus 'other'
+    Under 'subnet' and 'private', source IPs that do not parse as an address
+    fall into the 'other' column.
+
+    window_features=True adds the per-principal and per-key sliding-window
+    counters (calls, failure ratio, distinct IPs) after the time features.
+    They are read from the input when it already carries them (live scoring
+    with a long-running SlidingWindowFeatures); otherwise they are computed
+    over the rows being transformed.
     """
-    def __init__(self):
+    numeric_features = ['hour', 'day_of_week']
+    features_to_encode = ['user_id', 'action', 'status', 'source_ip']
+    ip_encodings = ['onehot', 'top_k', 'subnet', 'hash', 'private']
+    other_category = 'other'
+
+    def __init__(self, ip_encoding='onehot', ip_top_k=50, ip_hash_buckets=64, window_features=False):
+        self.ip_encoding = ip_encoding
+        self.ip_top_k = ip_top_k
+        self.ip_hash_buckets = ip_hash_buckets
+        self.window_features = window_features
         self.columns = []
 
-    def fit(self, df, y=None):
-        # 1. Engineer time-based features
-        df_copy = df.copy()
-        df_copy['timestamp'] = pd.to_datetime(df_copy['timestamp'])
-        df_copy['hour'] = df_copy['timestamp'].dt.hour
-        df_copy['day_of_week'] = df_copy['timestamp'].dt.dayofweek
-
-        # 2. One-hot encode categorical features
-        features_to_encode = ['user_id', 'action', 'status', 'source_ip']
-        df_encoded = pd.get_dummies(df_copy, columns=features_to_encode, dtype=int)
-
-        # 3. Define and store the final feature set
-        features = df_encoded.drop(columns=['log_id', 'timestamp', 'key_id', 'user_agent'])
-        self.columns = features.columns.tolist()
+    def _get_ip_encoding(self):
+        # Preprocessors pickled before ip_encoding existed always used one-hot
+        return getattr(self, 'ip_encoding', 'onehot')
+
+    def _get_numeric_columns(self):
+        # Preprocessors pickled before window_features existed had none
+        if getattr(self, 'window_features', False):
+            return self.numeric_features + WINDOW_FEATURE_COLUMNS
+        return self.numeric_features
+
+    def _ip_tokens(self, source_ips):
+        """Maps raw source IPs to the tokens that become source_ip columns."""
+        ip_encoding = self._get_ip_encoding()
+        if ip_encoding in ('onehot', 'top_k'):
+            return source_ips
+
+        # Token functions run once per distinct IP, not once per log row
+        if ip_encoding == 'subnet':
+            to_token = lambda ip: ip.rsplit('.', 1)[0] + '.0/24' if self._parse_ip(ip) is not None else self.other_category
+        elif ip_encoding == 'hash':
+            to_token = lambda ip: f"bucket_{zlib.crc32(ip.encode()) % self.ip_hash_buckets}"
+        else:
+            to_token = lambda ip: self._private_token(self._parse_ip(ip))
+        codes, uniques = pd.factorize(source_ips)
+        tokens = np.array([to_token(ip) for ip in uniques] + [None], dtype=object)
+        return pd.Series(tokens[codes], index=source_ips.index)
+
+    @staticmethod
+    def _parse_ip(ip):
+        try:
+            return ipaddress.ip_address(ip)
+        except ValueError:
+            return None
+
+    def _private_token(self, address):
+        if address is None:
+            return self.other_category
+        return 'private' if address.is_private else 'public'
+
+    def _count_categories(self, df):
+        """Occurrences of each category of every encoded feature (IP tokens for source_ip)."""
+        counts = {}
+        for feature in self.features_to_encode:
+            values = self._ip_tokens(df[feature]) if feature == 'source_ip' else df[feature]
+            value_counts = values.value_counts()
+            value_counts = value_counts[value_counts > 0]
+            counts[feature] = pd.Series(value_counts.to_numpy(), index=value_counts.index.astype(object))
+        return counts
+
+    def _ip_categories_from_counts(self, ip_counts):
+        ip_encoding = self._get_ip_encoding()
+        if ip_encoding == 'hash':
+            return [f"bucket_{i}" for i in range(self.ip_hash_buckets)]
+        if ip_encoding == 'private':
+            return ['private', 'public', self.other_category]
+        if ip_encoding == 'onehot':
+            return sorted(ip_counts.index)
+        # Most frequent first, ties broken by token so chunked and in-memory fits agree
+        ranked = sorted(((token, count) for token, count in ip_counts.items() if token != self.other_category),
+                        key=lambda item: (-item[1], item[0]))
+        return sorted(token for token, _ in ranked[:self.ip_top_k]) + [self.other_category]
+
+    def _fit_counts(self, counts):
+        if self.ip_encoding not in self.ip_encodings:
+            raise ValueError(f"Unknown ip_encoding '{self.ip_encoding}', expected one of {self.ip_encodings}")
+
+        # 1. Time-based features come first, followed by one column per
+        # category of each encoded feature (sorted, as pd.get_dummies orders them)
+        columns = list(self._get_numeric_columns())
+        for feature in self.features_to_encode:
+            if feature == 'source_ip':
+                categories = self._ip_categories_from_counts(counts[feature])
+            else:
+                categories = sorted(counts[feature].index)
+            columns.extend(f"{feature}_{category}" for category in categories)
+
+        # 2. Define and store the final feature set
+        self.columns = columns
+        self.vocabulary_ = self._build_vocabulary()
         return self
 
+    def fit(self, df, y=None):
+        return self._fit_counts(self._count_categories(df))
+
+    def fit_chunks(self, chunks):
+        """
+        Fits the vocabulary from an iterable of DataFrames (see log_store.iter_log_chunks),
+        holding only per-category counts between chunks. Gives the same columns as
+        fit() on the concatenated frame.
+        """
+        totals = None
+        for chunk in chunks:
+            counts = self._count_categories(chunk)
+            if totals is None:
+                totals = counts
+            else:
+                totals = {feature: totals[feature].add(counts[feature], fill_value=0) for feature in totals}
+        if totals is None:
+            raise ValueError("fit_chunks received no data")
+        return self._fit_counts(totals)
+
+    def to_config(self):
+        """JSON-serializable state, stored with compiled models (see tree_runtime)."""
+        return {
+            'ip_encoding': self._get_ip_encoding(),
+            'ip_top_k': getattr(self, 'ip_top_k', 50),
+            'ip_hash_buckets': getattr(self, 'ip_hash_buckets', 64),
+            'window_features': getattr(self, 'window_features', False),
+            'columns': list(self.columns),
+        }
+
+    @classmethod
+    def from_config(cls, config):
+        config = dict(config)
+        columns = config.pop('columns')
+        preprocessor = cls(**config)
+        preprocessor.columns = columns
+        preprocessor.vocabulary_ = preprocessor._build_vocabulary()
+        return preprocessor
+
+    def _build_vocabulary(self):
+        """Maps each encoded feature to (category index, output column positions)."""
+        categories = {feature: [] for feature in self.features_to_encode}
+        positions = {feature: [] for feature in self.features_to_encode}
+        for position, column in enumerate(self.columns):
+            for feature in self.features_to_encode:
+                if column.startswith(feature + '_'):
+                    categories[feature].append(column[len(feature) + 1:])
+                    positions[feature].append(position)
+                    break
+        return {
+            feature: (pd.Index(categories[feature]), np.array(positions[feature], dtype=np.int64))
+            for feature in self.features_to_encode
+        }
+
+    def _get_vocabulary(self):
+        # Preprocessors pickled before the vocabulary existed only carry 'columns'
+        if getattr(self, 'vocabulary_', None) is None:
+            self.vocabulary_ = self._build_vocabulary()
+        return self.vocabulary_
+
+    def _encode(self, df):
+        """Returns (numeric feature block, one-hot row indices, one-hot column indices)."""
+        with metrics.stage('dtde_time_features', rows=len(df)):
+            timestamps = pd.to_datetime(df['timestamp'])
+            numeric = np.column_stack([
+                timestamps.dt.hour.to_numpy(),
+                timestamps.dt.dayofweek.to_numpy(),
+            ])
+        if getattr(self, 'window_features', False):
+            with metrics.stage('dtde_window_features', rows=len(df)):
+                if set(WINDOW_FEATURE_COLUMNS).issubset(df.columns):
+                    window = df[WINDOW_FEATURE_COLUMNS].to_numpy()
+                else:
+                    window = SlidingWindowFeatures().transform(df).to_numpy()
+                numeric = np.column_stack([numeric, window])
+
+        with metrics.stage('dtde_categorical_encoding', rows=len(df)):
+            rows, cols = self._encode_categories(df)
+        return numeric, rows, cols
+
+    def _encode_categories(self, df):
+        rows, cols = [], []
+        row_positions = np.arange(len(df))
+        has_other = self._get_ip_encoding() in ('top_k', 'subnet')
+        for feature, (categories, positions) in self._get_vocabulary().items():
+            if feature == 'source_ip':
+                tokens = self._ip_tokens(df[feature])
+                codes = categories.get_indexer(tokens)
+                if has_other:
+                    codes[(codes < 0) & tokens.notna().to_numpy()] = categories.get_loc(self.other_category)
+            elif isinstance(df[feature].dtype, pd.CategoricalDtype):
+                # Dictionary-encoded input: look up each distinct value once
+                category_codes = categories.get_indexer(df[feature].cat.categories)
+                row_codes = df[feature].cat.codes.to_numpy()
+                codes = np.where(row_codes >= 0, category_codes[row_codes], -1)
+            else:
+                codes = categories.get_indexer(df[feature])
+            known = codes >= 0
+            rows.append(row_positions[known])
+            cols.append(positions[codes[known]])
+        return np.concatenate(rows), np.concatenate(cols)
+
+    def transform_array(self, df, dtype=np.float32, as_sparse=False):
+        """
+        Encodes log rows directly into a (len(df), len(self.columns)) matrix.
+        With as_sparse=True a CSR matrix is returned, which IsolationForest
+        can score without ever allocating the dense one-hot block.
+        """
+        numeric, rows, cols = self._encode(df)
+        n_rows, n_numeric = len(df), numeric.shape[1]
+        if as_sparse:
+            numeric_rows = np.repeat(np.arange(n_rows), n_numeric)
+            numeric_cols = np.tile(np.arange(n_numeric), n_rows)
+            data = np.concatenate([numeric.ravel(), np.ones(len(rows))]).astype(dtype)
+            return sparse.csr_matrix(
+                (data, (np.concatenate([numeric_rows, rows]), np.concatenate([numeric_cols, cols]))),
+                shape=(n_rows, len(self.columns)),
+            )
+
+        with metrics.stage('dtde_matrix_fill', rows=n_rows):
+            matrix = np.zeros((n_rows, len(self.columns)), dtype=dtype)
+            matrix[:, :n_numeric] = numeric
+            matrix[rows, cols] = 1
+        return matrix
+
     def transform(self, df, y=None):
-        # 1. Engineer features on the new data
-        df_copy = df.copy()
-        df_copy['timestamp'] = pd.to_datetime(df_copy['timestamp'])
-        df_copy['hour'] = df_copy['timestamp'].dt.hour
-        df_copy['day_of_week'] = df_copy['timestamp'].dt.dayofweek
-        
-        features_to_encode = ['user_id', 'action', 'status', 'source_ip']
-        df_encoded = pd.get_dummies(df_copy, columns=features_to_encode, dtype=int)
-        
-        # 2. Reindex to match the columns learned during 'fit'
-        # This guarantees the structure is identical.
-        final_df = df_encoded.reindex(columns=self.columns, fill_value=0)
-        
-        return final_df[self.columns]
\ No newline at end of file
+        # The structure is identical to the columns learned during 'fit';
+        # categories unseen at fit time are simply left as all-zero.
+        return pd.DataFrame(self.transform_array(df), columns=self.columns, index=df.index)
@@ -1,4 +1,6 @@
+import argparse
 import pandas as pd
+import numpy as np
 import random
 import json
 from datetime import datetime, timedelta
@@ -7,6 +9,14 @@ from datetime import datetime, timedelta
 NUM_RECORDS = 10000
 OUTPUT_FILE = '../../data/key_inventory_labeled.csv'
 
+# Distributions shared by the per-row and vectorized generators
+ALGORITHMS = ['AES_256', 'RSA_4096', 'RSA_2048', '3DES']
+ALGORITHM_WEIGHTS = [60, 20, 15, 5]
+WILDCARD_POLICY_RATE = 0.1
+WILDCARD_POLICY = json.dumps({"Principal":{"AWS":"*"},"Action":"kms:*"})
+SPECIFIC_POLICY = json.dumps({"Principal":{"AWS":"arn:aws:iam::12345:role/specific-role"},"Action":"kms:Encrypt"})
+MAX_KEY_AGE_SECONDS = 1825 * 24 * 3600
+
 # --- (IMPROVED) Helper Functions to create diverse data ---
 def get_random_date():
     """Generates a truly random datetime within the last 5 years."""
@@ -21,12 +31,12 @@ def get_random_date():
     return random_date
 
 def get_random_algorithm():
-    return random.choices(['AES_256', 'RSA_4096', 'RSA_2048', '3DES'], weights=[60, 20, 15, 5], k=1)[0]
+    return random.choices(ALGORITHMS, weights=ALGORITHM_WEIGHTS, k=1)[0]
 
 def get_random_policy():
-    if random.random() < 0.1: # 10% chance of a wildcard policy
-        return json.dumps({"Principal":{"AWS":"*"},"Action":"kms:*"})
-    return json.dumps({"Principal":{"AWS":"arn:aws:iam::12345:role/specific-role"},"Action":"kms:Encrypt"})
+    if random.random() < WILDCARD_POLICY_RATE: # 10% chance of a wildcard policy
+        return WILDCARD_POLICY
+    return SPECIFIC_POLICY
 
 # --- Rule-based scoring function (our "teacher") ---
 def calculate_score(row):
@@ -50,26 +60,105 @@ def calculate_score(row):
     noisy_score = normalized_score + random.uniform(-3, 3) # Add randomness
     return max(0, min(100, round(noisy_score)))
 
+# --- Vectorized generation and scoring (same distributions and rules as above) ---
+def make_key_ids(num_records):
+    """'key-00000' style ids built from digit arrays; zero-padded to the widest id in the fleet."""
+    width = max(5, len(str(num_records - 1)))
+    positions = np.arange(num_records)
+    chars = np.empty((num_records, 4 + width), dtype=np.uint8)
+    chars[:, :4] = np.frombuffer(b'key-', dtype=np.uint8)
+    for digit in range(width):
+        chars[:, 3 + width - digit] = ord('0') + (positions // 10**digit) % 10
+    return chars.view(f'S{4 + width}').ravel().astype(str)
+
+def generate_records(num_records, seed=None, now=None):
+    """Samples num_records key configurations with NumPy arrays instead of per-row random calls."""
+    rng = np.random.default_rng(seed)
+    now = now or datetime.now()
+    start_date = np.datetime64(now - timedelta(days=1825), 'us')
+    probabilities = np.asarray(ALGORITHM_WEIGHTS) / sum(ALGORITHM_WEIGHTS)
+    return pd.DataFrame({
+        'key_id': make_key_ids(num_records),
+        'creation_date': start_date + rng.integers(0, MAX_KEY_AGE_SECONDS, num_records).astype('timedelta64[s]'),
+        'algorithm': pd.Categorical.from_codes(rng.choice(len(ALGORITHMS), num_records, p=probabilities), ALGORITHMS),
+        'is_hsm_backed': rng.random(num_records) < 0.5,
+        'rotation_enabled': rng.random(num_records) < 0.5,
+        'permission_policy': pd.Categorical.from_codes(
+            (rng.random(num_records) >= WILDCARD_POLICY_RATE).astype(np.int8), [WILDCARD_POLICY, SPECIFIC_POLICY]),
+    })
+
+def calculate_rule_scores(df, now=None):
+    """calculate_score's rule total (before noise) for a whole frame at once."""
+    now = now or datetime.now()
+    age_days = (pd.Timestamp(now) - pd.to_datetime(df['creation_date'])).dt.days.to_numpy()
+    score = np.where(age_days > 730, 20, np.where(age_days > 365, 10, 0))
+    score += np.where(df['algorithm'].isin(['RSA_2048', '3DES']).to_numpy(), 30, 0)
+    score += np.where(df['is_hsm_backed'].to_numpy(dtype=bool), 0, 15)
+    score += np.where(df['rotation_enabled'].to_numpy(dtype=bool), 0, 15)
+    # Parse each distinct policy once rather than once per row
+    policies = df['permission_policy'].astype('category')
+    wildcard = np.array([json.loads(p).get('Principal', {}).get('AWS', '') == '*' for p in policies.cat.categories])
+    score += np.where(wildcard[policies.cat.codes.to_numpy()], 40, 0)
+    return np.minimum(100, score)
+
+def calculate_scores(df, seed=None, now=None):
+    """Vectorized calculate_score: rule total plus uniform(-3, 3) noise, rounded and clipped to 0-100."""
+    rng = np.random.default_rng(seed)
+    noisy_scores = calculate_rule_scores(df, now) + rng.uniform(-3, 3, len(df))
+    return np.clip(np.rint(noisy_scores), 0, 100).astype(np.int64)
+
+def generate_labeled_dataset(num_records, seed=None):
+    now = datetime.now()
+    df = generate_records(num_records, seed=seed, now=now)
+    df['vulnerability_score'] = calculate_scores(df, seed=None if seed is None else seed + 1, now=now)
+    return df
+
 # --- Main Generation Logic ---
-print(f"Generating {NUM_RECORDS} synthetic records with varied timestamps...")
-data = []
-for i in range(NUM_RECORDS):
-    record = {
-        'key_id': f'key-{i:05d}',
-        'creation_date': get_random_date(), # Using the improved function
-        'algorithm': get_random_algorithm(),
-        'is_hsm_backed': random.choice([True, False]),
-        'rotation_enabled': random.choice([True, False]),
-        'permission_policy': get_random_policy()
-    }
-    data.append(record)
-
-df = pd.DataFrame(data)
-# Apply the "teacher" scoring function to create our labels
-df['vulnerability_score'] = df.apply(calculate_score, axis=1)
-
-# Save to CSV
-df.to_csv(OUTPUT_FILE, index=False)
-print(f"Labeled dataset successfully created at '{OUTPUT_FILE}'")
-print("\nSample of the newly generated data:")
-print(df[['key_id', 'creation_date', 'vulnerability_score']].head())
\ No newline at end of file
+def generate_records_loop(num_records):
+    """The original per-row generator, labeled with calculate_score via df.apply."""
+    data = []
+    for i in range(num_records):
+        record = {
+            'key_id': f'key-{i:05d}',
+            'creation_date': get_random_date(), # Using the improved function
+            'algorithm': get_random_algorithm(),
+            'is_hsm_backed': random.choice([True, False]),
+            'rotation_enabled': random.choice([True, False]),
+            'permission_policy': get_random_policy()
+        }
+        data.append(record)
+
+    df = pd.DataFrame(data)
+    # Apply the "teacher" scoring function to create our labels
+    df['vulnerability_score'] = df.apply(calculate_score, axis=1)
+    return df
+
+def generate_dataset():
+    print(f"Generating {NUM_RECORDS} synthetic records with varied timestamps...")
+    df = generate_records_loop(NUM_RECORDS)
+
+    # Save to CSV
+    df.to_csv(OUTPUT_FILE, index=False)
+    print(f"Labeled dataset successfully created at '{OUTPUT_FILE}'")
+    print("\nSample of the newly generated data:")
+    print(df[['key_id', 'creation_date', 'vulnerability_score']].head())
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate the labeled key inventory dataset.")
+    parser.add_argument('--scale', type=int, help="Generate this many keys with the vectorized generator.")
+    parser.add_argument('--output', help="CSV or Parquet (.parquet) output file for --scale.")
+    parser.add_argument('--seed', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.scale:
+        output = args.output or OUTPUT_FILE
+        print(f"Generating {args.scale} labeled key records (vectorized)...")
+        df = generate_labeled_dataset(args.scale, seed=args.seed)
+        if output.endswith('.parquet'):
+            df.to_parquet(output, index=False)
+        else:
+            df.to_csv(output, index=False)
+        print(f"Labeled dataset successfully created at '{output}'")
+        print(df['vulnerability_score'].describe())
+    else:
+        generate_dataset()
@@ -1,13 +1,23 @@
+import argparse
 import json
 import random
 from datetime import datetime, timedelta, timezone # <-- FIX: Import timezone
 import os # <-- FIX: Import the os module
+from multiprocessing import Pool
+import numpy as np
+import pandas as pd
 from faker import Faker
 
 # --- Configuration ---
 NUM_LOGS = 10000
 ANOMALY_RATE = 0.02
 
+# Scale mode (--scale): logs per chunk and size of the precomputed IP pools
+SCALE_CHUNK_SIZE = 500_000
+IP_POOL_SIZE = 4096
+# Time of the newest log in scale mode when a seed is given, so seeded output is reproducible
+SCALE_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
 # --- FIX: Build a robust file path based on the script's location ---
 SCRIPT_DIR = os.path.dirname(__file__)
 OUTPUT_FILE = os.path.join(SCRIPT_DIR, '../../data/kms_access_logs.json')
@@ -71,30 +81,178 @@ def generate_anomaly(timestamp):
         
     return log
 
+# --- Scale Mode: vectorized, seeded, chunked generation ---
+# Array form of the same profiles as generate_normal_log / generate_anomaly
+APP_SERVER, DATA_PIPELINE, SECURITY_ADMIN = range(len(NORMAL_USERS))
+ANOMALY_IP, ANOMALY_ACTION, ANOMALY_TIME, ANOMALY_BRUTE_FORCE = range(4)
+ACTIONS = np.array(['Encrypt', 'Decrypt', 'DescribeKey'], dtype=object)
+HEX_DIGITS = np.frombuffer(b'0123456789abcdef', dtype=np.uint8)
+
+def build_ip_pools(seed):
+    """Private and public IPv4 pools drawn once from a seeded Faker."""
+    pool_faker = Faker()
+    pool_faker.seed_instance(seed)
+    private_ips = np.array([pool_faker.ipv4_private() for _ in range(IP_POOL_SIZE)], dtype=object)
+    public_ips = np.array([pool_faker.ipv4_public() for _ in range(IP_POOL_SIZE)], dtype=object)
+    return private_ips, public_ips
+
+def random_uuid4s(rng, n):
+    """n random (version 4) UUID strings, formatted without a per-row Python loop."""
+    raw = rng.integers(0, 256, size=(n, 16), dtype=np.uint8)
+    raw[:, 6] = (raw[:, 6] & 0x0F) | 0x40
+    raw[:, 8] = (raw[:, 8] & 0x3F) | 0x80
+    hex_chars = np.empty((n, 32), dtype=np.uint8)
+    hex_chars[:, 0::2] = HEX_DIGITS[raw >> 4]
+    hex_chars[:, 1::2] = HEX_DIGITS[raw & 0x0F]
+    dashed = np.full((n, 36), ord('-'), dtype=np.uint8)
+    for start, stop, offset in [(0, 8, 0), (8, 12, 1), (12, 16, 2), (16, 20, 3), (20, 32, 4)]:
+        dashed[:, start + offset:stop + offset] = hex_chars[:, start:stop]
+    return dashed.view('S36').ravel().astype(str).astype(object)
+
+def generate_log_chunk(args):
+    """
+    Generates logs [start, start + n) with the profiles of the scripted generator.
+    Each chunk has its own seed, so output does not depend on the worker count.
+    """
+    start, n, seed, current_time, private_ips, public_ips = args
+    rng = np.random.default_rng(seed)
+
+    # Timestamps: log i is i * (1-10 minutes) before current_time
+    offsets = np.arange(start, start + n) * rng.integers(1, 11, size=n)
+    timestamps = np.datetime64(current_time.replace(tzinfo=None), 'us') - offsets.astype('timedelta64[m]')
+    hours = (timestamps.astype('datetime64[h]').astype(np.int64)) % 24
+    is_odd_hour = (hours >= 2) & (hours <= 4)
+    is_anomaly = (is_odd_hour & (rng.random(n) < 0.5)) | (rng.random(n) < ANOMALY_RATE)
+
+    # Normal behaviour (generate_normal_log)
+    users = rng.integers(0, len(NORMAL_USERS), size=n)
+    actions = np.where(users == APP_SERVER, 'Encrypt',
+                       np.where(users == DATA_PIPELINE, 'Decrypt', ACTIONS[rng.integers(0, 3, size=n)])).astype(object)
+    source_ips = np.where(users == APP_SERVER, '52.95.110.1',
+                          np.where(users == DATA_PIPELINE, '10.0.1.55',
+                                   private_ips[rng.integers(0, len(private_ips), size=n)])).astype(object)
+    statuses = np.full(n, 'Success', dtype=object)
+
+    # Anomalies (generate_anomaly) override parts of the normal log
+    anomaly_types = np.where(is_anomaly, rng.integers(0, 4, size=n), -1)
+    ip_anomaly = anomaly_types == ANOMALY_IP
+    users[ip_anomaly | (anomaly_types == ANOMALY_ACTION)] = APP_SERVER
+    users[anomaly_types == ANOMALY_TIME] = SECURITY_ADMIN
+    source_ips[ip_anomaly] = public_ips[rng.integers(0, len(public_ips), size=int(ip_anomaly.sum()))]
+    actions[(anomaly_types == ANOMALY_IP) | (anomaly_types == ANOMALY_ACTION) | (anomaly_types == ANOMALY_BRUTE_FORCE)] = 'Decrypt'
+    statuses[anomaly_types == ANOMALY_BRUTE_FORCE] = 'Failure'
+
+    return pd.DataFrame({
+        "log_id": random_uuid4s(rng, n),
+        "timestamp": pd.DatetimeIndex(timestamps).tz_localize('UTC'),
+        "key_id": np.array(KEY_IDS, dtype=object)[rng.integers(0, len(KEY_IDS), size=n)],
+        "user_id": np.array(NORMAL_USERS, dtype=object)[users],
+        "source_ip": source_ips,
+        "action": actions,
+        "user_agent": "aws-sdk-py/1.28.58",
+        "status": statuses,
+    })
+
+def generate_logs_at_scale(num_logs, output_file, seed=0, workers=None, chunk_size=SCALE_CHUNK_SIZE, now=SCALE_EPOCH):
+    """
+    Generates num_logs logs in parallel chunks and streams them to NDJSON or
+    Parquet (chosen by output_file's extension), holding only a few chunks in memory.
+    Timestamps count back from `now` (UTC if naive), so a fixed seed and `now`
+    always give the same file.
+    """
+    current_time = now.astimezone(timezone.utc) if now.tzinfo else now.replace(tzinfo=timezone.utc)
+    private_ips, public_ips = build_ip_pools(seed)
+    starts = range(0, num_logs, chunk_size)
+    chunk_seeds = np.random.SeedSequence(seed).spawn(len(starts))
+    tasks = [(start, min(chunk_size, num_logs - start), chunk_seed, current_time, private_ips, public_ips)
+             for start, chunk_seed in zip(starts, chunk_seeds)]
+
+    writer = ParquetChunkWriter(output_file) if output_file.endswith('.parquet') else NdjsonChunkWriter(output_file)
+    workers = workers or os.cpu_count()
+    with Pool(workers) as pool:
+        # Hand out a couple of chunks per worker at a time so finished chunks never pile up
+        for window_start in range(0, len(tasks), 2 * workers):
+            window = tasks[window_start:window_start + 2 * workers]
+            for i, chunk in enumerate(pool.imap(generate_log_chunk, window), start=window_start + 1):
+                writer.write(chunk)
+                print(f"  wrote chunk {i}/{len(tasks)} ({len(chunk)} logs)")
+    writer.close()
+
+class NdjsonChunkWriter:
+    def __init__(self, path):
+        self._file = open(path, 'w')
+
+    def write(self, chunk):
+        utc_times = chunk['timestamp'].dt.tz_convert(None).to_numpy()
+        chunk = chunk.assign(timestamp=np.char.add(np.datetime_as_string(utc_times, unit='us'), '+00:00'))
+        chunk.to_json(self._file, orient='records', lines=True)
+
+    def close(self):
+        self._file.close()
+
+class ParquetChunkWriter:
+    def __init__(self, path):
+        self.path = path
+        self._writer = None
+
+    def write(self, chunk):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        table = pa.Table.from_pandas(chunk, preserve_index=False)
+        if self._writer is None:
+            self._writer = pq.ParquetWriter(self.path, table.schema)
+        self._writer.write_table(table)
+
+    def close(self):
+        if self._writer is not None:
+            self._writer.close()
+
 # --- Main Generation Logic ---
-print(f"Generating {NUM_LOGS} log records...")
-logs = []
-# --- FIX: Use timezone-aware datetime.now() ---
-current_time = datetime.now(timezone.utc)
-# --- END FIX ---
+def generate_logs():
+    print(f"Generating {NUM_LOGS} log records...")
+    logs = []
+    # --- FIX: Use timezone-aware datetime.now() ---
+    current_time = datetime.now(timezone.utc)
+    # --- END FIX ---
 
-for i in range(NUM_LOGS):
-    time_delta = timedelta(minutes=random.randint(1, 10))
-    log_time = current_time - (i * time_delta)
-    
-    is_odd_hour = 2 <= log_time.hour <= 4
-    
-    if is_odd_hour and random.random() < 0.5:
-        logs.append(generate_anomaly(log_time))
-    elif random.random() < ANOMALY_RATE:
-        logs.append(generate_anomaly(log_time))
-    else:
-        logs.append(generate_normal_log(log_time))
+    for i in range(NUM_LOGS):
+        time_delta = timedelta(minutes=random.randint(1, 10))
+        log_time = current_time - (i * time_delta)
+
+        is_odd_hour = 2 <= log_time.hour <= 4
+
+        if is_odd_hour and random.random() < 0.5:
+            logs.append(generate_anomaly(log_time))
+        elif random.random() < ANOMALY_RATE:
+            logs.append(generate_anomaly(log_time))
+        else:
+            logs.append(generate_normal_log(log_time))
 
-# Save to a JSON file
-with open(OUTPUT_FILE, 'w') as f:
-    json.dump(logs, f, indent=2)
+    # Save to a JSON file
+    with open(OUTPUT_FILE, 'w') as f:
+        json.dump(logs, f, indent=2)
 
-print(f"Successfully generated log file at '{OUTPUT_FILE}'")
-print("\nSample of a normal log entry:")
-print(json.dumps(logs[0], indent=2))
\ No newline at end of file
+    print(f"Successfully generated log file at '{OUTPUT_FILE}'")
+    print("\nSample of a normal log entry:")
+    print(json.dumps(logs[0], indent=2))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate synthetic KMS access logs.")
+    parser.add_argument('--scale', type=int, help="Generate this many logs with the parallel, vectorized generator.")
+    parser.add_argument('--output', help="NDJSON (.ndjson) or Parquet (.parquet) output file for --scale.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for --scale (default 0).")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--start-time', type=datetime.fromisoformat, default=None,
+                        help="ISO-8601 time of the newest --scale log (UTC if no offset); "
+                             f"defaults to {SCALE_EPOCH.isoformat()} with --seed, otherwise now.")
+    args = parser.parse_args()
+
+    if args.scale:
+        output = args.output or os.path.join(SCRIPT_DIR, '../../data/kms_access_logs_scale.ndjson')
+        seed = 0 if args.seed is None else args.seed
+        start_time = args.start_time or (SCALE_EPOCH if args.seed is not None else datetime.now(timezone.utc))
+        print(f"Generating {args.scale} log records across worker processes (seed={seed}, newest at {start_time.isoformat()})...")
+        generate_logs_at_scale(args.scale, output, seed=seed, workers=args.workers, now=start_time)
+        print(f"Successfully generated log file at '{output}'")
+    else:
+        generate_logs()
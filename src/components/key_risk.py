@@ -0,0 +1,154 @@
+import threading
+import time
+from datetime import timezone
+import numpy as np
+import pandas as pd
+from src.components.apce_policy import composite_risk
+
+# --- Configuration ---
+DEFAULT_HALF_LIFE_HOURS = 24.0
+# SRAE scores are 0-100; composite_risk takes vulnerability on /get_action's 0-10 scale
+VULNERABILITY_SCALE = 10.0
+
+class KeyRiskTable:
+    """
+    Materialized per-key risk: each key's SRAE vulnerability joined with an
+    exponentially time-decayed average of the anomaly scores of its logs, and
+    the composite risk of the two (as /get_action computes it).
+
+    Per key it keeps a decayed score sum and weight anchored at the key's latest
+    log time, so a batch of scored logs is folded in with one grouped pass over
+    the batch, in any arrival order. Logs weigh 0.5 ** (age / half_life) relative
+    to the key's most recent log, and when scores are read the average itself
+    decays by 0.5 ** (hours since that log / half_life) as of the read time, so a
+    key that stops logging fades out. Composite risk is computed at read time.
+    """
+    def __init__(self, half_life_hours=DEFAULT_HALF_LIFE_HOURS, capacity=1024):
+        self.tau_seconds = half_life_hours * 3600 / np.log(2)
+        self._lock = threading.Lock()
+        self._index = {}
+        self.key_ids = np.empty(capacity, dtype=object)
+        self.vulnerability = np.full(capacity, np.nan)
+        self.decayed_sum = np.zeros(capacity)
+        self.decayed_weight = np.zeros(capacity)
+        self.last_seen = np.full(capacity, np.nan)
+        self.log_count = np.zeros(capacity, dtype=np.int64)
+
+    def __len__(self):
+        return len(self._index)
+
+    def _rows(self, key_ids):
+        """Row of each key id, adding rows (and growing the arrays) for unseen keys."""
+        unseen = [key_id for key_id in pd.unique(np.asarray(key_ids, dtype=object)) if key_id not in self._index]
+        if unseen:
+            needed = len(self._index) + len(unseen)
+            capacity = len(self.key_ids)
+            if needed > capacity:
+                while capacity < needed:
+                    capacity *= 2
+                for name, fill in [('key_ids', None), ('vulnerability', np.nan), ('decayed_sum', 0),
+                                   ('decayed_weight', 0), ('last_seen', np.nan), ('log_count', 0)]:
+                    values = getattr(self, name)
+                    grown = np.full(capacity, fill, dtype=values.dtype)
+                    grown[:len(self._index)] = values[:len(self._index)]
+                    setattr(self, name, grown)
+            for key_id in unseen:
+                self.key_ids[len(self._index)] = key_id
+                self._index[key_id] = len(self._index)
+        return np.fromiter((self._index[key_id] for key_id in key_ids), dtype=np.int64, count=len(key_ids))
+
+    @staticmethod
+    def _as_of_seconds(now):
+        """Epoch seconds of `now` (a datetime, naive taken as UTC), or of the current time when None."""
+        if now is None:
+            return time.time()
+        return (now if now.tzinfo else now.replace(tzinfo=timezone.utc)).timestamp()
+
+    def anomaly_scores(self, rows, now=None):
+        """Decayed average anomaly score of each row as of `now` (NaN for keys without logs)."""
+        rows = np.asarray(rows, dtype=np.int64)
+        staleness = np.maximum(self._as_of_seconds(now) - self.last_seen[rows], 0)
+        with np.errstate(invalid='ignore', divide='ignore'):
+            average = np.where(self.decayed_weight[rows] > 0, self.decayed_sum[rows] / self.decayed_weight[rows], np.nan)
+        return average * np.exp(-staleness / self.tau_seconds)
+
+    def _risk(self, rows, anomaly):
+        return composite_risk(self.vulnerability[rows] / VULNERABILITY_SCALE, anomaly)
+
+    def update_vulnerability(self, key_ids, scores):
+        """Sets the SRAE vulnerability score (0-100) of each key."""
+        with self._lock:
+            rows = self._rows(list(key_ids))
+            self.vulnerability[rows] = np.asarray(scores, dtype=np.float64)
+
+    def update_logs(self, key_ids, timestamps, anomaly_scores):
+        """Folds a batch of scored logs (naive UTC datetime64 timestamps) into their keys' aggregates."""
+        if len(key_ids) == 0:
+            return
+        seconds = np.asarray(timestamps, dtype='datetime64[ns]').astype(np.int64) / 1e9
+        scores = np.asarray(anomaly_scores, dtype=np.float64)
+        with self._lock:
+            rows = self._rows(list(key_ids))
+            touched, group = np.unique(rows, return_inverse=True)
+
+            # The batch's contribution per key, anchored at the key's latest log in the batch
+            batch_latest = np.full(len(touched), -np.inf)
+            np.maximum.at(batch_latest, group, seconds)
+            weights = np.exp((seconds - batch_latest[group]) / self.tau_seconds)
+            batch_sum = np.bincount(group, weights=weights * scores, minlength=len(touched))
+            batch_weight = np.bincount(group, weights=weights, minlength=len(touched))
+
+            # Re-anchor both the stored state and the batch at the newer of the two times
+            previous = self.last_seen[touched]
+            latest = np.fmax(previous, batch_latest)
+            state_decay = np.where(np.isnan(previous), 0.0, np.exp((np.nan_to_num(previous) - latest) / self.tau_seconds))
+            batch_decay = np.exp((batch_latest - latest) / self.tau_seconds)
+            self.decayed_sum[touched] = self.decayed_sum[touched] * state_decay + batch_sum * batch_decay
+            self.decayed_weight[touched] = self.decayed_weight[touched] * state_decay + batch_weight * batch_decay
+            self.last_seen[touched] = latest
+            self.log_count[touched] += np.bincount(group, minlength=len(touched))
+
+    def _frame(self, rows, anomaly, risk):
+        return pd.DataFrame({
+            "key_id": self.key_ids[rows],
+            "vulnerability_score": self.vulnerability[rows],
+            "anomaly_score": anomaly.round(2),
+            "composite_risk": risk.astype(np.float64).round(4),
+            "log_count": self.log_count[rows],
+            "last_seen": pd.to_datetime(self.last_seen[rows], unit='s', utc=True).floor('us'),
+        })
+
+    def get(self, key_id, now=None):
+        """The risk record of one key as of `now` (missing scores as None), or None for an unknown key."""
+        with self._lock:
+            row = self._index.get(key_id)
+            if row is None:
+                return None
+            anomaly = self.anomaly_scores([row], now)
+            vulnerability, risk, last_seen = self.vulnerability[row], self._risk([row], anomaly)[0], self.last_seen[row]
+            return {
+                "key_id": key_id,
+                "vulnerability_score": None if np.isnan(vulnerability) else float(vulnerability),
+                "anomaly_score": None if np.isnan(anomaly[0]) else round(float(anomaly[0]), 2),
+                "composite_risk": round(float(risk), 4),
+                "log_count": int(self.log_count[row]),
+                # Same ISO-8601 form as the serialized frames from top()
+                "last_seen": None if np.isnan(last_seen) else
+                    np.datetime_as_string(np.datetime64(int(last_seen * 1e6), 'us')) + '+00:00',
+            }
+
+    def top(self, n, now=None):
+        """The n keys with the highest composite risk as of `now`, riskiest first, as a DataFrame."""
+        with self._lock:
+            size = len(self._index)
+            n = max(0, min(n, size))
+            if n == 0:
+                empty = np.empty(0, dtype=np.int64)
+                return self._frame(empty, np.empty(0), np.empty(0))
+            rows = np.arange(size)
+            anomaly = self.anomaly_scores(rows, now)
+            risk = self._risk(rows, anomaly)
+            candidates = np.argpartition(-risk, n - 1)[:n]
+            # Highest risk first; ties go to the key with the higher anomaly score
+            order = candidates[np.lexsort((-np.nan_to_num(anomaly[candidates], nan=-1), -risk[candidates]))]
+            return self._frame(order, anomaly[order], risk[order])
@@ -1,6 +1,22 @@
 import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
+from stable_baselines3.common.vec_env import VecEnv
+
+# --- Array-based dynamics shared with VecKmsEnv (mirror KmsEnv.step) ---
+# Risk bands: 0 = low (<0.3), 1 = medium (<0.6), 2 = high (<0.8), 3 = critical
+RISK_BAND_EDGES = np.array([0.3, 0.6, 0.8], dtype=np.float32)
+ACTION_COST = np.array([0, 0.1, 0.4, 0.6, 1.0])
+# REWARD_TABLE[band, action] = appropriateness reward - action cost
+REWARD_TABLE = np.array([
+    #  NO_OP  ALERT  ROTATE  RESTRICT  QUARANTINE
+    [  1.0,  -0.5,  -1.5,   -2.0,     -5.0],  # low
+    [ -2.0,   1.8,   0.5,   -2.0,     -5.0],  # medium
+    [ -2.0,  -1.0,   2.2,    2.8,     -5.0],  # high
+    [ -2.0,  -1.0,  -1.5,    1.0,      3.0],  # critical
+]) - ACTION_COST
+# Multiplicative effect of each action on the risk state
+ACTION_RISK_FACTOR = np.array([1.0, 0.95, 0.7, 0.5, 0.0], dtype=np.float32)
 
 class KmsEnv(gym.Env):
     metadata = {'render_modes': ['human']}
@@ -73,6 +89,91 @@ class KmsEnv(gym.Env):
         if mode == 'human':
             print(f"Current Risk: {self.state[0]:.3f}")
 
+class VecKmsEnv(VecEnv):
+    """
+    num_envs independent KmsEnv episodes stepped together with NumPy: one
+    digitize + table lookup for rewards and one vector multiply for the
+    transition, instead of Python branching per environment. Implements the
+    stable-baselines3 VecEnv API (finished episodes are reset automatically and
+    their final observation is reported in info['terminal_observation']).
+    """
+    def __init__(self, num_envs=16, seed=None):
+        observation_space = spaces.Box(low=0, high=1, shape=(1,), dtype=np.float32)
+        super().__init__(num_envs, observation_space, spaces.Discrete(5))
+        self._rng = np.random.default_rng(seed)
+        self.state = np.zeros((num_envs, 1), dtype=np.float32)
+        self._actions = None
+        self._scratch_env = None
+
+    def _initial_risk(self, n):
+        return self._rng.uniform(0.05, 1.0, size=n).astype(np.float32)
+
+    def reset(self):
+        if self._seeds[0] is not None:
+            self._rng = np.random.default_rng(self._seeds[0])
+        self._reset_seeds()
+        self.state[:, 0] = self._initial_risk(self.num_envs)
+        return self.state.copy()
+
+    def step_async(self, actions):
+        self._actions = np.asarray(actions, dtype=np.int64).reshape(self.num_envs)
+
+    def step_wait(self):
+        risk = self.state[:, 0]
+        rewards = REWARD_TABLE[np.digitize(risk, RISK_BAND_EDGES), self._actions].astype(np.float32)
+
+        # Apply the action's effect, then natural drift, as KmsEnv.step does
+        risk = risk * ACTION_RISK_FACTOR[self._actions]
+        risk = risk * self._rng.uniform(0.9, 1.1, size=self.num_envs).astype(np.float32)
+        risk = np.clip(risk, 0, 1)
+        dones = risk < 0.05
+
+        infos = [{} for _ in range(self.num_envs)]
+        for i in np.flatnonzero(dones):
+            infos[i] = {'terminal_observation': np.array([risk[i]], dtype=np.float32), 'TimeLimit.truncated': False}
+        risk[dones] = self._initial_risk(int(dones.sum()))
+        self.state[:, 0] = risk
+        return self.state.copy(), rewards, dones, infos
+
+    def close(self):
+        pass
+
+    def get_attr(self, attr_name, indices=None):
+        indices = self._get_indices(indices)
+        if attr_name == 'state':
+            return [self.state[i].copy() for i in indices]
+        return [getattr(self, attr_name)] * len(indices)
+
+    def set_attr(self, attr_name, value, indices=None):
+        indices = list(self._get_indices(indices))
+        if attr_name == 'state':
+            # The only per-environment attribute: a row of the vectorized state
+            self.state[indices, 0] = np.asarray(value, dtype=np.float32).reshape(-1)
+            return
+        if sorted(indices) != list(range(self.num_envs)):
+            raise ValueError(f"'{attr_name}' is shared by all {self.num_envs} environments; "
+                             "it cannot be set for a subset of them.")
+        setattr(self, attr_name, value)
+
+    def env_method(self, method_name, *method_args, indices=None, **method_kwargs):
+        """
+        Calls a KmsEnv method for each requested environment: a KmsEnv is loaded
+        with that environment's risk, the method runs on it, and the resulting
+        risk is written back into the vectorized state.
+        """
+        if self._scratch_env is None:
+            self._scratch_env = KmsEnv()
+        env = self._scratch_env
+        results = []
+        for i in self._get_indices(indices):
+            env.state = self.state[i].copy()
+            results.append(getattr(env, method_name)(*method_args, **method_kwargs))
+            self.state[i] = env.state
+        return results
+
+    def env_is_wrapped(self, wrapper_class, indices=None):
+        return [False] * len(self._get_indices(indices))
+
 if __name__ == '__main__':
     env = KmsEnv()
     obs, info = env.reset()
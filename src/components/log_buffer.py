@@ -0,0 +1,77 @@
+import threading
+import numpy as np
+import pandas as pd
+
+LOG_COLUMNS = ['log_id', 'timestamp', 'key_id', 'user_id', 'source_ip', 'action', 'user_agent', 'status']
+
+class LogBuffer:
+    """
+    Append-only, columnar in-memory store for scored KMS access logs.
+
+    Every column lives in its own NumPy array with spare capacity that doubles
+    when full, so appending k logs costs O(k) amortized and never copies or
+    rescans the history. DataFrames are only built for the rows being served.
+    Timestamps are kept as naive UTC datetime64 values.
+    """
+    def __init__(self, capacity=1024):
+        self._lock = threading.Lock()
+        self._size = 0
+        self._columns = {name: np.empty(capacity, dtype=object) for name in LOG_COLUMNS}
+        self._columns['timestamp'] = np.empty(capacity, dtype='datetime64[ns]')
+        self._columns['raw_score'] = np.empty(capacity, dtype=np.float64)
+        self._columns['anomaly_score'] = np.empty(capacity, dtype=np.int64)
+
+    @classmethod
+    def from_frame(cls, df, raw_scores, anomaly_scores):
+        buffer = cls(capacity=max(1024, 2 * len(df)))
+        buffer.append(df, raw_scores, anomaly_scores)
+        return buffer
+
+    def __len__(self):
+        return self._size
+
+    def _reserve(self, needed):
+        capacity = len(self._columns['raw_score'])
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity *= 2
+        for name, values in self._columns.items():
+            grown = np.empty(capacity, dtype=values.dtype)
+            grown[:self._size] = values[:self._size]
+            self._columns[name] = grown
+
+    def append(self, df, raw_scores, anomaly_scores):
+        """Appends scored log rows; they become visible to readers once fully written."""
+        timestamps = pd.to_datetime(df['timestamp'], utc=True).dt.tz_convert(None).to_numpy()
+        with self._lock:
+            start, stop = self._size, self._size + len(df)
+            self._reserve(stop)
+            for name in LOG_COLUMNS:
+                if name != 'timestamp':
+                    self._columns[name][start:stop] = df[name].to_numpy()
+            self._columns['timestamp'][start:stop] = timestamps
+            self._columns['raw_score'][start:stop] = raw_scores
+            self._columns['anomaly_score'][start:stop] = anomaly_scores
+            self._size = stop
+        return start
+
+    def column(self, name):
+        """A read-only view of one column over the rows currently in the buffer."""
+        view = self._columns[name][:self._size]
+        view.flags.writeable = False
+        return view
+
+    def _to_frame(self, selector):
+        df = pd.DataFrame({name: self._columns[name][selector] for name in LOG_COLUMNS + ['anomaly_score']})
+        df['timestamp'] = df['timestamp'].dt.tz_localize('UTC')
+        return df
+
+    def frame(self, start, stop):
+        """Rows [start, stop) as a DataFrame, costing O(stop - start)."""
+        stop = min(stop, self._size)
+        return self._to_frame(slice(max(start, 0), max(stop, 0)))
+
+    def take(self, positions):
+        """Rows at the given positions, in that order, as a DataFrame."""
+        return self._to_frame(np.asarray(positions, dtype=np.int64))
@@ -0,0 +1,164 @@
+import threading
+import numpy as np
+import pandas as pd
+
+INDEXED_FIELDS = ['key_id', 'user_id', 'action', 'status']
+MAX_ANOMALY_SCORE = 100
+
+class _PositionList:
+    """A growable, always-sorted int64 array of row positions."""
+    def __init__(self):
+        self._positions = np.empty(16, dtype=np.int64)
+        self._size = 0
+
+    def extend(self, positions):
+        needed = self._size + len(positions)
+        if needed > len(self._positions):
+            grown = np.empty(max(needed, 2 * len(self._positions)), dtype=np.int64)
+            grown[:self._size] = self._positions[:self._size]
+            self._positions = grown
+        self._positions[self._size:needed] = positions
+        self._size = needed
+
+    def view(self):
+        return self._positions[:self._size]
+
+class LogIndex:
+    """
+    Secondary indexes over a LogBuffer, maintained as rows are appended:
+    per-value row positions for key_id, user_id, action and status, and one
+    position list per integer anomaly score (0-100), which keeps rows ordered by
+    score without ever re-sorting the history. Queries intersect the smallest
+    position lists first and only touch the candidate rows.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._indexed_rows = 0
+        self._by_field = {field: {} for field in INDEXED_FIELDS}
+        self._by_score = [_PositionList() for _ in range(MAX_ANOMALY_SCORE + 1)]
+
+    @classmethod
+    def build(cls, buffer):
+        index = cls()
+        index.update(buffer)
+        return index
+
+    def update(self, buffer):
+        """Indexes any rows appended to the buffer since the last update."""
+        with self._lock:
+            start, stop = self._indexed_rows, len(buffer)
+            if stop <= start:
+                return
+            for field in INDEXED_FIELDS:
+                self._add_grouped(self._by_field[field], buffer.column(field)[start:stop], start)
+            scores = buffer.column('anomaly_score')[start:stop]
+            order = np.argsort(scores, kind='stable')
+            bounds = np.searchsorted(scores[order], np.arange(MAX_ANOMALY_SCORE + 2))
+            for score in range(MAX_ANOMALY_SCORE + 1):
+                if bounds[score] < bounds[score + 1]:
+                    self._by_score[score].extend(start + order[bounds[score]:bounds[score + 1]])
+            self._indexed_rows = stop
+
+    @staticmethod
+    def _add_grouped(value_index, values, offset):
+        codes, uniques = pd.factorize(values)
+        order = np.argsort(codes, kind='stable')
+        bounds = np.searchsorted(codes[order], np.arange(len(uniques) + 1))
+        for code, value in enumerate(uniques):
+            value_index.setdefault(value, _PositionList()).extend(offset + order[bounds[code]:bounds[code + 1]])
+
+    def _candidates(self, filters, min_score):
+        """Sorted row positions matching the equality filters and min_score, or None for 'all rows'."""
+        lists = [self._by_field[field].get(value, _PositionList()).view() for field, value in filters.items()]
+        if lists:
+            lists.sort(key=len)
+            candidates = lists[0]
+            for positions in lists[1:]:
+                candidates = np.intersect1d(candidates, positions, assume_unique=True)
+            return candidates
+        if min_score is not None:
+            return np.sort(np.concatenate([bucket.view() for bucket in self._by_score[max(min_score, 0):]]))
+        return None
+
+    @staticmethod
+    def _parse_cursor(cursor, order):
+        """(score, position) for a 'score:position' cursor or the position of a plain one; ValueError if malformed."""
+        parts = cursor.split(':')
+        if len(parts) != (2 if order == 'score' else 1) or not all(part.isdigit() for part in parts):
+            raise ValueError(f"malformed cursor: {cursor!r}")
+        values = tuple(int(part) for part in parts)
+        if order == 'score' and values[0] > MAX_ANOMALY_SCORE:
+            raise ValueError(f"cursor score out of range: {cursor!r}")
+        return values
+
+    def query(self, buffer, filters=None, min_score=None, start_time=None, end_time=None,
+              order='position', cursor=None, limit=50):
+        """
+        Returns (row positions, next cursor) for one page of matching rows.
+        order='position' walks rows in storage order; the cursor is the last
+        position returned. order='score' walks rows by anomaly score (highest
+        first, ties by position); the cursor is 'score:position'. A malformed
+        cursor or a limit below 1 raises ValueError.
+        """
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        filters = {field: value for field, value in (filters or {}).items() if value is not None}
+        anomaly_scores = buffer.column('anomaly_score')
+        timestamps = buffer.column('timestamp')
+
+        def keep(positions):
+            # Rows indexed after the column snapshots above are left for the next query
+            positions = positions[positions < len(anomaly_scores)]
+            mask = np.ones(len(positions), dtype=bool)
+            if min_score is not None:
+                mask &= anomaly_scores[positions] >= min_score
+            if start_time is not None:
+                mask &= timestamps[positions] >= start_time
+            if end_time is not None:
+                mask &= timestamps[positions] <= end_time
+            return positions[mask]
+
+        if order == 'score':
+            cursor_score, cursor_position = self._parse_cursor(cursor, order) if cursor else (MAX_ANOMALY_SCORE, -1)
+            if filters:
+                # Filtered: order only the candidate rows by (score desc, position asc)
+                candidates = keep(self._candidates(filters, min_score))
+                scores = anomaly_scores[candidates]
+                after_cursor = (scores < cursor_score) | ((scores == cursor_score) & (candidates > cursor_position))
+                candidates, scores = candidates[after_cursor], scores[after_cursor]
+                positions = candidates[np.lexsort((candidates, -scores))][:limit]
+            else:
+                # Unfiltered: walk the score buckets from the cursor down, stopping once the page is full
+                page, remaining = [], limit
+                for score in range(cursor_score, max(min_score or 0, 0) - 1, -1):
+                    bucket = self._by_score[score].view()
+                    if score == cursor_score:
+                        bucket = bucket[bucket > cursor_position]
+                    bucket = keep(bucket)[:remaining]
+                    page.append(bucket)
+                    remaining -= len(bucket)
+                    if remaining == 0:
+                        break
+                positions = np.concatenate(page) if page else np.empty(0, dtype=np.int64)
+            next_cursor = None
+            if len(positions) == limit:
+                last = positions[-1]
+                next_cursor = f"{anomaly_scores[last]}:{last}"
+            return positions, next_cursor
+
+        after = self._parse_cursor(cursor, order)[0] if cursor else -1
+        candidates = self._candidates(filters, min_score)
+        if candidates is None:
+            # Unfiltered or time-only queries scan forward from the cursor in blocks
+            positions, block_start, block_size = [], after + 1, max(limit, 65536)
+            remaining = limit
+            while remaining > 0 and block_start < len(buffer):
+                block = keep(np.arange(block_start, min(block_start + block_size, len(buffer))))[:remaining]
+                positions.append(block)
+                remaining -= len(block)
+                block_start += block_size
+            positions = np.concatenate(positions) if positions else np.empty(0, dtype=np.int64)
+        else:
+            positions = keep(candidates[candidates > after])[:limit]
+        next_cursor = str(positions[-1]) if len(positions) == limit else None
+        return positions, next_cursor
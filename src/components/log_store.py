@@ -0,0 +1,102 @@
+import os
+import sys
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# --- Configuration ---
+# Low-cardinality string columns, stored and loaded dictionary-encoded
+# (pandas categoricals) so each distinct value is held in memory once.
+DICTIONARY_COLUMNS = ['key_id', 'user_id', 'source_ip', 'action', 'user_agent', 'status']
+PARQUET_ROW_GROUP_SIZE = 1_000_000
+
+def _to_table(df):
+    df = df.assign(timestamp=pd.to_datetime(df['timestamp'], utc=True))
+    return pa.Table.from_pandas(df, preserve_index=False)
+
+def _dictionary_encode(table):
+    for name in DICTIONARY_COLUMNS:
+        index = table.schema.get_field_index(name)
+        table = table.set_column(index, name, table.column(name).dictionary_encode())
+    return table
+
+def convert_json_logs(json_path, output_path, chunksize=PARQUET_ROW_GROUP_SIZE):
+    """
+    Converts a JSON array (as written by generate_logs.py) or an NDJSON log file
+    into a .parquet or .arrow store. NDJSON input is converted chunk by chunk.
+    """
+    is_ndjson = json_path.endswith('.ndjson') or json_path.endswith('.jsonl')
+    if output_path.endswith('.arrow'):
+        df = pd.read_json(json_path, lines=is_ndjson, dtype=False)
+        table = _dictionary_encode(_to_table(df))
+        # Uncompressed Arrow IPC so the file can be memory-mapped without decoding
+        with pa.OSFile(output_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        return table.num_rows
+
+    writer, rows = None, 0
+    chunks = (pd.read_json(json_path, lines=True, chunksize=chunksize, dtype=False) if is_ndjson
+              else [pd.read_json(json_path, dtype=False)])
+    try:
+        for chunk in chunks:
+            table = _to_table(chunk)
+            if writer is None:
+                writer = pq.ParquetWriter(output_path, table.schema, use_dictionary=DICTIONARY_COLUMNS)
+            writer.write_table(table, row_group_size=chunksize)
+            rows += table.num_rows
+    finally:
+        if writer is not None:
+            writer.close()
+    return rows
+
+def load_logs(path):
+    """
+    Loads access logs from a .parquet, .arrow or JSON file into a DataFrame with a
+    UTC timestamp column. Columnar stores are memory-mapped and their string
+    columns come back as categoricals; Arrow IPC numeric buffers are used zero-copy.
+    """
+    if path.endswith('.parquet'):
+        table = pq.read_table(path, memory_map=True, read_dictionary=DICTIONARY_COLUMNS)
+    elif path.endswith('.arrow'):
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+    else:
+        return pd.read_json(path, lines=path.endswith('.ndjson') or path.endswith('.jsonl'))
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+def iter_log_chunks(path, chunk_rows=PARQUET_ROW_GROUP_SIZE):
+    """
+    Yields the logs in path as DataFrames of at most chunk_rows rows, in file
+    order, without loading the whole file: Parquet is read batch by batch,
+    Arrow IPC is memory-mapped and sliced, NDJSON is parsed chunk by chunk.
+    A JSON array cannot be streamed and is loaded once, then sliced.
+    """
+    if path.endswith('.parquet'):
+        parquet_file = pq.ParquetFile(path, memory_map=True, read_dictionary=DICTIONARY_COLUMNS)
+        for batch in parquet_file.iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas(split_blocks=True, self_destruct=True)
+    elif path.endswith('.arrow'):
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        for start in range(0, table.num_rows, chunk_rows):
+            yield table.slice(start, chunk_rows).to_pandas(split_blocks=True)
+    elif path.endswith('.ndjson') or path.endswith('.jsonl'):
+        with pd.read_json(path, lines=True, chunksize=chunk_rows) as reader:
+            yield from reader
+    else:
+        df = load_logs(path)
+        for start in range(0, len(df), chunk_rows):
+            yield df.iloc[start:start + chunk_rows]
+
+def resolve_log_path(json_path):
+    """Prefers a .parquet or .arrow store next to json_path when one has been converted."""
+    base = os.path.splitext(json_path)[0]
+    for extension in ('.arrow', '.parquet'):
+        if os.path.exists(base + extension):
+            return base + extension
+    return json_path
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.components.log_store <input.json|.ndjson> <output.parquet|.arrow>")
+        sys.exit(1)
+    converted = convert_json_logs(sys.argv[1], sys.argv[2])
+    print(f"Converted {converted} logs from '{sys.argv[1]}' to '{sys.argv[2]}'.")
@@ -0,0 +1,46 @@
+import json
+import os
+import threading
+
+class NdjsonTailer(threading.Thread):
+    """
+    Follows an NDJSON file (one log record per line) and hands newly appended
+    records to on_batch in lists of at most batch_size. Partial trailing lines
+    are held back until their newline arrives.
+    """
+    def __init__(self, path, on_batch, batch_size=1000, poll_interval=0.5, from_start=False):
+        super().__init__(daemon=True, name=f"ndjson-tailer:{os.path.basename(path)}")
+        self.path = path
+        self.on_batch = on_batch
+        self.batch_size = batch_size
+        self.poll_interval = poll_interval
+        self.from_start = from_start
+        self._stop_event = threading.Event()
+
+    def stop(self):
+        self._stop_event.set()
+
+    def run(self):
+        with open(self.path, 'rb') as f:
+            if not self.from_start:
+                f.seek(0, os.SEEK_END)
+            partial = b""
+            while not self._stop_event.is_set():
+                chunk = f.read(1 << 20)
+                if not chunk:
+                    self._stop_event.wait(self.poll_interval)
+                    continue
+                *lines, partial = (partial + chunk).split(b"\n")
+                records = []
+                for line in lines:
+                    if not line.strip():
+                        continue
+                    try:
+                        records.append(json.loads(line))
+                    except json.JSONDecodeError:
+                        print(f"Warning: skipping malformed line in '{self.path}'.")
+                for start in range(0, len(records), self.batch_size):
+                    try:
+                        self.on_batch(records[start:start + self.batch_size])
+                    except Exception as e:
+                        print(f"Warning: failed to ingest tailed logs from '{self.path}': {e}")
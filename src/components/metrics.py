@@ -0,0 +1,194 @@
+import bisect
+import contextvars
+import os
+import threading
+import time
+
+# --- Configuration ---
+# Upper bounds (seconds) of the latency histogram buckets, from 50 µs to 10 s
+LATENCY_BUCKETS = (0.00005, 0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROFILE_HEADER = 'x-chimera-profile'
+
+# Stage timings of the request being served, when it asked for a profile
+_request_profile = contextvars.ContextVar('request_profile', default=None)
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Stage:
+    __slots__ = ('metrics', 'name', 'rows', 'start')
+
+    def __init__(self, metrics, name, rows):
+        self.metrics, self.name, self.rows = metrics, name, rows
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        elapsed = time.perf_counter() - self.start
+        if self.metrics.enabled:
+            self.metrics.observe('chimera_stage_seconds', elapsed, stage=self.name)
+            if self.rows is not None:
+                self.metrics.inc('chimera_stage_rows_total', self.rows, stage=self.name)
+        profile = _request_profile.get()
+        if profile is not None:
+            profile[self.name] = profile.get(self.name, 0.0) + elapsed
+        return False
+
+class _NullStage:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        return False
+
+_NULL_STAGE = _NullStage()
+
+class Metrics:
+    """
+    In-process counters, histograms and gauges rendered in the Prometheus text
+    format, without depending on prometheus_client.
+
+    `with metrics.stage(name, rows=n):` times one step of a hot path into the
+    chimera_stage_seconds histogram (and counts the rows it handled). The same
+    timings are collected per request when the client sends PROFILE_HEADER (see
+    RequestMetricsMiddleware). When disabled and no profile is requested, stage()
+    hands back a shared no-op context manager.
+    """
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._histograms = {}
+        self._counters = {}
+        self._gauges = {}
+        self._help = {}
+
+    def describe(self, name, help_text):
+        self._help[name] = help_text
+
+    def stage(self, name, rows=None):
+        if not self.enabled and _request_profile.get() is None:
+            return _NULL_STAGE
+        return _Stage(self, name, rows)
+
+    def observe(self, name, value, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = Histogram()
+            histogram.observe(value)
+
+    def inc(self, name, amount=1, **labels):
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def gauge(self, name, collect):
+        """Registers a gauge read at scrape time; collect() returns (labels dict, value) pairs."""
+        self._gauges[name] = collect
+
+    def render(self):
+        """The Prometheus text exposition of every metric."""
+        lines = []
+
+        def header(name, kind):
+            if name in self._help:
+                lines.append(f"# HELP {name} {self._help[name]}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            histograms = sorted((key, h.buckets, list(h.counts), h.sum, h.count) for key, h in self._histograms.items())
+            counters = sorted(self._counters.items())
+        current = None
+        for (name, labels), buckets, counts, total, count in histograms:
+            if name != current:
+                header(name, 'histogram')
+                current = name
+            cumulative = 0
+            for bound, bucket_count in zip(list(buckets) + ['+Inf'], counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{_format_labels(labels + (('le', bound),))} {cumulative}")
+            lines.append(f"{name}_sum{_format_labels(labels)} {total}")
+            lines.append(f"{name}_count{_format_labels(labels)} {count}")
+        current = None
+        for (name, labels), value in counters:
+            if name != current:
+                header(name, 'counter')
+                current = name
+            lines.append(f"{name}{_format_labels(labels)} {value}")
+        for name, collect in self._gauges.items():
+            header(name, 'gauge')
+            for labels, value in collect():
+                lines.append(f"{name}{_format_labels(tuple(sorted(labels.items())))} {value}")
+        return "\n".join(lines) + "\n"
+
+def _format_labels(labels):
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{value}"' for key, value in labels) + "}"
+
+def format_server_timing(profile):
+    """A Server-Timing header value (durations in milliseconds) for a request profile."""
+    return ", ".join(f"{name};dur={seconds * 1e3:.3f}" for name, seconds in profile.items())
+
+class RequestMetricsMiddleware:
+    """
+    ASGI middleware recording each request's latency by route template, method
+    and status, and answering requests that carry PROFILE_HEADER with a
+    Server-Timing header listing the stages they went through.
+    """
+    def __init__(self, app, metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        profiled = any(name == PROFILE_HEADER.encode() for name, _ in scope['headers'])
+        if not self.metrics.enabled and not profiled:
+            return await self.app(scope, receive, send)
+
+        profile = {} if profiled else None
+        token = _request_profile.set(profile)
+        start = time.perf_counter()
+        status = [500]
+
+        async def send_with_timing(message):
+            if message['type'] == 'http.response.start':
+                status[0] = message['status']
+                if profile is not None:
+                    profile['total'] = time.perf_counter() - start
+                    headers = list(message.get('headers', []))
+                    headers.append((b'server-timing', format_server_timing(profile).encode()))
+                    message = {**message, 'headers': headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _request_profile.reset(token)
+            route = scope.get('route')
+            self.metrics.observe('chimera_http_request_seconds', time.perf_counter() - start,
+                                 method=scope['method'], route=route.path if route else 'unmatched',
+                                 status=str(status[0]))
+
+# Process-wide registry shared by the API and the preprocessors; CHIMERA_METRICS=0 disables it
+metrics = Metrics(enabled=os.environ.get('CHIMERA_METRICS', '1') != '0')
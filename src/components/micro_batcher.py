@@ -0,0 +1,74 @@
+import asyncio
+import contextvars
+
+class MicroBatcher:
+    """
+    Coalesces concurrent single-item requests into one batched model call.
+
+    The first queued item opens a window of max_wait seconds; everything that
+    arrives in it (up to max_batch_size items) is passed to batch_fn as one
+    list, run in `executor` so the event loop never blocks on the model, and
+    each caller awaits its own entry of the returned list. batch_fn may put an
+    exception in an item's entry to fail that caller alone; an exception raised
+    by batch_fn itself fails the whole batch. At most max_concurrent_batches
+    batches are in flight, matching the executor size.
+    """
+    def __init__(self, batch_fn, executor, max_batch_size=256, max_wait=0.002, max_concurrent_batches=4):
+        self.batch_fn = batch_fn
+        self.executor = executor
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_wait = max_wait
+        self.max_concurrent_batches = max_concurrent_batches
+        self._loop = None
+        # Strong references to in-flight dispatch tasks, so none is collected mid-batch
+        self._dispatches = set()
+
+    def _bind(self, loop):
+        # Queue, semaphore and collector task belong to one event loop
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._slots = asyncio.Semaphore(self.max_concurrent_batches)
+        # A fresh context, so the collector does not inherit the first caller's request state
+        self._collector = loop.create_task(self._collect(), context=contextvars.Context())
+
+    async def submit(self, item):
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            self._bind(loop)
+        future = loop.create_future()
+        self._queue.put_nowait((item, future))
+        return await future
+
+    async def _collect(self):
+        while True:
+            batch = [await self._queue.get()]
+            if self._queue.qsize() < self.max_batch_size - 1:
+                await asyncio.sleep(self.max_wait)
+            while len(batch) < self.max_batch_size and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+            await self._slots.acquire()
+            task = asyncio.get_running_loop().create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch):
+        try:
+            results = await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.batch_fn, [item for item, _ in batch])
+            if results is None or len(results) != len(batch):
+                count = 'no' if results is None else len(results)
+                raise RuntimeError(f"batch_fn returned {count} results for a batch of {len(batch)} items")
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
+        except Exception as error:
+            # Fail every caller still waiting, whether the call or its results were at fault
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(error)
+        finally:
+            self._slots.release()
@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+class ModelRegistry:
+    """
+    Loads named artifacts (models, datasets) concurrently in a thread pool, or
+    lazily on first use, and tracks each one's state and load time.
+
+    States: 'pending' (not started), 'deferred' (lazy, not yet requested),
+    'loading', 'ready', 'missing' (FileNotFoundError) and 'failed'.
+    """
+    def __init__(self, max_workers=4):
+        self._max_workers = max_workers
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="model-loader")
+        self._lock = threading.Lock()
+        self._loaders = {}
+        self._futures = {}
+        self._status = {}
+
+    def register(self, name, loader, lazy=False):
+        self._loaders[name] = loader
+        self._status[name] = {"state": "deferred" if lazy else "pending", "load_seconds": None, "error": None}
+
+    def start(self):
+        """Begins loading every non-lazy artifact in the background."""
+        for name, status in self._status.items():
+            if status["state"] == "pending":
+                self._submit(name)
+
+    def _submit(self, name):
+        with self._lock:
+            if name not in self._futures:
+                self._futures[name] = self._executor.submit(self._load, name)
+            return self._futures[name]
+
+    def _load(self, name):
+        status = self._status[name]
+        status["state"] = "loading"
+        start = time.perf_counter()
+        try:
+            artifact = self._loaders[name]()
+            status["state"] = "ready"
+            return artifact
+        except FileNotFoundError as e:
+            status["state"], status["error"] = "missing", str(e)
+        except Exception as e:
+            status["state"], status["error"] = "failed", f"{type(e).__name__}: {e}"
+        finally:
+            status["load_seconds"] = round(time.perf_counter() - start, 3)
+        return None
+
+    def get(self, name):
+        """Blocks until the artifact is loaded (starting it if lazy); None if it could not be loaded."""
+        return self._submit(name).result()
+
+    def is_ready(self, name):
+        return self._status[name]["state"] == "ready"
+
+    def status(self):
+        return {name: dict(status) for name, status in self._status.items()}
+
+    def after_fork(self):
+        """Replaces the loader threads, which do not survive os.fork(), in a forked child."""
+        self._executor = ThreadPoolExecutor(max_workers=self._max_workers, thread_name_prefix="model-loader")
+        self._lock = threading.Lock()
+        self._futures = {name: future for name, future in self._futures.items() if future.done()}
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
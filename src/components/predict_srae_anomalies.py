@@ -1,20 +1,31 @@
 # predict_srae_anomalies.py (Score scaled 1-100)
+# Run from the repository root: python -m src.components.predict_srae_anomalies
+from pathlib import Path
 import pandas as pd
 import joblib
 import json
+import numpy as np
+from src.components.window_features import SlidingWindowFeatures
 
-MODEL_PATH = '../../models/srae_dtde_model.joblib'
-COLUMNS_PATH = '../../models/srae_dtde_model_columns.json'
-NEW_DATA_PATH = '../../data/test_logs.csv'
+# Paths are relative to the repository root, not the working directory
+REPO_ROOT = Path(__file__).resolve().parents[2]
+MODEL_PATH = REPO_ROOT / 'models' / 'srae_dtde_model.joblib'
+COLUMNS_PATH = REPO_ROOT / 'models' / 'srae_dtde_model_columns.json'
+NEW_DATA_PATH = REPO_ROOT / 'data' / 'test_logs.csv'
 
 def engineer_features(df):
-    df['eventTime'] = pd.to_datetime(df['eventTime'])
+    # Naive times are read as UTC, so mixed or zone-less CloudTrail exports both parse
+    df['eventTime'] = pd.to_datetime(df['eventTime'], utc=True)
     df['time_of_day'] = df['eventTime'].dt.hour
-    df = df.sort_values(by='eventTime')
-    df = df.set_index('eventTime')
-    df['api_call_frequency'] = df.groupby('userIdentity_arn')['key_arn'].transform(lambda x: x.rolling('1h').count())
-    df = df.reset_index()
+    df = df.sort_values(by='eventTime', kind='stable').reset_index(drop=True)
     df['errorCode'] = df['errorCode'].fillna('Success')
+    # Calls by the same principal in the trailing hour, from the streaming window counters
+    window_features = SlidingWindowFeatures().update(
+        df['eventTime'].dt.tz_convert(None).to_numpy().astype('datetime64[ns]').astype(np.int64),
+        df['userIdentity_arn'].to_numpy(), df['key_arn'].to_numpy(), df['sourceIPAddress'].to_numpy(),
+        (df['errorCode'] != 'Success').to_numpy(dtype=np.int64),
+    )
+    df['api_call_frequency'] = window_features[:, 0]
     
     features_to_encode = ['sourceIPAddress', 'userIdentity_arn', 'eventName', 'key_arn', 'errorCode']
     engineered_df = pd.get_dummies(df, columns=features_to_encode)
@@ -0,0 +1,87 @@
+from datetime import datetime, timezone
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+from src.components.metrics import metrics
+
+class SRAEPreprocessor(BaseEstimator, TransformerMixin):
+    """
+    Feature engineering for the SRAE model, shared by training and the API and
+    saved next to the model so both always build the same feature matrix.
+
+    transform_array is the vectorized path for frames of key configurations;
+    transform_configs is the per-request fast path, which reads KeyConfiguration
+    objects (or anything with the same attributes) straight into a NumPy matrix
+    without building a DataFrame. Algorithms outside `algorithms` leave every
+    algo_* column at 0, as get_dummies + reindex did.
+    """
+    algorithms = ['AES_256', 'RSA_4096', 'RSA_2048', '3DES']
+    base_features = ['key_age_days', 'is_hsm_backed', 'rotation_enabled', 'has_wildcard']
+    wildcard_marker = '"*"'
+
+    def __init__(self):
+        self.columns = self.base_features + [f"algo_{algorithm}" for algorithm in self.algorithms]
+
+    def fit(self, df=None, y=None):
+        # The feature set is fixed; fitting only pins it on the saved instance
+        self.columns = self.base_features + [f"algo_{algorithm}" for algorithm in self.algorithms]
+        return self
+
+    def to_config(self):
+        """JSON-serializable state, stored with compiled models (see tree_runtime)."""
+        return {'columns': list(self.columns)}
+
+    @classmethod
+    def from_config(cls, config):
+        preprocessor = cls()
+        preprocessor.columns = list(config['columns'])
+        return preprocessor
+
+    def _algorithm_positions(self):
+        return {algorithm: len(self.base_features) + i for i, algorithm in enumerate(self.algorithms)}
+
+    @staticmethod
+    def parse_date(value):
+        """UTC datetime for an ISO-8601 string; naive values are taken as UTC. Raises ValueError for non-dates."""
+        try:
+            parsed = datetime.fromisoformat(value)
+        except (TypeError, ValueError):
+            parsed = pd.Timestamp(value)
+            if pd.isna(parsed):
+                raise ValueError(f"not a date: {value!r}")
+            parsed = parsed.to_pydatetime()
+        return parsed if parsed.tzinfo is not None else parsed.replace(tzinfo=timezone.utc)
+
+    def transform_configs(self, key_configs, now=None, dtype=np.float32):
+        """Features for a list of key configurations, filled row by row into a preallocated matrix."""
+        with metrics.stage('srae_features', rows=len(key_configs)):
+            now = now or datetime.now(timezone.utc)
+            positions = self._algorithm_positions()
+            matrix = np.zeros((len(key_configs), len(self.columns)), dtype=dtype)
+            for row, key_config in zip(matrix, key_configs):
+                row[0] = (now - self.parse_date(key_config.creation_date)).days
+                row[1] = bool(key_config.is_hsm_backed)
+                row[2] = bool(key_config.rotation_enabled)
+                row[3] = self.wildcard_marker in key_config.permission_policy
+                position = positions.get(key_config.algorithm)
+                if position is not None:
+                    row[position] = 1
+        return matrix
+
+    def transform_array(self, df, now=None, dtype=np.float32):
+        """Vectorized features for a frame with the KeyConfiguration columns."""
+        with metrics.stage('srae_features', rows=len(df)):
+            now = now or datetime.now(timezone.utc)
+            creation_dates = pd.to_datetime(df['creation_date'], utc=True)
+            matrix = np.zeros((len(df), len(self.columns)), dtype=dtype)
+            matrix[:, 0] = (now - creation_dates).dt.days.to_numpy()
+            matrix[:, 1] = df['is_hsm_backed'].to_numpy(dtype=bool)
+            matrix[:, 2] = df['rotation_enabled'].to_numpy(dtype=bool)
+            matrix[:, 3] = df['permission_policy'].str.contains(self.wildcard_marker, regex=False).to_numpy(dtype=bool)
+            algorithm_codes = pd.Index(self.algorithms).get_indexer(df['algorithm'])
+            known = algorithm_codes >= 0
+            matrix[np.flatnonzero(known), len(self.base_features) + algorithm_codes[known]] = 1
+        return matrix
+
+    def transform(self, df, y=None):
+        return pd.DataFrame(self.transform_array(df), columns=self.columns, index=df.index)
@@ -1,42 +1,66 @@
 import os
 from stable_baselines3 import PPO
 from stable_baselines3.common.env_checker import check_env
-from kms_env import KmsEnv
+from stable_baselines3.common.env_util import make_vec_env
+from stable_baselines3.common.vec_env import SubprocVecEnv
+from kms_env import KmsEnv, VecKmsEnv
+from apce_policy import ApceLookupTable
 import joblib
 
 # --- Configuration ---
 MODELS_DIR = "models"
 LOGS_DIR = "logs"
 TOTAL_TIMESTEPS = 50000
+# 'vectorized' steps N_ENVS episodes at once in NumPy (VecKmsEnv), 'subprocess'
+# runs N_ENVS KmsEnv copies in worker processes, 'single' is one KmsEnv.
+ENV_MODE = 'vectorized'
+N_ENVS = 16
+# Steps collected per update across all envs, kept at PPO's single-env default
+ROLLOUT_STEPS = 2048
 
 # Create directories if they don't exist
 os.makedirs(MODELS_DIR, exist_ok=True)
 os.makedirs(LOGS_DIR, exist_ok=True)
 
-# --- Environment Setup ---
-# Instantiate the custom environment
-env = KmsEnv()
+def train_apce_model():
+    """Trains the APCE PPO policy, saves it and exports its lookup table."""
+    # --- Environment Setup ---
+    # Instantiate the custom environment
+    env = KmsEnv()
 
-# It's a good practice to check if your custom environment is compliant with the Gym API
-check_env(env)
+    # It's a good practice to check if your custom environment is compliant with the Gym API
+    check_env(env)
 
-# --- Model Training ---
-# We'll use the Proximal Policy Optimization (PPO) algorithm, which is a good default choice.
-# 'MlpPolicy' means we're using a multi-layer perceptron (a standard neural network) for the policy.
-model = PPO('MlpPolicy', env, verbose=1, tensorboard_log=LOGS_DIR)
+    if ENV_MODE == 'vectorized':
+        env = VecKmsEnv(num_envs=N_ENVS)
+    elif ENV_MODE == 'subprocess':
+        env = make_vec_env(KmsEnv, n_envs=N_ENVS, vec_env_cls=SubprocVecEnv)
 
-print("--- Starting APCE Model Training ---")
-# The learn() method starts the training process.
-# The agent will interact with the environment for the specified number of timesteps.
-model.learn(total_timesteps=TOTAL_TIMESTEPS)
-print("--- APCE Model Training Finished ---")
+    # --- Model Training ---
+    # We'll use the Proximal Policy Optimization (PPO) algorithm, which is a good default choice.
+    # 'MlpPolicy' means we're using a multi-layer perceptron (a standard neural network) for the policy.
+    n_steps = max(ROLLOUT_STEPS // getattr(env, 'num_envs', 1), 1)
+    model = PPO('MlpPolicy', env, n_steps=n_steps, verbose=1, tensorboard_log=LOGS_DIR)
 
-# --- Save the Model ---
-# The trained model is saved so it can be loaded later for inference.
-model_path = os.path.join(MODELS_DIR, "apce_model.zip")
-model.save(model_path)
+    print("--- Starting APCE Model Training ---")
+    # The learn() method starts the training process.
+    # The agent will interact with the environment for the specified number of timesteps.
+    model.learn(total_timesteps=TOTAL_TIMESTEPS)
+    print("--- APCE Model Training Finished ---")
 
-print(f"Model saved to {model_path}")
+    # --- Save the Model ---
+    # The trained model is saved so it can be loaded later for inference.
+    model_path = os.path.join(MODELS_DIR, "apce_model.zip")
+    model.save(model_path)
+    env.close()
+
+    print(f"Model saved to {model_path}")
+
+    # --- Export the Policy Lookup Table ---
+    # The API serves recommendations from this table without running the PPO network.
+    lookup_path = os.path.join(MODELS_DIR, "apce_lookup.npy")
+    ApceLookupTable.from_model(model).save(lookup_path)
+    print(f"Policy lookup table saved to {lookup_path}")
 
 # --- Example of Loading and Using the Model ---
 # del model # remove to demonstrate loading
@@ -52,3 +76,7 @@ print(f"Model saved to {model_path}")
 #     if terminated or truncated:
 #         break
 # env.close()
+
+# The guard matters for ENV_MODE = 'subprocess': worker processes re-import this module.
+if __name__ == "__main__":
+    train_apce_model()
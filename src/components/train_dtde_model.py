@@ -1,35 +1,176 @@
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
 import pandas as pd
 import joblib
 from sklearn.ensemble import IsolationForest
 import os
 from src.components.dtde_preprocessor import DTDEPreprocessor # <--- IMPORT
+from src.components.log_store import iter_log_chunks, load_logs, resolve_log_path
+from src.components.tree_runtime import compile_artifact
+from src.components.window_features import SlidingWindowFeatures
 
 # --- Configuration ---
 DATA_FILE = os.path.join(os.path.dirname(__file__), '../../data/kms_access_logs.json')
 MODEL_FILE = os.path.join(os.path.dirname(__file__), '../../models/dtde_model.joblib')
+# The same trees flattened into NumPy arrays, served with CHIMERA_MODEL_RUNTIME=compiled
+COMPILED_MODEL_FILE = os.path.join(os.path.dirname(__file__), '../../models/dtde_model.npz')
+# How source_ip is encoded: 'onehot', 'top_k', 'subnet', 'hash' or 'private'.
+# Anything but 'onehot' keeps the feature width bounded as log volume grows.
+IP_ENCODING = 'onehot'
+# Adds per-principal/per-key sliding-window counters (calls per hour, failure
+# ratio, distinct IPs), which expose brute-force bursts and IP drift.
+WINDOW_FEATURES = False
+N_ESTIMATORS = 100
+CONTAMINATION = 0.02
+RANDOM_STATE = 42
 
-def train_dtde_model():
+# Out-of-core training (--out-of-core) streams the logs in CHUNK_ROWS chunks and
+# fits the forest on a uniform sample of SAMPLE_SIZE logs. Each tree only draws
+# max_samples=256 rows, so the sample only has to be large and uniform.
+CHUNK_ROWS = 500_000
+SAMPLE_SIZE = 100_000
+
+def save_model(model, preprocessor, model_file, compiled_file):
+    # 4. Save the Model AND the FITTED Preprocessor
+    print(f"Step 4: Saving the model and preprocessor to '{model_file}'...")
+    joblib.dump({'model': model, 'preprocessor': preprocessor}, model_file)
+
+    # 5. Export the compiled trees for the lightweight runtime
+    print(f"Step 5: Exporting the compiled model to '{compiled_file}'...")
+    compile_artifact({'model': model, 'preprocessor': preprocessor}).save(compiled_file)
+
+def train_dtde_model(data_path=None, model_file=MODEL_FILE, compiled_file=COMPILED_MODEL_FILE, ip_encoding=IP_ENCODING):
     print("--- DTDE Model Training Started (Refactored) ---")
     
-    # 1. Load Data
-    df = pd.read_json(DATA_FILE)
+    # 1. Load Data (from a converted .arrow/.parquet store when one exists)
+    data_path = data_path or resolve_log_path(DATA_FILE)
+    print(f"Step 1: Loading logs from '{data_path}'...")
+    df = load_logs(data_path)
 
     # 2. Use the Preprocessor to fit and transform the data
     print("Step 2: Fitting preprocessor and transforming data...")
-    preprocessor = DTDEPreprocessor()
+    preprocessor = DTDEPreprocessor(ip_encoding=ip_encoding, window_features=WINDOW_FEATURES)
     preprocessor.fit(df)
     features = preprocessor.transform(df)
+    print(f"  > Feature width: {len(preprocessor.columns)} columns (ip_encoding='{ip_encoding}', window_features={WINDOW_FEATURES})")
 
     # 3. Train the AI Model
     print("Step 3: Training the Isolation Forest model...")
-    model = IsolationForest(n_estimators=100, contamination=0.02, random_state=42)
-        model.learn(total_timesteps=50000, progress_bar=True)
-
-    # 4. Save the Model AND the FITTED Preprocessor
-    print(f"Step 4: Saving the model and preprocessor to '{MODEL_FILE}'...")
-    joblib.dump({'model': model, 'preprocessor': preprocessor}, MODEL_FILE)
+    model = IsolationForest(n_estimators=N_ESTIMATORS, contamination=CONTAMINATION, random_state=RANDOM_STATE)
+    model.fit(features)
 
+    save_model(model, preprocessor, model_file, compiled_file)
     print("\n--- DTDE Model Training Complete! ---")
 
+# --- Out-of-Core Training ---
+def iter_training_chunks(data_path, chunk_rows):
+    """Log chunks in file order, with sliding-window counters carried across chunks when enabled."""
+    window = SlidingWindowFeatures() if WINDOW_FEATURES else None
+    for chunk in iter_log_chunks(data_path, chunk_rows):
+        if window is not None:
+            chunk = pd.concat([chunk, window.transform(chunk)], axis=1)
+        yield chunk
+
+def sample_and_fit_vocabulary(preprocessor, chunks, sample_size, seed):
+    """
+    One pass over the chunks: fits the preprocessor's vocabulary and keeps a
+    uniform sample of sample_size rows (the rows with the smallest random keys),
+    without knowing the total row count in advance.
+    """
+    rng = np.random.default_rng(seed)
+    sample, sample_keys, total_rows = None, np.empty(0), 0
+
+    def counted(chunks):
+        nonlocal sample, sample_keys, total_rows
+        for chunk in chunks:
+            total_rows += len(chunk)
+            keys = rng.random(len(chunk))
+            # Only rows that can still make the cut are kept from this chunk
+            if len(sample_keys) >= sample_size:
+                candidates = np.flatnonzero(keys < sample_keys.max())
+            else:
+                candidates = np.arange(len(chunk))
+            rows = chunk.iloc[candidates].reset_index(drop=True)
+            rows = rows.astype({c: object for c in rows.columns if isinstance(rows[c].dtype, pd.CategoricalDtype)})
+            merged = rows if sample is None else pd.concat([sample, rows], ignore_index=True)
+            merged_keys = np.concatenate([sample_keys, keys[candidates]])
+            keep = np.argsort(merged_keys, kind='stable')[:sample_size]
+            sample, sample_keys = merged.iloc[keep].reset_index(drop=True), merged_keys[keep]
+            yield chunk
+
+    preprocessor.fit_chunks(counted(chunks))
+    return sample, total_rows
+
+def score_chunks(model, preprocessor, chunks, workers):
+    """Raw scores for every log, transformed chunk by chunk and scored on a thread pool."""
+    scores = []
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = []
+        for chunk in chunks:
+            features = preprocessor.transform_array(chunk, as_sparse=True)
+            pending.append(executor.submit(model.score_samples, features))
+            # Bound how many transformed chunks wait in memory
+            while len(pending) > workers:
+                scores.append(pending.pop(0).result())
+        scores.extend(future.result() for future in pending)
+    return np.concatenate(scores)
+
+def train_dtde_model_out_of_core(data_path=None, model_file=MODEL_FILE, compiled_file=COMPILED_MODEL_FILE,
+                                 ip_encoding=IP_ENCODING, chunk_rows=CHUNK_ROWS, sample_size=SAMPLE_SIZE, workers=None):
+    """
+    Trains on log corpora larger than memory in two streaming passes: one that
+    fits the vocabulary while drawing a uniform sample, and one that scores
+    every log to calibrate the contamination threshold. The forest is fitted on
+    the sparse sample with all cores. Nothing proportional to the corpus is
+    held except one float per log for the calibration scores.
+    """
+    print("--- DTDE Model Training Started (out-of-core) ---")
+    data_path = data_path or resolve_log_path(DATA_FILE)
+    workers = workers or os.cpu_count()
+    start = time.perf_counter()
+
+    # 1. Vocabulary + uniform sample, streamed
+    print(f"Step 1: Streaming '{data_path}' to fit the vocabulary and sample {sample_size} logs...")
+    preprocessor = DTDEPreprocessor(ip_encoding=ip_encoding, window_features=WINDOW_FEATURES)
+    sample, total_rows = sample_and_fit_vocabulary(
+        preprocessor, iter_training_chunks(data_path, chunk_rows), sample_size, RANDOM_STATE)
+    print(f"  > {total_rows} logs, feature width: {len(preprocessor.columns)} columns "
+          f"(ip_encoding='{ip_encoding}', window_features={WINDOW_FEATURES}) [{time.perf_counter() - start:.1f} s]")
+
+    # 2. Fit on the sample, as a sparse matrix, building trees in parallel
+    print(f"Step 2: Training the Isolation Forest on the sample with {workers} workers...")
+    model = IsolationForest(n_estimators=N_ESTIMATORS, contamination='auto', random_state=RANDOM_STATE, n_jobs=workers)
+    model.fit(preprocessor.transform_array(sample, as_sparse=True))
+
+    # 3. Contamination threshold from the scores of every log, not just the sample
+    print("Step 3: Scoring all logs in chunks to calibrate the contamination threshold...")
+    raw_scores = score_chunks(model, preprocessor, iter_training_chunks(data_path, chunk_rows), workers)
+    model.contamination = CONTAMINATION
+    model.offset_ = np.percentile(raw_scores, 100.0 * CONTAMINATION)
+    print(f"  > offset_ = {model.offset_:.4f}, {np.mean(raw_scores < model.offset_):.2%} of logs flagged "
+          f"[{time.perf_counter() - start:.1f} s]")
+    # The API scores DataFrames with these column names, as it does for the in-memory model
+    model.feature_names_in_ = np.array(preprocessor.columns, dtype=object)
+
+    save_model(model, preprocessor, model_file, compiled_file)
+    print(f"\n--- DTDE Model Training Complete! ({time.perf_counter() - start:.1f} s) ---")
+
 if __name__ == "__main__":
-    train_dtde_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the DTDE IsolationForest.")
+    parser.add_argument('--out-of-core', action='store_true', help="Stream the logs instead of loading them whole.")
+    parser.add_argument('--data', help="Log file (.json, .ndjson, .parquet or .arrow); defaults to the bundled logs.")
+    parser.add_argument('--model-file', default=MODEL_FILE)
+    parser.add_argument('--compiled-file', default=COMPILED_MODEL_FILE)
+    parser.add_argument('--ip-encoding', default=IP_ENCODING)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    parser.add_argument('--sample-size', type=int, default=SAMPLE_SIZE)
+    parser.add_argument('--workers', type=int, default=None)
+    args = parser.parse_args()
+
+    if args.out_of_core:
+        train_dtde_model_out_of_core(args.data, args.model_file, args.compiled_file, args.ip_encoding,
+                                     args.chunk_rows, args.sample_size, args.workers)
+    else:
+        train_dtde_model(args.data, args.model_file, args.compiled_file, args.ip_encoding)
\ No newline at end of file
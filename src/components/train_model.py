@@ -1,11 +1,54 @@
+import argparse
+import tempfile
+import time
+from datetime import datetime, timezone
+import numpy as np
 import pandas as pd
+import pyarrow.parquet as pq
 import xgboost as xgb
 from sklearn.model_selection import train_test_split
 from sklearn.metrics import mean_absolute_error
-from datetime import datetime
 import joblib
+import os
+from src.components.srae_preprocessor import SRAEPreprocessor
+from src.components.tree_runtime import compile_artifact
 
-def train_srae_model(dataset_path='../../data/key_inventory_labeled.csv'):
+# --- Configuration ---
+# Paths are relative to this file, so the preprocessor pickles under its
+# src.components module path when run as `python -m src.components.train_model`
+DATA_FILE = os.path.join(os.path.dirname(__file__), '../../data/key_inventory_labeled.csv')
+MODEL_FILE = os.path.join(os.path.dirname(__file__), '../../models/srae_model.joblib')
+# The same trees flattened into NumPy arrays, served with CHIMERA_MODEL_RUNTIME=compiled
+COMPILED_MODEL_FILE = os.path.join(os.path.dirname(__file__), '../../models/srae_model.npz')
+TARGET = 'vulnerability_score'
+RANDOM_STATE = 42
+
+# External-memory training (--external-memory) streams the dataset in CHUNK_ROWS
+# chunks into an ExtMemQuantileDMatrix whose pages are cached on disk, and trains
+# with the 'hist' method on all cores. --continue-from adds trees to a saved model.
+CHUNK_ROWS = 1_000_000
+VALIDATION_FRACTION = 0.2
+XGB_PARAMS = {
+    'objective': 'reg:squarederror',
+    'tree_method': 'hist',
+    'learning_rate': 0.05,
+    'max_depth': 6,
+    'seed': RANDOM_STATE,
+}
+NUM_BOOST_ROUND = 500
+CONTINUE_ROUNDS = 100
+EARLY_STOPPING_ROUNDS = 10
+
+def save_model(model, preprocessor, model_file, compiled_file):
+    # 6. Save the Trained Model AND the Preprocessor to a File
+    print(f"Step 6: Saving the trained model and preprocessor to '{model_file}'...")
+    joblib.dump({'model': model, 'preprocessor': preprocessor}, model_file)
+
+    # 7. Export the compiled trees for the lightweight runtime
+    print(f"Step 7: Exporting the compiled model to '{compiled_file}'...")
+    compile_artifact({'model': model, 'preprocessor': preprocessor}).save(compiled_file)
+
+def train_srae_model(dataset_path=DATA_FILE, model_file=MODEL_FILE, compiled_file=COMPILED_MODEL_FILE):
     """
     Loads the dataset, engineers features, trains the SRAE AI model,
     evaluates its performance, and saves the trained model to a file.
@@ -21,24 +64,14 @@ def train_srae_model(dataset_path='../../data/key_inventory_labeled.csv'):
         print("Please run the 'generate_dataset.py' script first.")
         return
 
-    # 2. Feature Engineering
+    # 2. Feature Engineering (the same preprocessor object is saved with the model)
     print("Step 2: Performing feature engineering...")
-    df['key_age_days'] = (datetime.now() - df['creation_date']).dt.days
-    df['is_hsm_backed'] = df['is_hsm_backed'].astype(int)
-    df['rotation_enabled'] = df['rotation_enabled'].astype(int)
-    df['has_wildcard'] = df['permission_policy'].apply(lambda x: 1 if '"*"' in x else 0)
-    df = pd.get_dummies(df, columns=['algorithm'], prefix='algo', dtype=int)
+    preprocessor = SRAEPreprocessor().fit(df)
 
     # 3. Prepare Data for Training
     print("Step 3: Preparing data and splitting into training/testing sets...")
-    features = [
-        'key_age_days', 'is_hsm_backed', 'rotation_enabled', 'has_wildcard',
-        'algo_AES_256', 'algo_RSA_4096', 'algo_RSA_2048', 'algo_3DES'
-    ]
-    target = 'vulnerability_score'
-    
-    X = df[features]
-    y = df[target]
+    X = preprocessor.transform(df)
+    y = df[TARGET]
 
     X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
@@ -48,8 +81,8 @@ def train_srae_model(dataset_path='../../data/key_inventory_labeled.csv'):
                              n_estimators=500,
                              learning_rate=0.05,
                              max_depth=6,
-                             early_stopping_rounds=10,
-                             random_state=42)
+                             early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+                             random_state=RANDOM_STATE)
     
     model.fit(X_train, y_train,
               eval_set=[(X_test, y_test)],
@@ -61,14 +94,131 @@ def train_srae_model(dataset_path='../../data/key_inventory_labeled.csv'):
     mae = mean_absolute_error(y_test, predictions)
     print(f"  > Mean Absolute Error (MAE): {mae:.2f}")
 
-    # 6. Save the Trained Model to a File
-    model_filename = '../../models/srae_model.joblib'
-    print(f"Step 6: Saving the trained model to '{model_filename}'...")
-    joblib.dump(model, model_filename)
+    save_model(model, preprocessor, model_file, compiled_file)
 
     print("\n--- SRAE AI Model Training Complete! ---")
-    print(f"The trained model is now saved in the file: {model_filename} 💾")
+    print(f"The trained model is now saved in the file: {model_file} 💾")
+
+# --- External-Memory and Incremental Training ---
+def iter_dataset_chunks(dataset_path, chunk_rows=CHUNK_ROWS):
+    """Labeled keys from a CSV or Parquet file, chunk_rows rows at a time."""
+    if dataset_path.endswith('.parquet'):
+        for batch in pq.ParquetFile(dataset_path).iter_batches(batch_size=chunk_rows):
+            yield batch.to_pandas()
+    else:
+        with pd.read_csv(dataset_path, chunksize=chunk_rows) as reader:
+            yield from reader
+
+class LabeledKeyIter(xgb.DataIter):
+    """
+    Feeds a labeled key dataset to XGBoost chunk by chunk. A seeded random
+    VALIDATION_FRACTION of every chunk is held out (the same rows on every pass);
+    those rows are collected during the first pass as the early-stopping set.
+    Features are computed against one fixed `now`, so every pass sees the same values.
+    """
+    def __init__(self, dataset_path, preprocessor, chunk_rows, cache_prefix):
+        super().__init__(cache_prefix=cache_prefix)
+        self.dataset_path = dataset_path
+        self.preprocessor = preprocessor
+        self.chunk_rows = chunk_rows
+        self.now = datetime.now(timezone.utc)
+        self.rows = 0
+        self.validation_X, self.validation_y = [], []
+        self._chunks = None
+        self._first_pass = True
+
+    def next(self, input_data):
+        if self._chunks is None:
+            self._chunks = enumerate(iter_dataset_chunks(self.dataset_path, self.chunk_rows))
+        index, chunk = next(self._chunks, (None, None))
+        if chunk is None:
+            self._first_pass = False
+            return False
+        X = self.preprocessor.transform_array(chunk, now=self.now)
+        y = chunk[TARGET].to_numpy(dtype=np.float32)
+        holdout = np.random.default_rng([RANDOM_STATE, index]).random(len(chunk)) < VALIDATION_FRACTION
+        if self._first_pass:
+            self.rows += len(chunk)
+            self.validation_X.append(X[holdout])
+            self.validation_y.append(y[holdout])
+        input_data(data=X[~holdout], label=y[~holdout])
+        return True
+
+    def reset(self):
+        self._chunks = None
+
+def train_srae_model_external_memory(dataset_path=DATA_FILE, model_file=MODEL_FILE,
+                                     compiled_file=COMPILED_MODEL_FILE, continue_from=None,
+                                     chunk_rows=CHUNK_ROWS, nthread=None):
+    """
+    Trains the SRAE model without loading the dataset: chunks are quantized into
+    an external-memory DMatrix cached on disk and boosted with 'hist' on all
+    cores. With continue_from, the saved model's trees (up to its best
+    iteration) are kept and up to CONTINUE_ROUNDS new ones are fitted to the
+    new labeled keys, reusing its preprocessor.
+    """
+    print(f"--- SRAE AI Model Training Started ({'continued' if continue_from else 'external memory'}) ---")
+    start = time.perf_counter()
+    base_booster = None
+    if continue_from:
+        base = joblib.load(continue_from)
+        if not isinstance(base, dict):
+            base = {'model': base, 'preprocessor': SRAEPreprocessor()}
+        preprocessor = base['preprocessor']
+        base_booster = base['model'].get_booster()
+        best_iteration = getattr(base['model'], 'best_iteration', None)
+        if best_iteration is not None:
+            base_booster = base_booster[:best_iteration + 1]
+        print(f"  > Continuing from '{continue_from}' ({base_booster.num_boosted_rounds()} trees)")
+    else:
+        preprocessor = SRAEPreprocessor().fit()
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        # 1-3. Stream, engineer features and quantize into on-disk pages
+        print(f"Step 1: Streaming '{dataset_path}' into an external-memory DMatrix...")
+        batches = LabeledKeyIter(dataset_path, preprocessor, chunk_rows, os.path.join(cache_dir, 'srae'))
+        dtrain = xgb.ExtMemQuantileDMatrix(batches, nthread=nthread or os.cpu_count())
+        dvalid = xgb.DMatrix(np.concatenate(batches.validation_X), label=np.concatenate(batches.validation_y))
+        print(f"  > {batches.rows} keys, {dtrain.num_row()} for training [{time.perf_counter() - start:.1f} s]")
+
+        # 4. Boost with the hist method on all cores
+        print("Step 4: Training the XGBoost model...")
+        booster = xgb.train(
+            {**XGB_PARAMS, 'nthread': nthread or os.cpu_count()},
+            dtrain,
+            num_boost_round=CONTINUE_ROUNDS if base_booster is not None else NUM_BOOST_ROUND,
+            evals=[(dvalid, 'validation')],
+            early_stopping_rounds=EARLY_STOPPING_ROUNDS,
+            xgb_model=base_booster,
+            verbose_eval=False,
+        )
+
+    # 5. Evaluate on the held-out keys
+    print("Step 5: Evaluating model performance...")
+    predictions = booster.predict(dvalid, iteration_range=(0, booster.best_iteration + 1))
+    mae = mean_absolute_error(dvalid.get_label(), predictions)
+    print(f"  > Mean Absolute Error (MAE): {mae:.2f} ({booster.num_boosted_rounds()} trees, "
+          f"best iteration {booster.best_iteration}) [{time.perf_counter() - start:.1f} s]")
+
+    # Saved as an XGBRegressor, like the in-memory path, so the API and tree export load it unchanged
+    model = xgb.XGBRegressor()
+    model.load_model(booster.save_raw('ubj'))
+    save_model(model, preprocessor, model_file, compiled_file)
+    print(f"\n--- SRAE AI Model Training Complete! ({time.perf_counter() - start:.1f} s) ---")
 
 # This block ensures the function runs when you execute the script
 if __name__ == "__main__":
-    train_srae_model()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="Train the SRAE XGBoost model.")
+    parser.add_argument('--data', default=DATA_FILE, help="Labeled keys (.csv or .parquet).")
+    parser.add_argument('--external-memory', action='store_true', help="Stream the dataset instead of loading it whole.")
+    parser.add_argument('--continue-from', help="Saved model to continue training from (implies --external-memory).")
+    parser.add_argument('--model-file', default=MODEL_FILE)
+    parser.add_argument('--compiled-file', default=COMPILED_MODEL_FILE)
+    parser.add_argument('--chunk-rows', type=int, default=CHUNK_ROWS)
+    args = parser.parse_args()
+
+    if args.external_memory or args.continue_from:
+        train_srae_model_external_memory(args.data, args.model_file, args.compiled_file,
+                                         args.continue_from, args.chunk_rows)
+    else:
+        train_srae_model(args.data, args.model_file, args.compiled_file)
\ No newline at end of file
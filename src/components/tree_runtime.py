@@ -0,0 +1,186 @@
+import json
+import sys
+import numpy as np
+
+# Rows evaluated together; bounds the (rows x trees) cursor arrays
+EVAL_CHUNK_ROWS = 1024
+
+class CompiledTrees:
+    """
+    A tree ensemble flattened into NumPy node arrays, evaluated for every row
+    and every tree at once: each step moves all (row, tree) cursors one level
+    down, and leaves point to themselves, so max_depth steps reach every leaf.
+    Only NumPy is needed at inference time; artifacts are plain .npz files.
+
+    Subclasses turn the per-row sum of leaf values into the model's output.
+    metadata is free-form JSON saved alongside (e.g. the preprocessor config).
+    """
+    kind = None
+
+    def __init__(self, feature, threshold, left, right, default_left, value, roots, max_depth,
+                 strict, n_features, metadata=None, **params):
+        self.feature = np.asarray(feature, dtype=np.int64)
+        self.threshold = np.asarray(threshold, dtype=np.float64)
+        self.left = np.asarray(left, dtype=np.int64)
+        self.right = np.asarray(right, dtype=np.int64)
+        self.default_left = np.asarray(default_left, dtype=bool)
+        self.value = np.asarray(value, dtype=np.float64)
+        self.roots = np.asarray(roots, dtype=np.int64)
+        self.max_depth = int(max_depth)
+        # XGBoost sends x < threshold left, scikit-learn x <= threshold
+        self.strict = bool(strict)
+        self.n_features = int(n_features)
+        self.params = {name: float(value) for name, value in params.items()}
+        self.metadata = metadata or {}
+
+    def leaf_sum(self, X):
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim != 2 or X.shape[1] != self.n_features:
+            raise ValueError(f"Expected a 2-D input with {self.n_features} features, got shape {X.shape}")
+        if not hasattr(self, '_children'):
+            # children[2 * node + went_left]; int32 node ids keep the gathers cache-friendly
+            self._children = np.column_stack([self.right, self.left]).ravel().astype(np.int32)
+            self._feature32 = self.feature.astype(np.int32)
+        has_missing = np.isnan(X).any()
+        sums = np.empty(len(X))
+        for start in range(0, len(X), EVAL_CHUNK_ROWS):
+            chunk = np.ascontiguousarray(X[start:start + EVAL_CHUNK_ROWS])
+            flat, row_offsets = chunk.ravel(), (np.arange(len(chunk)) * self.n_features)[:, None]
+            nodes = np.broadcast_to(self.roots.astype(np.int32), (len(chunk), len(self.roots)))
+            for _ in range(self.max_depth):
+                x = flat[row_offsets + self._feature32[nodes]]
+                threshold = self.threshold[nodes]
+                go_left = x < threshold if self.strict else x <= threshold
+                if has_missing:
+                    go_left = np.where(np.isnan(x), self.default_left[nodes], go_left)
+                nodes = self._children[2 * nodes + go_left]
+            sums[start:start + len(chunk)] = self.value[nodes].sum(axis=1)
+        return sums
+
+    def save(self, path):
+        np.savez(
+            path, kind=self.kind, feature=self.feature, threshold=self.threshold, left=self.left,
+            right=self.right, default_left=self.default_left, value=self.value, roots=self.roots,
+            max_depth=self.max_depth, strict=self.strict, n_features=self.n_features,
+            params=json.dumps(self.params), metadata=json.dumps(self.metadata),
+        )
+
+class _TreeBuilder:
+    """Concatenates trees into one node array; leaves loop back to themselves."""
+    def __init__(self):
+        self.arrays = {name: [] for name in ['feature', 'threshold', 'left', 'right', 'default_left', 'value']}
+        self.roots = []
+        self.size = 0
+
+    def add(self, feature, threshold, left, right, default_left, value):
+        leaves = np.asarray(left) < 0
+        own = self.size + np.arange(len(leaves))
+        self.arrays['feature'].append(np.where(leaves, 0, feature))
+        self.arrays['threshold'].append(np.where(leaves, 0.0, threshold))
+        self.arrays['left'].append(np.where(leaves, own, self.size + np.asarray(left)))
+        self.arrays['right'].append(np.where(leaves, own, self.size + np.asarray(right)))
+        self.arrays['default_left'].append(np.asarray(default_left, dtype=bool))
+        self.arrays['value'].append(np.where(leaves, value, 0.0))
+        self.roots.append(self.size)
+        self.size += len(leaves)
+
+    def build(self):
+        return {name: np.concatenate(parts) for name, parts in self.arrays.items()} | {'roots': self.roots}
+
+class CompiledXGBRegressor(CompiledTrees):
+    """predict() of a reg:squarederror XGBRegressor, up to its best iteration."""
+    kind = 'xgboost_regressor'
+
+    @classmethod
+    def from_model(cls, model):
+        booster = model.get_booster()
+        learner = json.loads(booster.save_raw('json'))['learner']
+        if learner['objective']['name'] != 'reg:squarederror':
+            raise ValueError(f"Unsupported objective '{learner['objective']['name']}'")
+        model_json = learner['gradient_booster']['model']
+        best_iteration = getattr(model, 'best_iteration', None)
+        n_rounds = booster.num_boosted_rounds() if best_iteration is None else best_iteration + 1
+        trees = model_json['trees'][:model_json['iteration_indptr'][n_rounds]]
+
+        builder, max_depth = _TreeBuilder(), 0
+        for tree in trees:
+            left, right = np.asarray(tree['left_children']), np.asarray(tree['right_children'])
+            builder.add(tree['split_indices'], np.asarray(tree['split_conditions'], dtype=np.float32),
+                        left, right, tree['default_left'], tree['split_conditions'])
+            max_depth = max(max_depth, _tree_depth(left, right))
+        base_score = float(learner['learner_model_param']['base_score'].strip('[]'))
+        return cls(**builder.build(), max_depth=max_depth, strict=True,
+                   n_features=int(learner['learner_model_param']['num_feature']), base_score=base_score)
+
+    def predict(self, X):
+        return (self.leaf_sum(X) + self.params['base_score']).astype(np.float32)
+
+class CompiledIsolationForest(CompiledTrees):
+    """score_samples() of a scikit-learn IsolationForest (lower is more abnormal)."""
+    kind = 'isolation_forest'
+
+    @classmethod
+    def from_model(cls, model):
+        from sklearn.ensemble._iforest import _average_path_length
+        subsample_features = model._max_features != model.n_features_in_
+        builder, max_depth = _TreeBuilder(), 0
+        for estimator, features in zip(model.estimators_, model.estimators_features_):
+            tree = estimator.tree_
+            feature = np.asarray(features)[tree.feature] if subsample_features else tree.feature
+            # Each leaf carries its whole contribution to the summed path length
+            path_lengths = tree.compute_node_depths() + _average_path_length(tree.n_node_samples) - 1.0
+            default_left = getattr(tree, 'missing_go_to_left', np.zeros(tree.node_count, dtype=bool))
+            builder.add(feature, tree.threshold, tree.children_left, tree.children_right, default_left, path_lengths)
+            max_depth = max(max_depth, tree.max_depth)
+        denominator = len(model.estimators_) * _average_path_length([model._max_samples])[0]
+        return cls(**builder.build(), max_depth=max_depth, strict=False,
+                   n_features=model.n_features_in_, denominator=denominator)
+
+    def score_samples(self, X):
+        denominator = self.params['denominator']
+        if denominator == 0:
+            return -np.ones(len(X))
+        return -(2 ** (-self.leaf_sum(X) / denominator))
+
+def _tree_depth(left, right):
+    depth, level = 0, np.array([0])
+    while len(level):
+        children = np.concatenate([left[level], right[level]])
+        level = children[children >= 0]
+        depth += 1 if len(level) else 0
+    return depth
+
+def load_compiled_model(path):
+    with np.load(path, allow_pickle=False) as data:
+        arrays = {name: data[name] for name in data.files}
+    model_class = {cls.kind: cls for cls in (CompiledXGBRegressor, CompiledIsolationForest)}[str(arrays.pop('kind'))]
+    params = json.loads(str(arrays.pop('params')))
+    metadata = json.loads(str(arrays.pop('metadata', '{}')))
+    return model_class(**arrays, **params, metadata=metadata)
+
+def compile_artifact(artifact):
+    """
+    Compiles a saved SRAE/DTDE artifact - a bare model or a {'model', 'preprocessor'}
+    dict - recording the preprocessor's config in the compiled model's metadata.
+    """
+    model, preprocessor = (artifact['model'], artifact.get('preprocessor')) if isinstance(artifact, dict) else (artifact, None)
+    if hasattr(model, 'get_booster'):
+        compiled = CompiledXGBRegressor.from_model(model)
+    elif hasattr(model, 'estimators_features_'):
+        compiled = CompiledIsolationForest.from_model(model)
+    else:
+        raise ValueError(f"Cannot compile a {type(model).__name__}")
+    if preprocessor is not None:
+        compiled.metadata['preprocessor'] = preprocessor.to_config()
+    return compiled
+
+if __name__ == "__main__":
+    # Export a trained model for the NumPy runtime:
+    #   python -m src.components.tree_runtime models/srae_model.joblib models/srae_model.npz
+    import joblib
+    if len(sys.argv) != 3:
+        print("Usage: python -m src.components.tree_runtime <model.joblib> <output.npz>")
+        sys.exit(1)
+    compiled = compile_artifact(joblib.load(sys.argv[1]))
+    compiled.save(sys.argv[2])
+    print(f"Saved {len(compiled.roots)} compiled trees ({len(compiled.value)} nodes) to '{sys.argv[2]}'.")
@@ -0,0 +1,93 @@
+import threading
+from collections import deque
+import numpy as np
+import pandas as pd
+
+# Per-event behavioral features, computed over the events of the same principal
+# (user_id) and of the same key in the trailing window, including the event itself
+WINDOW_FEATURE_COLUMNS = [
+    'window_user_calls', 'window_user_failure_ratio', 'window_user_distinct_ips',
+    'window_key_calls', 'window_key_failure_ratio', 'window_key_distinct_ips',
+]
+DEFAULT_WINDOW = pd.Timedelta(hours=1)
+
+class _EntityWindow:
+    """Events of one principal or key inside the window, with running totals."""
+    __slots__ = ('events', 'failures', 'ip_counts', 'latest')
+
+    def __init__(self):
+        self.events = deque()
+        self.failures = 0
+        self.ip_counts = {}
+        self.latest = None
+
+    def add(self, time_ns, failed, ip, window_ns):
+        # A late event is counted at the newest time already seen, so the deque stays ordered
+        if self.latest is not None and time_ns < self.latest:
+            time_ns = self.latest
+        self.latest = time_ns
+
+        # Evict everything at or before time - window; each event is evicted once (amortized O(1))
+        events, ip_counts = self.events, self.ip_counts
+        cutoff = time_ns - window_ns
+        while events and events[0][0] <= cutoff:
+            _, old_failed, old_ip = events.popleft()
+            self.failures -= old_failed
+            if ip_counts[old_ip] == 1:
+                del ip_counts[old_ip]
+            else:
+                ip_counts[old_ip] -= 1
+
+        events.append((time_ns, failed, ip))
+        self.failures += failed
+        ip_counts[ip] = ip_counts.get(ip, 0) + 1
+        return len(events), self.failures / len(events), len(ip_counts)
+
+class SlidingWindowFeatures:
+    """
+    Streaming sliding-window counters per principal and per key: calls in the
+    window, failure ratio and distinct source IPs. Each event updates its two
+    windows in amortized O(1), so the same instance can featurize a training
+    set once and then keep featurizing live logs without re-reading history.
+    The window is (t - window, t], matching pandas' rolling('1h').
+    """
+    def __init__(self, window=DEFAULT_WINDOW):
+        self.window_ns = pd.Timedelta(window).value
+        self._lock = threading.Lock()
+        self._users = {}
+        self._keys = {}
+
+    def update(self, times_ns, user_ids, key_ids, source_ips, failed):
+        """Feeds events in the given order and returns their (n, 6) feature matrix."""
+        features = np.empty((len(times_ns), len(WINDOW_FEATURE_COLUMNS)), dtype=np.float64)
+        users, keys, window_ns = self._users, self._keys, self.window_ns
+        with self._lock:
+            for i, (time_ns, user_id, key_id, ip, is_failure) in enumerate(
+                    zip(times_ns.tolist(), user_ids, key_ids, source_ips, failed.tolist())):
+                user_window = users.get(user_id)
+                if user_window is None:
+                    user_window = users[user_id] = _EntityWindow()
+                key_window = keys.get(key_id)
+                if key_window is None:
+                    key_window = keys[key_id] = _EntityWindow()
+                features[i, :3] = user_window.add(time_ns, is_failure, ip, window_ns)
+                features[i, 3:] = key_window.add(time_ns, is_failure, ip, window_ns)
+        return features
+
+    def transform(self, df):
+        """
+        Featurizes KMS access logs (timestamp, user_id, key_id, source_ip, status),
+        feeding them in timestamp order, and returns the features aligned to df.
+        """
+        times = pd.to_datetime(df['timestamp'], utc=True).dt.tz_convert(None).to_numpy().astype('datetime64[ns]')
+        times_ns = times.astype(np.int64)
+        order = np.argsort(times_ns, kind='stable')
+        features = np.empty((len(df), len(WINDOW_FEATURE_COLUMNS)), dtype=np.float64)
+        features[order] = self.update(
+            times_ns[order],
+            df['user_id'].to_numpy()[order],
+            df['key_id'].to_numpy()[order],
+            df['source_ip'].to_numpy()[order],
+            (df['status'].to_numpy()[order] != 'Success').astype(np.int64),
+        )
+        return pd.DataFrame(features, columns=WINDOW_FEATURE_COLUMNS, index=df.index)
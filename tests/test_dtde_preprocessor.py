@@ -0,0 +1,45 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from src.components.dtde_preprocessor import DTDEPreprocessor
+
+LOGS_FILE = os.path.join(os.path.dirname(__file__), '../data/kms_access_logs.json')
+
+def legacy_encode(df):
+    """The original fit/transform feature engineering: time features plus pd.get_dummies."""
+    df_copy = df.copy()
+    df_copy['timestamp'] = pd.to_datetime(df_copy['timestamp'])
+    df_copy['hour'] = df_copy['timestamp'].dt.hour
+    df_copy['day_of_week'] = df_copy['timestamp'].dt.dayofweek
+    return pd.get_dummies(df_copy, columns=['user_id', 'action', 'status', 'source_ip'], dtype=int)
+
+def legacy_transform(columns, df):
+    return legacy_encode(df).reindex(columns=columns, fill_value=0)[columns]
+
+@pytest.fixture(scope='module')
+def logs():
+    return pd.read_json(LOGS_FILE).iloc[:400]
+
+@pytest.fixture(scope='module')
+def preprocessor(logs):
+    return DTDEPreprocessor().fit(logs.iloc[:200])
+
+def test_fit_columns_match_legacy(logs, preprocessor):
+    legacy = legacy_encode(logs.iloc[:200]).drop(columns=['log_id', 'timestamp', 'key_id', 'user_agent'])
+    assert preprocessor.columns == legacy.columns.tolist()
+
+def test_transform_matches_legacy(logs, preprocessor):
+    # Rows 200-400 include source IPs never seen during fit
+    for df in [logs.iloc[:50], logs.iloc[200:]]:
+        expected = legacy_transform(preprocessor.columns, df)
+        pd.testing.assert_frame_equal(preprocessor.transform(df), expected.astype(np.float32))
+
+def test_sparse_output_matches_dense(logs, preprocessor):
+    df = logs.iloc[150:250]
+    dense = preprocessor.transform_array(df)
+    assert np.array_equal(preprocessor.transform_array(df, as_sparse=True).toarray(), dense)
+
+def test_vocabulary_rebuilt_from_config(logs, preprocessor):
+    restored = DTDEPreprocessor.from_config(preprocessor.to_config())
+    assert np.array_equal(restored.transform_array(logs), preprocessor.transform_array(logs))
@@ -0,0 +1,49 @@
+from datetime import datetime
+import numpy as np
+import pytest
+from src.components import generate_dataset
+from src.components.generate_dataset import (
+    calculate_rule_scores, calculate_score, calculate_scores, generate_records, generate_records_loop, make_key_ids
+)
+
+NOW = datetime(2025, 1, 1, 12, 0, 0)
+
+class FixedDatetime(datetime):
+    @classmethod
+    def now(cls, tz=None):
+        return NOW
+
+@pytest.fixture
+def noiseless(monkeypatch):
+    """calculate_score with a fixed clock and its +-3 noise switched off."""
+    monkeypatch.setattr(generate_dataset, 'datetime', FixedDatetime)
+    monkeypatch.setattr(generate_dataset.random, 'uniform', lambda low, high: 0.0)
+
+def row_wise_scores(df):
+    return df.apply(calculate_score, axis=1).to_numpy()
+
+def test_rule_scores_match_row_wise_on_vectorized_records(noiseless):
+    df = generate_records(300, seed=0, now=NOW)
+    assert np.array_equal(calculate_rule_scores(df, NOW), row_wise_scores(df))
+
+def test_rule_scores_match_row_wise_on_loop_records(noiseless):
+    df = generate_records_loop(300)
+    assert np.array_equal(calculate_rule_scores(df, NOW), df['vulnerability_score'].to_numpy())
+
+def test_noisy_scores_stay_within_noise_of_rules():
+    df = generate_records(300, seed=1, now=NOW)
+    scores = calculate_scores(df, seed=2, now=NOW)
+    rules = calculate_rule_scores(df, NOW)
+    assert scores.dtype == np.int64
+    assert ((scores >= 0) & (scores <= 100)).all()
+    assert np.abs(scores - rules).max() <= 3
+    assert np.array_equal(scores, calculate_scores(df, seed=2, now=NOW))
+
+def test_seeded_records_are_reproducible():
+    first, second = generate_records(300, seed=3, now=NOW), generate_records(300, seed=3, now=NOW)
+    assert first.equals(second)
+    assert first['creation_date'].between(np.datetime64('2020-01-02'), np.datetime64(NOW)).all()
+
+def test_key_ids_match_row_wise_format():
+    assert list(make_key_ids(300)) == [f'key-{i:05d}' for i in range(300)]
+    assert make_key_ids(100_001)[-1] == 'key-100000'
@@ -0,0 +1,31 @@
+from datetime import datetime, timedelta, timezone
+import numpy as np
+import pytest
+from src.components.key_risk import KeyRiskTable
+
+LAST_LOG = datetime(2025, 1, 1, 12, 0)
+
+@pytest.fixture
+def table():
+    table = KeyRiskTable(half_life_hours=24)
+    table.update_vulnerability(['quiet', 'busy'], [0, 0])
+    table.update_logs(['quiet', 'busy'], np.array([LAST_LOG, LAST_LOG], dtype='datetime64[ns]'), [90, 40])
+    return table
+
+def test_score_decays_with_time_since_last_log(table):
+    assert table.get('quiet', now=LAST_LOG)['anomaly_score'] == 90
+    assert table.get('quiet', now=LAST_LOG + timedelta(hours=24))['anomaly_score'] == 45
+    assert table.get('quiet', now=LAST_LOG + timedelta(hours=48))['anomaly_score'] == 22.5
+    # Aware and naive as-of times agree
+    aware = LAST_LOG.replace(tzinfo=timezone.utc) + timedelta(hours=24)
+    assert table.get('quiet', now=aware) == table.get('quiet', now=LAST_LOG + timedelta(hours=24))
+
+def test_new_logs_restore_a_faded_key(table):
+    later = LAST_LOG + timedelta(days=3)
+    table.update_logs(['busy'], np.array([later], dtype='datetime64[ns]'), [80])
+    top = table.top(2, now=later)
+    assert list(top['key_id']) == ['busy', 'quiet']
+    assert top['anomaly_score'].iloc[1] == pytest.approx(90 / 8, abs=0.01)
+
+def test_logs_after_the_as_of_time_are_not_amplified(table):
+    assert table.get('quiet', now=LAST_LOG - timedelta(hours=5))['anomaly_score'] == 90
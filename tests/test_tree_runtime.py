@@ -0,0 +1,80 @@
+import os
+import joblib
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import IsolationForest
+from xgboost import XGBRegressor
+from src.components.generate_dataset import generate_records
+from src.components.srae_preprocessor import SRAEPreprocessor
+from src.components.tree_runtime import (
+    CompiledIsolationForest, CompiledXGBRegressor, compile_artifact, load_compiled_model
+)
+
+MODELS_DIR = os.path.join(os.path.dirname(__file__), '../models')
+LOGS_FILE = os.path.join(os.path.dirname(__file__), '../data/kms_access_logs.json')
+N_ROWS = 300
+
+def with_missing(X, rate=0.2, seed=0):
+    X = np.array(X, dtype=np.float32)
+    X[np.random.default_rng(seed).random(X.shape) < rate] = np.nan
+    return X
+
+@pytest.fixture(scope='module')
+def synthetic():
+    rng = np.random.default_rng(0)
+    X = with_missing(rng.normal(size=(N_ROWS, 6)), rate=0.1, seed=1)
+    y = 3 * np.nan_to_num(X[:, 0]) - np.nan_to_num(X[:, 3]) + rng.normal(size=N_ROWS)
+    return X, y
+
+@pytest.fixture(scope='module')
+def key_features():
+    return SRAEPreprocessor().transform_array(generate_records(N_ROWS, seed=0)).astype(np.float32)
+
+@pytest.fixture(scope='module')
+def dtde():
+    return joblib.load(os.path.join(MODELS_DIR, 'dtde_model.joblib'))
+
+@pytest.fixture(scope='module')
+def log_features(dtde):
+    return dtde['preprocessor'].transform_array(pd.read_json(LOGS_FILE).iloc[:N_ROWS])
+
+def test_xgb_regressor_matches_fitted_model(synthetic):
+    X, y = synthetic
+    model = XGBRegressor(n_estimators=30, max_depth=4, random_state=0).fit(X, y)
+    compiled = CompiledXGBRegressor.from_model(model)
+    np.testing.assert_allclose(compiled.predict(X), model.predict(X), atol=1e-4)
+
+def test_isolation_forest_matches_fitted_model(synthetic):
+    X, _ = synthetic
+    model = IsolationForest(n_estimators=30, max_features=0.5, random_state=0).fit(X)
+    compiled = CompiledIsolationForest.from_model(model)
+    np.testing.assert_allclose(compiled.score_samples(X), model.score_samples(X), atol=1e-9)
+
+@pytest.mark.parametrize('missing', [False, True])
+def test_srae_artifact_matches_joblib_model(key_features, missing):
+    model = joblib.load(os.path.join(MODELS_DIR, 'srae_model.joblib'))
+    compiled = load_compiled_model(os.path.join(MODELS_DIR, 'srae_model.npz'))
+    X = with_missing(key_features) if missing else key_features
+    expected, actual = model.predict(X), compiled.predict(X)
+    np.testing.assert_allclose(actual, expected, atol=1e-3)
+    assert np.array_equal(np.rint(actual), np.rint(expected))
+
+@pytest.mark.parametrize('missing', [False, True])
+def test_dtde_artifact_matches_joblib_model(dtde, log_features, missing):
+    compiled = load_compiled_model(os.path.join(MODELS_DIR, 'dtde_model.npz'))
+    X = with_missing(log_features) if missing else log_features
+    np.testing.assert_allclose(compiled.score_samples(X), dtde['model'].score_samples(X), atol=1e-9)
+
+def test_compiled_artifact_round_trips(dtde, log_features, tmp_path):
+    compiled = compile_artifact(dtde)
+    compiled.save(tmp_path / 'dtde_model.npz')
+    restored = load_compiled_model(tmp_path / 'dtde_model.npz')
+    assert restored.metadata['preprocessor'] == dtde['preprocessor'].to_config()
+    assert np.array_equal(restored.score_samples(log_features), compiled.score_samples(log_features))
+
+def test_rejects_wrong_feature_count(synthetic):
+    X, y = synthetic
+    compiled = CompiledXGBRegressor.from_model(XGBRegressor(n_estimators=2).fit(X, y))
+    with pytest.raises(ValueError):
+        compiled.predict(X[:, :-1])